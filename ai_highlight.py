@@ -7,6 +7,7 @@
 import requests
 import json
 from config import BAILIAN_API_KEY, BAILIAN_MODEL
+from tracing import span
 
 
 class AIHighlighter:
@@ -192,10 +193,13 @@ Clarra 推出了 **业界首个全球案件管理平台**，订阅用户量 **
         返回: {"content": 标红后的内容, "classification": 分类, "reason": 理由}
         """
         # 先进行分类
-        classification, reason = self.classify_content(title, content)
+        with span("ai.classify") as attrs:
+            classification, reason = self.classify_content(title, content)
+            attrs["classification"] = classification
         
         # 再进行标红
-        highlighted_content = self.highlight_content(content)
+        with span("ai.highlight", chars=len(content or "")):
+            highlighted_content = self.highlight_content(content)
         
         return {
             "content": highlighted_content,
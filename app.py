@@ -8,10 +8,19 @@ from publish_feishu import FeishuPublisher, test_connection
 from wechat_format import generate_wechat_html
 from card_export import generate_card_txt, save_card_txt
 from community_copy import generate_community_copy
+from publish_bundle import ARTIFACT_LABELS, build_bundle
+from markdown_bold import to_html
+from archive_store import archive_vol, lookup_published
+from config import ARCHIVE_DIR, NEAR_DUP_ENABLED
+from near_dup import DUPLICATE_COLUMN, NearDupIndex, duplicate_fields
+from news_store import ID_COLUMN, LOCATION_CURRENT, apply_publish_order, article_id, atomic_write_csv, id_index, load_news, write_csvs
+from search_index import index_articles, search
+from semantic_index import add_articles, related_articles, update_locations
 
 # 导入 fetch.py 的功能
 from fetch import get_data_from_backend
 from ai_highlight import AIHighlighter
+from tracing import span
 
 # 页面设置
 st.set_page_config(
@@ -290,17 +299,22 @@ st.markdown("""
 
 CSV_FILE = "news_database.csv"
 
+# 资讯审阅页搜索最多显示的结果数
+SEARCH_RESULT_LIMIT = 30
+
+# 正文里 **加粗** 的高亮样式
+HIGHLIGHT_OPEN_TAG = '<strong style="color: #b85c38; background: linear-gradient(180deg, transparent 60%, rgba(184, 92, 56, 0.15) 60%); padding: 0 2px;">'
+
 
 def load_data():
     """加载数据"""
-    if os.path.exists(CSV_FILE):
-        return pd.read_csv(CSV_FILE)
-    return pd.DataFrame()
+    # 旧数据没有文章 ID 的，读取时按标题 + 链接补上
+    return load_news(CSV_FILE)
 
 
 def save_data(df):
     """保存数据"""
-    df.to_csv(CSV_FILE, index=False)
+    atomic_write_csv(df, CSV_FILE)
     st.toast("✅ 数据已保存！", icon="💾")
 
 
@@ -309,34 +323,37 @@ def archive_articles(full_df, published_df, vol_number):
     发布后存档
     1. 入库文章 → archive/vol_{vol_number}.csv，状态改为「已发布 vol.X」
     2. 垃圾文章 → archive/trash_vol_{vol_number}.csv，从数据库删除
+    三个文件并发写入，每个都是先写临时文件再替换，不会留下写了一半的文件
     """
-    archive_dir = "archive"
-    if not os.path.exists(archive_dir):
-        os.makedirs(archive_dir)
-    
-    # 1. 归档入库文章
-    archive_file = f"{archive_dir}/vol_{vol_number}.csv"
-    published_df.to_csv(archive_file, index=False)
-    
-    # 2. 归档垃圾文章（单独存档）
-    trash_df = full_df[full_df["人工审核"] == "垃圾"].copy()
-    trash_count = len(trash_df)
-    if trash_count > 0:
-        trash_file = f"{archive_dir}/trash_vol_{vol_number}.csv"
-        trash_df.to_csv(trash_file, index=False)
-    
-    # 3. 更新入库文章状态
-    published_titles = published_df["标题"].tolist()
-    for title in published_titles:
-        mask = full_df["标题"] == title
-        full_df.loc[mask, "人工审核"] = f"已发布 vol.{vol_number}"
-    
-    # 4. 从数据库删除垃圾文章
-    full_df = full_df[full_df["人工审核"] != "垃圾"].copy()
-    
-    full_df.to_csv(CSV_FILE, index=False)
-    
-    return trash_count
+    with span("archive.articles", vol=vol_number, published=len(published_df)) as attrs:
+        archive_dir = ARCHIVE_DIR
+        jobs = [(published_df, f"{archive_dir}/vol_{vol_number}.csv")]
+        
+        # 垃圾文章（单独存档）
+        is_trash = full_df["人工审核"] == "垃圾"
+        trash_df = full_df[is_trash]
+        trash_count = len(trash_df)
+        if trash_count > 0:
+            jobs.append((trash_df, f"{archive_dir}/trash_vol_{vol_number}.csv"))
+        
+        # 更新入库文章状态（一次性按文章 ID 匹配），再删除垃圾文章（已标为发布的不删）
+        is_published = full_df[ID_COLUMN].isin(published_df[ID_COLUMN])
+        full_df = full_df.copy()
+        full_df.loc[is_published, "人工审核"] = f"已发布 vol.{vol_number}"
+        full_df = full_df[~(is_trash & ~is_published)]
+        jobs.append((full_df, CSV_FILE))
+        
+        write_csvs(jobs)
+        
+        # 写入跨期索引（archive/archive.db）和搜索索引
+        archive_vol(vol_number, published_df, trash_df)
+        index_articles(published_df, f"vol.{vol_number}")
+        index_articles(trash_df, f"vol.{vol_number}（垃圾）")
+        update_locations(published_df[ID_COLUMN], f"vol.{vol_number}")
+        update_locations(trash_df[ID_COLUMN], f"vol.{vol_number}（垃圾）")
+        
+        attrs["trash"] = trash_count
+        return trash_count
 
 
 @st.dialog("📖 使用指南", width="large")
@@ -419,12 +436,21 @@ def fetch_news_data(date_str=None, start_date=None, end_date=None, progress_call
     progress_callback: 进度回调函数 (current, total)
     status_callback: 状态回调函数 (message)
     """
+    with span("fetch.range", start=start_date or date_str, end=end_date or date_str):
+        return _fetch_news_data(date_str, start_date, end_date, progress_callback, status_callback)
+
+
+def _fetch_news_data(date_str=None, start_date=None, end_date=None, progress_callback=None, status_callback=None):
+    """fetch_news_data 的实际流程（外层负责追踪）"""
     try:
         # 初始化 AI 处理器
         if status_callback:
             status_callback("正在初始化 AI 处理器...")
         ai_processor = AIHighlighter()
         
+        # 正文查重索引（首次使用时按数据库重建）
+        dup_index = NearDupIndex.load() if NEAR_DUP_ENABLED else None
+        
         # 确定要处理的日期列表
         dates_to_process = []
         if start_date and end_date:
@@ -457,7 +483,9 @@ def fetch_news_data(date_str=None, start_date=None, end_date=None, progress_call
             if status_callback:
                 status_callback(f"📡 正在获取日期 {date} 的数据 ({date_idx}/{total_dates})...")
             
-            raw_news_list = get_data_from_backend(date, verbose=False)
+            with span("fetch.api", date=date) as attrs:
+                raw_news_list = get_data_from_backend(date, verbose=False)
+                attrs["count"] = len(raw_news_list)
             if raw_news_list:
                 news_cache[date] = raw_news_list
                 total_news_count += len(raw_news_list)
@@ -500,17 +528,22 @@ def fetch_news_data(date_str=None, start_date=None, end_date=None, progress_call
                 
                 content = news['content']
                 title = news['title']
+                aid = article_id(title, news['url'])
                 ai_classification = "推荐"
                 ai_reason = ""
                 
+                # 查重：与已收录文章正文近似重复的，不再送 AI 处理
+                duplicate = dup_index.match(content, aid) if dup_index is not None else None
+                
                 # AI 处理（标红 + 分类）
-                if ai_processor and content:
-                    result = ai_processor.process_article(title, content)
+                if ai_processor and content and duplicate is None:
+                    with span("fetch.article", date=date, idx=news_idx, title=title[:30]):
+                        result = ai_processor.process_article(title, content)
                     content = result['content']
                     ai_classification = result['classification']
                     ai_reason = result['reason']
                 
-                new_rows.append({
+                row = {
                     "收录日期": date,
                     "每日排名": news['rank'],
                     "评分": news.get('score', 0),
@@ -522,7 +555,14 @@ def fetch_news_data(date_str=None, start_date=None, end_date=None, progress_call
                     "AI理由": ai_reason,
                     "人工审核": "待审核",
                     "发布顺序": "",
-                })
+                    ID_COLUMN: aid,
+                    DUPLICATE_COLUMN: "",
+                }
+                if duplicate is not None:
+                    row.update(duplicate_fields(duplicate))
+                elif dup_index is not None:
+                    dup_index.add(aid, title, content)
+                new_rows.append(row)
         
         if not new_rows:
             return False, "没有获取到新数据"
@@ -530,28 +570,37 @@ def fetch_news_data(date_str=None, start_date=None, end_date=None, progress_call
         # 保存到 CSV
         if status_callback:
             status_callback("💾 正在保存数据...")
-        new_df = pd.DataFrame(new_rows)
-        
-        if os.path.exists(CSV_FILE) and os.path.getsize(CSV_FILE) > 0:
-            # 如果文件已存在，读取旧的，去重后拼接
-            try:
-                old_df = pd.read_csv(CSV_FILE)
-                # 去重：如果标题已经有了就不加了
-                new_df = new_df[~new_df['标题'].isin(old_df['标题'])]
-                if new_df.empty:
-                    return False, "所有新闻都已存在，没有新增数据"
-                final_df = pd.concat([old_df, new_df], ignore_index=True)
-            except pd.errors.EmptyDataError:
+        with span("fetch.persist", rows=len(new_rows)):
+            # 同一批里重复的文章只保留第一条
+            new_df = pd.DataFrame(new_rows).drop_duplicates(subset=ID_COLUMN)
+            
+            if os.path.exists(CSV_FILE) and os.path.getsize(CSV_FILE) > 0:
+                # 如果文件已存在，读取旧的，去重后拼接
+                try:
+                    old_df = load_news(CSV_FILE)
+                    # 去重：如果文章 ID（标题 + 链接）已经有了就不加了
+                    new_df = new_df[~new_df[ID_COLUMN].isin(old_df[ID_COLUMN])]
+                    if new_df.empty:
+                        return False, "所有新闻都已存在，没有新增数据"
+                    final_df = pd.concat([old_df, new_df], ignore_index=True)
+                except pd.errors.EmptyDataError:
+                    final_df = new_df
+            else:
                 final_df = new_df
-        else:
-            final_df = new_df
-        
-        final_df.to_csv(CSV_FILE, index=False, encoding='utf-8-sig')
+            
+            atomic_write_csv(final_df, CSV_FILE, encoding='utf-8-sig')
+            # 数据保存成功后再把新文章写进查重索引、搜索索引
+            if dup_index is not None:
+                dup_index.flush()
+            index_articles(new_df)
+            add_articles(new_df)
         
         if progress_callback:
             progress_callback(1.0)  # 完成
         
-        return True, f"成功获取 {len(new_df)} 条新数据，共 {len(final_df)} 条"
+        dup_count = int((new_df[DUPLICATE_COLUMN] != "").sum())
+        dup_note = f"（其中 {dup_count} 条与已有文章重复，已标为垃圾）" if dup_count else ""
+        return True, f"成功获取 {len(new_df)} 条新数据，共 {len(final_df)} 条{dup_note}"
         
     except Exception as e:
         return False, f"获取数据失败: {str(e)}"
@@ -715,7 +764,8 @@ def get_ai_badge_class(ai_tag):
         "强烈推荐": ("hot", "🔥 强烈推荐"),
         "推荐": ("recommend", "👍 推荐"),
         "一般": ("normal", "📄 一般"),
-        "不推荐": ("skip", "👎 不推荐")
+        "不推荐": ("skip", "👎 不推荐"),
+        "重复": ("skip", "🔁 重复")
     }
     return badge_map.get(ai_tag, ("normal", "📄 一般"))
 
@@ -724,17 +774,40 @@ def convert_markdown_highlights(text: str) -> str:
     """
     将 Markdown 的 **加粗** 标记转换为 HTML 高亮样式
     """
-    import re
-    if not text:
-        return text
     # 将 **文字** 转换为带高亮样式的 <strong> 标签
-    pattern = r'\*\*(.+?)\*\*'
-    replacement = r'<strong style="color: #b85c38; background: linear-gradient(180deg, transparent 60%, rgba(184, 92, 56, 0.15) 60%); padding: 0 2px;">\1</strong>'
-    return re.sub(pattern, replacement, text)
+    return to_html(text, HIGHLIGHT_OPEN_TAG, "</strong>")
 
 
-def render_news_card(row, idx, df):
-    """渲染单个新闻卡片"""
+def render_search_results(query, df):
+    """渲染搜索结果：当前数据库里的文章显示完整卡片（可直接改状态），往期存档只显示摘要"""
+    start = time.perf_counter()
+    results = search(query, limit=SEARCH_RESULT_LIMIT)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    st.caption(f"🔍 「{query}」共 {len(results)} 条结果（{elapsed_ms:.0f} ms，按相关度排序）")
+    
+    if not results:
+        render_empty_state("🔍", "没有找到相关文章", "换个关键词试试")
+        return
+    
+    rows = id_index(df) if ID_COLUMN in df.columns else {}
+    related = related_articles([item["id"] for item in results if item["id"] in rows])
+    for item in results:
+        if item["location"] == LOCATION_CURRENT and item["id"] in rows:
+            idx = rows[item["id"]]
+            render_news_card(df.loc[idx], idx, df, related.get(item["id"]))
+        else:
+            link = f" · [🔗 原文链接]({item['url']})" if item["url"] else ""
+            st.markdown(f"**{item['title']}**")
+            st.caption(f"📦 {item['location']} · 📅 {item['date']}{link}")
+            st.caption(item["snippet"])
+            st.markdown("---")
+
+
+def render_news_card(row, idx, df, related=None):
+    """
+    渲染单个新闻卡片
+    related: 相关往期报道列表（semantic_index.related_articles 的结果），为空时不显示
+    """
     ai_tag = row.get('AI分类', '一般')
     badge_class, badge_text = get_ai_badge_class(ai_tag)
     title = row.get('标题', '无标题')
@@ -788,7 +861,8 @@ def render_news_card(row, idx, df):
             
             if new_status != current_status:
                 df.at[idx, "人工审核"] = new_status
-                df.to_csv(CSV_FILE, index=False)
+                with span("review.save_status", status=new_status):
+                    atomic_write_csv(df, CSV_FILE)
                 st.toast(f"✅ 已保存：{title[:20]}... → {new_status}", icon="💾")
         
         meta_parts = [f"📅 {date_str}", f"📊 评分 {score}", f"🏷️ {source}"]
@@ -818,6 +892,12 @@ def render_news_card(row, idx, df):
         else:
             st.caption("📭 暂无原文内容")
         
+        if related:
+            with st.expander(f"🔗 相关往期报道（{len(related)}）"):
+                for item in related:
+                    link = f"[{item['title']}]({item['url']})" if item["url"] else item["title"]
+                    st.markdown(f"- {link} · {item['location']} · 📅 {item['date']} · 相似度 {item['score']:.2f}")
+        
         st.markdown("---")
 
 
@@ -878,6 +958,7 @@ with tab_data:
             "评分": st.column_config.NumberColumn("📊 评分", width="small"),
             "来源名称": st.column_config.TextColumn("🏷️ 来源", width="small"),
             "收录日期": st.column_config.TextColumn("📅 日期", width="small"),
+            ID_COLUMN: None,
         },
         hide_index=True,
         width='stretch',
@@ -889,12 +970,19 @@ with tab_review:
     入库数 = len(df[df["人工审核"] == "入库"]) if "人工审核" in df.columns else 0
     待审核数 = len(df[df["人工审核"] == "待审核"]) if "人工审核" in df.columns else 0
     
-    title_col, spacer, filter_col, stat_col = st.columns([2, 3, 1.2, 0.8])
+    title_col, search_col, filter_col, stat_col = st.columns([2, 3, 1.2, 0.8])
     
     with title_col:
         st.markdown("### 📋 资讯审阅")
         st.caption("第二步：AI 已预分类，选择「入库」或「垃圾」，状态自动保存 ✨")
     
+    with search_col:
+        search_query = st.text_input(
+            "搜索",
+            placeholder="🔍 搜索标题和正文（含往期存档）",
+            label_visibility="collapsed"
+        )
+    
     with filter_col:
         filter_option = st.selectbox(
             "筛选",
@@ -933,15 +1021,19 @@ with tab_review:
     else:
         display_df = df.copy()
     
-    if display_df.empty:
+    if search_query.strip():
+        render_search_results(search_query, df)
+    elif display_df.empty:
         render_empty_state(
             "📭",
             "当前筛选条件下没有数据",
             "尝试切换筛选条件查看更多内容"
         )
     else:
+        # 相关往期报道：当前页的文章一次性批量查询
+        related = related_articles(display_df[ID_COLUMN].tolist()) if ID_COLUMN in display_df.columns else {}
         for idx, row in display_df.iterrows():
-            render_news_card(row, idx, df)
+            render_news_card(row, idx, df, related.get(row.get(ID_COLUMN)))
         
         st.session_state['edited_df'] = df
 
@@ -980,32 +1072,28 @@ with tab_publish:
             st.markdown("#### ✏️ 调整发布顺序")
             st.caption("↕️ 上下拖拽卡片调整顺序，松手自动保存")
             
+            # 拖拽项文本 -> 文章 ID（截断后重名的加序号区分）
             drag_items = []
-            for i, (idx, row) in enumerate(selected_articles.iterrows()):
-                title = row.get('标题', '无标题')
+            drag_ids = {}
+            for title, aid in zip(selected_articles["标题"], selected_articles[ID_COLUMN]):
+                title = title if isinstance(title, str) else '无标题'
                 display_text = f"{title[:50]}{'...' if len(title) > 50 else ''}"
+                if display_text in drag_ids:
+                    display_text = f"{display_text} ({len(drag_items) + 1})"
                 drag_items.append(display_text)
+                drag_ids[display_text] = aid
             
             sorted_items = sort_items(drag_items, direction="vertical")
             
             if sorted_items != drag_items:
-                for new_idx, display_text in enumerate(sorted_items, 1):
-                    title_part = display_text
-                    if title_part.endswith('...'):
-                        title_part = title_part[:-3]
-                    
-                    for _, row in selected_articles.iterrows():
-                        original_title = row.get('标题', '')
-                        if original_title.startswith(title_part) or title_part in original_title[:50]:
-                            mask = saved_df["标题"] == original_title
-                            if mask.any():
-                                saved_df.loc[mask, "发布顺序"] = new_idx
-                            break
-                
-                saved_df.to_csv(CSV_FILE, index=False)
-                st.toast("✅ 顺序已更新！", icon="🔄")
-                time.sleep(0.3)
-                st.rerun()
+                # 一次性按 ID 更新发布顺序，顺序没变的文章不动；全都没变就不写文件
+                changed = apply_publish_order(saved_df, [drag_ids[text] for text in sorted_items])
+                if changed:
+                    with span("publish.reorder", changed=changed):
+                        atomic_write_csv(saved_df, CSV_FILE)
+                    st.toast("✅ 顺序已更新！", icon="🔄")
+                    time.sleep(0.3)
+                    st.rerun()
         
         with preview_col:
             st.markdown("#### 📋 发布顺序预览")
@@ -1045,6 +1133,15 @@ with tab_publish:
                 """, unsafe_allow_html=True)
     
     if article_count > 0:
+        # 跨期查重：入库文章是否在往期发布过（按链接或标题）
+        published_before = lookup_published(
+            urls=selected_articles["链接"].dropna().tolist(),
+            titles=selected_articles["标题"].dropna().tolist(),
+        )
+        if not published_before.empty:
+            lines = [f"- vol.{row['期号']}：{row['标题']}" for _, row in published_before.iterrows()]
+            st.warning("⚠️ 以下文章在往期已发布过：\n" + "\n".join(lines))
+        
         st.markdown("---")
         left_col, right_col = st.columns([1, 1])
         
@@ -1073,8 +1170,8 @@ with tab_publish:
             has_cached_doc = cached_vol == vol_number and cached_url and vol_number
             
             if has_cached_doc:
-                # 已有文档：查看文档 | 重新生成 | 公众号 | 卡片 | 文案 | 归档
-                b1, b2, b3, b4, b5, b6 = st.columns([1, 1, 1, 1, 1, 1])
+                # 已有文档：查看文档 | 重新生成 | 公众号 | 卡片 | 文案 | 一键发布 | 归档
+                b1, b2, b3, b4, b5, b6, b7 = st.columns([1, 1, 1, 1, 1, 1, 1])
                 with b1:
                     view_doc_clicked = st.button("📄 查看文档")
                     publish_clicked = False
@@ -1087,10 +1184,12 @@ with tab_publish:
                 with b5:
                     copy_clicked = st.button("💬 文案")
                 with b6:
+                    bundle_clicked = st.button("🚀 一键发布")
+                with b7:
                     archive_clicked = st.button("📦 归档", type="primary")
             else:
-                # 无缓存：发布飞书 | 公众号 | 卡片 | 文案 | 归档
-                b1, b2, b3, b4, b5 = st.columns([1, 1, 1, 1, 1])
+                # 无缓存：发布飞书 | 公众号 | 卡片 | 文案 | 一键发布 | 归档
+                b1, b2, b3, b4, b5, b6 = st.columns([1, 1, 1, 1, 1, 1])
                 view_doc_clicked = False
                 regenerate_clicked = False
                 with b1:
@@ -1102,6 +1201,8 @@ with tab_publish:
                 with b4:
                     copy_clicked = st.button("💬 文案")
                 with b5:
+                    bundle_clicked = st.button("🚀 一键发布")
+                with b6:
                     archive_clicked = st.button("📦 归档", type="primary")
     else:
         vol_number = ""
@@ -1111,6 +1212,7 @@ with tab_publish:
         wechat_clicked = False
         card_clicked = False
         copy_clicked = False
+        bundle_clicked = False
         archive_clicked = False
     
     # 处理查看已生成文档
@@ -1133,11 +1235,16 @@ with tab_publish:
         elif article_count == 0:
             st.error("⚠️ 还没有标记为「入库」的文章！")
         else:
-            with st.spinner("正在发布到飞书（预览）..."):
+            spinner_text = "正在更新飞书文档（只改动有变化的文章）..." if regenerate_clicked else "正在发布到飞书（预览）..."
+            with st.spinner(spinner_text):
                 try:
                     publisher = FeishuPublisher()
                     articles = selected_articles.to_dict('records')
-                    doc_id, doc_url = publisher.publish_weekly_report(vol_number, articles)
+                    if regenerate_clicked:
+                        # 重新生成：在原文档上增量更新，不再新建文档
+                        doc_id, doc_url = publisher.update_weekly_report(vol_number, articles)
+                    else:
+                        doc_id, doc_url = publisher.publish_weekly_report(vol_number, articles)
                     
                     # 缓存文档信息，避免重复生成
                     st.session_state['feishu_doc'] = {
@@ -1152,6 +1259,63 @@ with tab_publish:
                 except Exception as e:
                     st.error(f"❌ 发布失败: {str(e)}")
     
+    # 一键发布：四种发布物并发生成，每完成一项更新一行状态
+    if bundle_clicked:
+        st.session_state['show_wechat'] = False
+        st.session_state['show_card'] = False
+        st.session_state['show_copy'] = False
+        
+        if not vol_number:
+            st.error("⚠️ 请输入期号！")
+        else:
+            articles = selected_articles.to_dict('records')
+            other_df = saved_df[saved_df["人工审核"] != "入库"]
+            other_titles = other_df["标题"].tolist() if not other_df.empty else []
+            
+            st.markdown("#### 🚀 一键发布")
+            slots = {name: st.empty() for name in ARTIFACT_LABELS}
+            for name, label in ARTIFACT_LABELS.items():
+                slots[name].markdown(f"⏳ {label} 生成中...")
+            
+            def show_progress(name, result):
+                label = ARTIFACT_LABELS[name]
+                if result["status"] == "cached":
+                    slots[name].markdown(f"♻️ {label} 内容未变化，复用上次结果")
+                elif result["status"] == "done":
+                    slots[name].markdown(f"✅ {label} 完成（{result['seconds']:.1f}s）")
+                else:
+                    slots[name].markdown(f"❌ {label} 失败：{result['error']}")
+            
+            results = build_bundle(vol_number, articles, other_titles, on_progress=show_progress)
+            st.session_state['bundle'] = {'vol': vol_number, 'results': results}
+            
+            feishu = results["feishu"]["value"]
+            if feishu:
+                st.session_state['feishu_doc'] = {
+                    'vol': vol_number,
+                    'url': feishu['url'],
+                    'doc_id': feishu['doc_id']
+                }
+    
+    # 一键发布的结果（同一期号保留到归档前）
+    bundle = st.session_state.get('bundle', {})
+    if bundle and bundle.get('vol') == vol_number and not archive_clicked:
+        results = bundle['results']
+        feishu = results["feishu"]["value"]
+        if feishu:
+            st.markdown(f"📄 [点击查看飞书文档]({feishu['url']})")
+        if results["wechat"]["value"]:
+            with st.expander("📱 公众号 HTML"):
+                st.code(results["wechat"]["value"], language="html")
+        if results["card_txt"]["value"]:
+            with st.expander("🃏 卡片文本（已保存为 news_articles.txt）"):
+                st.code(results["card_txt"]["value"], language=None)
+        copy_result = results["copy"]["value"]
+        if copy_result:
+            with st.expander("💬 社群早报文案"):
+                st.text_area("复制完整文案", copy_result.get("copy", ""), height=100, key="bundle_copy")
+                st.caption(f"📊 正文 {len(copy_result.get('copy_only', ''))} 字")
+    
     if archive_clicked:
         # 清除展示状态
         st.session_state['show_wechat'] = False
@@ -1168,6 +1332,8 @@ with tab_publish:
             # 归档成功后清除文档缓存
             if 'feishu_doc' in st.session_state:
                 del st.session_state['feishu_doc']
+            if 'bundle' in st.session_state:
+                del st.session_state['bundle']
             
             st.success(f"🎉 已归档！文章已标记为「已发布 vol.{vol_number}」")
             st.info(f"📦 入库存档：archive/vol_{vol_number}.csv")
@@ -1222,16 +1388,21 @@ with tab_publish:
             txt_content = generate_card_txt(articles, max_count=5)
             st.code(txt_content, language=None)
             if st.button("💾 保存为 news_articles.txt"):
-                save_card_txt(articles, "news_articles.txt", max_count=5)
+                save_card_txt(articles, max_count=5)
                 st.success("✅ 已保存！运行 `python card_generator.py` 生成图片")
         
         if st.session_state.get('show_copy', False):
-            st.markdown("#### 💬 社群早报文案")
+            copy_title_col, copy_btn_col = st.columns([4, 1])
+            with copy_title_col:
+                st.markdown("#### 💬 社群早报文案")
+            with copy_btn_col:
+                refresh_copy_clicked = st.button("🔄 重新生成文案")
             with st.spinner("🤖 AI 正在生成文案..."):
                 articles = selected_articles.to_dict('records')
                 other_df = saved_df[saved_df["人工审核"] != "入库"]
                 other_titles = other_df["标题"].tolist() if not other_df.empty else []
-                result = generate_community_copy(articles[:5], other_titles)
+                # 文章没变时直接用缓存，点「重新生成文案」才会重新请求
+                result = generate_community_copy(articles[:5], other_titles, force_refresh=refresh_copy_clicked)
             
             if result.get("success"):
                 full_copy = result.get("copy", "")
@@ -1251,7 +1422,7 @@ with tab_publish:
                 
                 st.markdown(f"> {result.get('guide', '')}")
                 st.text_area("复制完整文案", full_copy, height=100)
-                st.caption(f"📊 正文 {len(copy_only)} 字")
+                st.caption(f"📊 正文 {len(copy_only)} 字" + ("（缓存结果）" if result.get("cached") else ""))
                 
                 with st.expander("🔍 AI 分析"):
                     st.markdown(result.get("analysis", ""))
@@ -0,0 +1,264 @@
+"""
+往期存档索引
+把每期归档的文章（入库 + 垃圾）存进一张 SQLite 表，按链接、标题、期号、收录日期建索引，
+跨期查询（「这篇以前发过没有」）不用再逐个打开 archive/ 下的 CSV
+
+- archive/vol_X.csv、trash_vol_X.csv 照常写，数据库是它们的索引
+- 第一次打开时自动导入已有的 CSV 存档
+- 原始行以 JSON 整行保存，CSV 以后加列也不用改表结构
+
+用法:
+    from archive_store import archive_vol, lookup_published, archive_stats
+
+    archive_vol("12", published_df, trash_df)
+    lookup_published(urls=["https://..."])   # -> DataFrame: 期号、标题、链接、收录日期
+    archive_stats()                          # -> DataFrame: 每期篇数、垃圾数、收录日期范围
+
+命令行:
+    python archive_store.py                  # 每期统计
+    python archive_store.py --lookup <链接或标题>
+    python archive_store.py --reimport       # 按 CSV 重建索引
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from config import ARCHIVE_DIR, ARCHIVE_DB_FILE
+from tracing import span
+
+KIND_PUBLISHED = "published"
+KIND_TRASH = "trash"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    vol TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    date TEXT,
+    title TEXT,
+    url TEXT,
+    source TEXT,
+    data TEXT NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+CREATE INDEX IF NOT EXISTS idx_articles_title ON articles (title);
+CREATE INDEX IF NOT EXISTS idx_articles_vol ON articles (vol, kind);
+CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (date);
+"""
+
+_CSV_PATTERN = re.compile(r"^(trash_)?vol_(.+)\.csv$")
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _connect(db_file=ARCHIVE_DB_FILE):
+    """打开数据库（每次调用新建连接，Streamlit 的多个会话线程互不干扰）"""
+    with _init_lock:
+        first_time = db_file not in _initialized
+        if first_time:
+            os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+            is_new = not os.path.exists(db_file)
+        conn = sqlite3.connect(db_file)
+        if first_time:
+            conn.executescript(_SCHEMA)
+            _initialized.add(db_file)
+            if is_new:
+                # 新建的数据库先把已有 CSV 存档导进来
+                _import_csvs(conn, os.path.dirname(db_file) or ".")
+    return conn
+
+
+def _clean(value):
+    """NaN/inf -> None，numpy 数值 -> Python 数值，保证能写进 JSON"""
+    if value is None:
+        return None
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+        if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+            return None
+    return value
+
+
+def _text(value):
+    value = _clean(value)
+    return None if value is None else str(value)
+
+
+def _rows(vol, kind, df, archived_at):
+    for record in df.to_dict("records"):
+        record = {key: _clean(value) for key, value in record.items()}
+        yield (
+            str(vol), kind,
+            _text(record.get("收录日期")), _text(record.get("标题")),
+            _text(record.get("链接")), _text(record.get("来源名称")),
+            json.dumps(record, ensure_ascii=False), archived_at,
+        )
+
+
+def _replace_vol(conn, vol, kind, df, archived_at=None):
+    """覆盖写入某期某类文章（同一期重复归档时以最后一次为准）"""
+    archived_at = archived_at or time.time()
+    conn.execute("DELETE FROM articles WHERE vol = ? AND kind = ?", (str(vol), kind))
+    if df is not None and not df.empty:
+        conn.executemany(
+            "INSERT INTO articles (vol, kind, date, title, url, source, data, archived_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            _rows(vol, kind, df, archived_at),
+        )
+
+
+def _import_csvs(conn, archive_dir):
+    """导入 archive/ 下已有的 vol_X.csv 与 trash_vol_X.csv，返回导入的文件数"""
+    count = 0
+    with span("archive.import", dir=archive_dir) as attrs:
+        with conn:
+            for path in sorted(glob.glob(os.path.join(archive_dir, "*vol_*.csv"))):
+                match = _CSV_PATTERN.match(os.path.basename(path))
+                if not match:
+                    continue
+                try:
+                    df = pd.read_csv(path)
+                except (pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+                    print(f"[WARN] 跳过无法读取的存档 {path}: {e}")
+                    continue
+                kind = KIND_TRASH if match.group(1) else KIND_PUBLISHED
+                _replace_vol(conn, match.group(2), kind, df, os.path.getmtime(path))
+                count += 1
+        attrs["files"] = count
+    if count:
+        print(f"[INFO] 已导入 {count} 个 CSV 存档到 {ARCHIVE_DB_FILE}")
+    return count
+
+
+def archive_vol(vol, published_df, trash_df=None, db_file=ARCHIVE_DB_FILE):
+    """把一期的入库文章和垃圾文章写入索引（重复归档同一期会覆盖）"""
+    with span("archive.index", vol=vol, published=len(published_df)):
+        conn = _connect(db_file)
+        try:
+            with conn:
+                archived_at = time.time()
+                _replace_vol(conn, vol, KIND_PUBLISHED, published_df, archived_at)
+                _replace_vol(conn, vol, KIND_TRASH, trash_df, archived_at)
+        finally:
+            conn.close()
+
+
+def reimport_csvs(archive_dir=ARCHIVE_DIR, db_file=ARCHIVE_DB_FILE):
+    """按 CSV 存档重建索引"""
+    conn = _connect(db_file)
+    try:
+        with conn:
+            conn.execute("DELETE FROM articles")
+        return _import_csvs(conn, archive_dir)
+    finally:
+        conn.close()
+
+
+def lookup_published(urls=None, titles=None, include_trash=False, db_file=ARCHIVE_DB_FILE):
+    """
+    跨期查找链接或标题相同的已归档文章
+    返回 DataFrame: 期号、类型、标题、链接、收录日期（按期号、收录日期排序）
+    """
+    urls = [u for u in (urls or []) if u]
+    titles = [t for t in (titles or []) if t]
+    columns = ["期号", "类型", "标题", "链接", "收录日期"]
+    if not urls and not titles:
+        return pd.DataFrame(columns=columns)
+
+    conn = _connect(db_file)
+    try:
+        # 临时表 + 索引连接，比拼 IN (...) 更不怕数量多
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (kind TEXT, value TEXT)")
+        conn.execute("DELETE FROM wanted")
+        conn.executemany("INSERT INTO wanted VALUES ('url', ?)", [(u,) for u in urls])
+        conn.executemany("INSERT INTO wanted VALUES ('title', ?)", [(t,) for t in titles])
+        kinds = "" if include_trash else f"AND a.kind = '{KIND_PUBLISHED}'"
+        rows = conn.execute(f"""
+            SELECT a.vol, a.kind, a.title, a.url, a.date FROM articles a
+            JOIN wanted w ON w.kind = 'url' AND a.url = w.value {kinds}
+            UNION
+            SELECT a.vol, a.kind, a.title, a.url, a.date FROM articles a
+            JOIN wanted w ON w.kind = 'title' AND a.title = w.value {kinds}
+        """).fetchall()
+    finally:
+        conn.close()
+
+    df = pd.DataFrame(rows, columns=columns)
+    return df.sort_values(["期号", "收录日期"], key=_vol_sort_key).reset_index(drop=True)
+
+
+def vol_articles(vol, kind=KIND_PUBLISHED, db_file=ARCHIVE_DB_FILE):
+    """读取某期归档的文章（与当时的 CSV 列一致）"""
+    conn = _connect(db_file)
+    try:
+        rows = conn.execute(
+            "SELECT data FROM articles WHERE vol = ? AND kind = ? ORDER BY id", (str(vol), kind)
+        ).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame([json.loads(data) for (data,) in rows])
+
+
+def archive_stats(db_file=ARCHIVE_DB_FILE):
+    """每期统计：入库篇数、垃圾篇数、来源数、收录日期范围"""
+    conn = _connect(db_file)
+    try:
+        rows = conn.execute(f"""
+            SELECT vol,
+                   SUM(kind = '{KIND_PUBLISHED}'),
+                   SUM(kind = '{KIND_TRASH}'),
+                   COUNT(DISTINCT CASE WHEN kind = '{KIND_PUBLISHED}' THEN source END),
+                   MIN(date), MAX(date)
+            FROM articles GROUP BY vol
+        """).fetchall()
+    finally:
+        conn.close()
+    df = pd.DataFrame(rows, columns=["期号", "入库", "垃圾", "来源数", "最早收录", "最晚收录"])
+    return df.sort_values("期号", key=_vol_sort_key).reset_index(drop=True)
+
+
+def _vol_sort_key(series):
+    """期号按数字排序（"10" 排在 "9" 后面），其他列原样"""
+    if series.name != "期号":
+        return series
+    return series.map(lambda v: (0, int(v), "") if str(v).isdigit() else (1, 0, str(v)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='往期存档索引：跨期查询与统计')
+    parser.add_argument(
+        '--lookup',
+        type=str,
+        help='按链接或标题查找已发布的文章'
+    )
+    parser.add_argument(
+        '--reimport',
+        action='store_true',
+        help=f'按 {ARCHIVE_DIR}/ 下的 CSV 重建索引'
+    )
+
+    args = parser.parse_args()
+
+    if args.reimport:
+        reimport_csvs()
+    if args.lookup:
+        result = lookup_published(urls=[args.lookup], titles=[args.lookup], include_trash=True)
+        if result.empty:
+            print("没有找到")
+        else:
+            print(result.to_string(index=False))
+    else:
+        print(archive_stats().to_string(index=False))
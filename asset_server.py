@@ -0,0 +1,103 @@
+"""
+卡片静态资源服务
+在本机起一个只读的小型 HTTP 服务，把二维码、图标等图片以 URL 的形式提供给渲染页面，
+代替把整张图片 Base64 内联进 HTML。
+
+- URL 带内容哈希（/assets/<hash>/<name>），配合长期缓存头，
+  同一页面重复渲染时 Chromium 直接复用已解码的图片
+- 只提供通过 publish() 注册过的内存数据，不暴露磁盘上的任何文件
+
+用法:
+    from asset_server import get_asset_server
+
+    url = get_asset_server().publish("qrcode.png", png_bytes, "image/png")
+"""
+
+import atexit
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class AssetServer:
+    """内存图片资源的本地 HTTP 服务"""
+
+    def __init__(self, host="127.0.0.1"):
+        self.host = host
+        self._assets = {}  # URL 路径 -> (数据, content_type, etag)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        self._ensure_started()
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._server is not None:
+                return
+            assets = self._assets
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    asset = assets.get(self.path.split("?", 1)[0])
+                    if asset is None:
+                        self.send_error(404)
+                        return
+                    data, content_type, etag = asset
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Cache-Control", CACHE_CONTROL)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.send_header("Cache-Control", CACHE_CONTROL)
+                    self.send_header("ETag", etag)
+                    self.send_header("Access-Control-Allow-Origin", "*")
+                    self.end_headers()
+                    self.wfile.write(data)
+
+                def log_message(self, format, *args):
+                    # 不在终端打印每个请求
+                    pass
+
+            self._server = ThreadingHTTPServer((self.host, 0), Handler)
+            self._server.daemon_threads = True
+            self._thread = threading.Thread(target=self._server.serve_forever, name="asset-server", daemon=True)
+            self._thread.start()
+
+    def publish(self, name, data, content_type="image/png"):
+        """注册一份资源，返回带内容哈希的 URL（内容不变则 URL 不变）"""
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        path = f"/assets/{digest}/{name}"
+        self._assets[path] = (data, content_type, f'"{digest}"')
+        return f"{self.base_url}{path}"
+
+    def close(self):
+        with self._lock:
+            server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_asset_server():
+    """获取进程内共享的资源服务（首次调用时创建）"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = AssetServer()
+            atexit.register(_server.close)
+        return _server
@@ -0,0 +1,180 @@
+"""
+浏览器池模块
+常驻一个 Chromium，多次渲染复用浏览器和页面，避免每张图都重新启动浏览器
+
+浏览器运行在独立的后台线程（自带事件循环）里，所以既能被 asyncio.run() 的
+多次调用共享，也能在 Streamlit 这类同步代码中直接使用。
+
+用法:
+    from browser_pool import get_browser_pool
+
+    async def shoot(page):
+        await page.set_content(html, wait_until="domcontentloaded")
+        await page.locator(".container").screenshot(path="card.png")
+
+    await get_browser_pool().run(shoot)      # 异步代码
+    get_browser_pool().run_sync(shoot)       # 同步代码
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import threading
+
+from playwright.async_api import async_playwright
+from tracing import span
+
+# 默认同时打开的页面数（也是并发渲染上限）
+DEFAULT_MAX_PAGES = 4
+
+
+class BrowserPool:
+    """常驻 Chromium + 页面池"""
+
+    def __init__(self, max_pages=DEFAULT_MAX_PAGES):
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._idle_pages = {}  # device_scale_factor -> [page, ...]
+        self._launch_lock = None
+        self._semaphore = None
+
+    # ---------- 后台事件循环 ----------
+
+    def _ensure_started(self):
+        """按需启动后台线程和事件循环"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+            thread.start()
+            self._loop = loop
+            self._thread = thread
+            self._launch_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+
+    async def _ensure_browser(self):
+        """按需启动（或在崩溃后重启）Chromium"""
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            with span("browser.launch"):
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch()
+            self._idle_pages = {}
+
+    # ---------- 页面借还 ----------
+
+    async def _acquire_page(self, device_scale_factor):
+        idle = self._idle_pages.get(device_scale_factor)
+        while idle:
+            page = idle.pop()
+            if not page.is_closed():
+                return page
+        return await self._browser.new_page(device_scale_factor=device_scale_factor)
+
+    async def _release_page(self, page, device_scale_factor, healthy):
+        idle = self._idle_pages.setdefault(device_scale_factor, [])
+        if healthy and not page.is_closed() and len(idle) < self.max_pages:
+            idle.append(page)
+        elif not page.is_closed():
+            await page.close()
+
+    async def _run_job(self, job, device_scale_factor):
+        await self._ensure_browser()
+        async with self._semaphore:
+            page = await self._acquire_page(device_scale_factor)
+            healthy = False
+            try:
+                result = await job(page)
+                healthy = True
+                return result
+            finally:
+                # 出错的页面直接关掉，避免把脏状态留给下一次渲染
+                await self._release_page(page, device_scale_factor, healthy)
+
+    # ---------- 对外接口 ----------
+
+    def submit(self, job, device_scale_factor=2):
+        """
+        提交一个渲染任务，返回 concurrent.futures.Future
+        job: async 函数，参数为借到的 page，返回值即任务结果
+        """
+        self._ensure_started()
+        # 带上调用方的上下文，保证追踪 span 能正确嵌套
+        ctx = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def _on_done(task):
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def _schedule():
+            task = self._loop.create_task(self._run_job(job, device_scale_factor), context=ctx)
+            task.add_done_callback(_on_done)
+
+        self._loop.call_soon_threadsafe(_schedule)
+        return future
+
+    async def run(self, job, device_scale_factor=2):
+        """在任意事件循环中等待渲染任务完成"""
+        return await asyncio.wrap_future(self.submit(job, device_scale_factor))
+
+    def run_sync(self, job, device_scale_factor=2, timeout=None):
+        """同步等待渲染任务完成"""
+        return self.submit(job, device_scale_factor).result(timeout)
+
+    async def _shutdown(self):
+        for pages in self._idle_pages.values():
+            for page in pages:
+                if not page.is_closed():
+                    await page.close()
+        self._idle_pages = {}
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        """关闭浏览器和后台线程（进程退出时会自动调用）"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+        except Exception as e:
+            print(f"[浏览器池] 关闭失败: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool(max_pages=None):
+    """获取进程内共享的浏览器池（首次调用时创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(max_pages or DEFAULT_MAX_PAGES)
+            atexit.register(_pool.close)
+        elif max_pages and max_pages > _pool.max_pages and _pool._loop is None:
+            # 尚未启动时允许调大并发
+            _pool.max_pages = max_pages
+        return _pool
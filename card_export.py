@@ -6,6 +6,11 @@
 import re
 import os
 
+from markdown_bold import to_plain
+
+# 卡片文本的默认保存位置（card_generator 默认读取这个文件）
+CARD_TXT_FILE = "news_articles.txt"
+
 
 def generate_card_txt(articles: list, max_count: int = 5) -> str:
     """
@@ -53,9 +58,7 @@ def generate_card_txt(articles: list, max_count: int = 5) -> str:
 
 def remove_markdown_bold(text: str) -> str:
     """移除 Markdown 加粗格式 **text** -> text"""
-    if not text:
-        return text
-    return re.sub(r'\*\*(.+?)\*\*', r'\1', text)
+    return to_plain(text)
 
 
 def clean_content(text: str) -> str:
@@ -69,13 +72,11 @@ def clean_content(text: str) -> str:
     return text.strip()
 
 
-def save_card_txt(articles: list, filepath: str = "news_articles.txt", max_count: int = 5) -> str:
+def write_card_txt(txt_content: str, filepath: str = CARD_TXT_FILE) -> str:
     """
-    生成卡片 TXT 内容并保存到文件
+    把已生成的卡片 TXT 内容写入文件
     返回文件路径
     """
-    txt_content = generate_card_txt(articles, max_count)
-    
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(txt_content)
     
@@ -83,6 +84,14 @@ def save_card_txt(articles: list, filepath: str = "news_articles.txt", max_count
     return filepath
 
 
+def save_card_txt(articles: list, filepath: str = CARD_TXT_FILE, max_count: int = 5) -> str:
+    """
+    生成卡片 TXT 内容并保存到文件
+    返回文件路径
+    """
+    return write_card_txt(generate_card_txt(articles, max_count), filepath)
+
+
 def test_generate():
     """测试生成功能"""
     test_articles = [
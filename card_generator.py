@@ -6,27 +6,38 @@
 from pathlib import Path
 import os
 import json
-import time
 import asyncio
 import re
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 from jinja2 import Template
 import datetime
 import base64
-from openai import OpenAI
+from openai import AsyncOpenAI
+from tracing import span
+from browser_pool import get_browser_pool
+from disk_cache import JsonCache, content_hash
+from config import SUMMARY_CACHE_ENABLED, SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_ENTRIES
 
 # 加载环境变量
 load_dotenv()
 DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY")
 
-# 百炼 API 客户端（OpenAI 兼容模式）
-qwen_client = None
-if DASHSCOPE_API_KEY:
-    qwen_client = OpenAI(
-        api_key=DASHSCOPE_API_KEY,
-        base_url="https://dashscope.aliyuncs.com/compatible-mode/v1"
-    )
+# 百炼 API（OpenAI 兼容模式）
+DASHSCOPE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+SUMMARY_MODEL = "qwen-plus"
+
+# 同时请求总结的最大条数（百炼限流时调小）
+SUMMARY_CONCURRENCY = 5
+
+# 提示词版本：修改 LEAD_NEWS_PROMPT / CARD_NEWS_PROMPT 后加 1，旧的总结缓存即失效
+SUMMARY_PROMPT_VERSION = 1
+
+summary_cache = JsonCache(SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_ENTRIES)
+
+
+def new_qwen_client():
+    """创建异步客户端（每个事件循环各用各的，用完关闭）"""
+    return AsyncOpenAI(api_key=DASHSCOPE_API_KEY, base_url=DASHSCOPE_BASE_URL)
 
 
 def load_news_from_file(filepath="news_articles.txt"):
@@ -62,15 +73,8 @@ def parse_json_output(text_content):
         return None
 
 
-def summarize_news_with_qwen(content, max_retries=2):
-    """调用百炼 Qwen API 进行新闻总结（头条版，支持关键数据提取）"""
-    
-    if not qwen_client:
-        print("❌ 错误：百炼 API 客户端未初始化")
-        return None
-    
-    # 头条版提示词：内容总结 + 关键数据提取 + JSON 格式化
-    prompt = f"""你是一位资深的法律科技资讯主编。你的任务是根据新闻内容，生成结构清晰的总结，并以 JSON 格式输出。
+# 头条提示词：内容总结 + 关键数据提取 + JSON 格式化
+LEAD_NEWS_PROMPT = """你是一位资深的法律科技资讯主编。你的任务是根据新闻内容，生成结构清晰的总结，并以 JSON 格式输出。
 
 【新闻原文】
 {content}
@@ -113,38 +117,80 @@ def summarize_news_with_qwen(content, max_retries=2):
 4. key_data 中：label 是数据类别（如"融资金额"），value 是数值（如"500+"），unit 是单位（如"万美元"，无单位则为空字符串）
 5. 严格只输出 JSON 字符串，前后严禁添加任何描述性文字"""
 
+
+def summary_cache_key(kind, content):
+    """总结缓存键：(提示词版本, 头条/卡片, 模型, 原文哈希)"""
+    return content_hash(SUMMARY_PROMPT_VERSION, kind, SUMMARY_MODEL, content)
+
+
+async def _cached_summary(kind, content, client, max_tokens, label, max_retries, use_cache):
+    """先查总结缓存，未命中再请求百炼；只缓存成功的结果"""
+    key = summary_cache_key(kind, content)
+    if use_cache:
+        cached = summary_cache.get(key)
+        if cached is not None:
+            print(f"♻️ {label} 原文未变化，使用缓存的总结")
+            return cached
+
+    prompt = (LEAD_NEWS_PROMPT if kind == "lead" else CARD_NEWS_PROMPT).format(content=content)
+    if client is None:
+        async with new_qwen_client() as client:
+            result = await _request_summary(client, prompt, max_tokens, label, max_retries)
+    else:
+        result = await _request_summary(client, prompt, max_tokens, label, max_retries)
+
+    if result is not None:
+        summary_cache.put(key, result)
+    return result
+
+
+async def _request_summary(client, prompt, max_tokens, label, max_retries=2):
+    """请求一次总结并解析 JSON，失败按次数重试；全部失败返回 None"""
     for attempt in range(1, max_retries + 1):
-        print(f"⏳ 正在请求百炼 AI 总结新闻 (尝试 {attempt}/{max_retries})...")
+        print(f"⏳ {label} 正在请求百炼 AI 总结 (尝试 {attempt}/{max_retries})...")
         try:
-            response = qwen_client.chat.completions.create(
-                model="qwen-plus",
+            response = await client.chat.completions.create(
+                model=SUMMARY_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
             
             result_text = response.choices[0].message.content
             
             if not result_text:
-                print(f"❌ 百炼返回内容为空 (Attempt {attempt})")
+                print(f"❌ {label} 百炼返回内容为空 (Attempt {attempt})")
             else:
                 result = parse_json_output(result_text)
                 if result:
                     return result
                 else:
-                    print(f"⚠️ 解析失败，AI 原始返回内容如下:\n{result_text[:300]}...")
+                    print(f"⚠️ {label} 解析失败，AI 原始返回内容如下:\n{result_text[:300]}...")
 
         except Exception as e:
-            print(f"❌ 发生错误: {e}")
+            print(f"❌ {label} 发生错误: {e}")
 
         if attempt < max_retries:
-            print("🔄 准备重试...")
-            time.sleep(1)
+            print(f"🔄 {label} 准备重试...")
+            await asyncio.sleep(1)
 
-    print("❌ 所有重试均失败，跳过此条新闻。")
+    print(f"❌ {label} 所有重试均失败，跳过此条新闻。")
     return None
 
 
+async def summarize_news_async(content, client=None, max_retries=2, label="[头条]", use_cache=SUMMARY_CACHE_ENABLED):
+    """异步：头条版总结（支持关键数据提取）"""
+    return await _cached_summary("lead", content, client, 1000, label, max_retries, use_cache)
+
+
+def summarize_news_with_qwen(content, max_retries=2, use_cache=SUMMARY_CACHE_ENABLED):
+    """调用百炼 Qwen API 进行新闻总结（头条版，支持关键数据提取）"""
+    if not DASHSCOPE_API_KEY:
+        print("❌ 错误：百炼 API 客户端未初始化")
+        return None
+    return asyncio.run(summarize_news_async(content, max_retries=max_retries, use_cache=use_cache))
+
+
 # 2-5 条新闻的提示词（极简风格）
 CARD_NEWS_PROMPT = """# Role
 你是一位深谙"极简主义"美学的 LegalTech 科技媒体主编。你的特长是将枯燥的法律科技新闻，改写为"高信噪比"的社交媒体短讯。
@@ -178,45 +224,42 @@ CARD_NEWS_PROMPT = """# Role
 3. 严格只输出 JSON 字符串"""
 
 
-def summarize_card_news_with_qwen(content, max_retries=2):
+async def summarize_card_news_async(content, client=None, max_retries=2, label="[卡片]", use_cache=SUMMARY_CACHE_ENABLED):
+    """异步：极简卡片版总结（用于 2-5 条新闻）"""
+    return await _cached_summary("card", content, client, 500, label, max_retries, use_cache)
+
+
+def summarize_card_news_with_qwen(content, max_retries=2, use_cache=SUMMARY_CACHE_ENABLED):
     """调用百炼 Qwen API 进行新闻总结（极简卡片版，用于 2-5 条新闻）"""
-    
-    if not qwen_client:
+    if not DASHSCOPE_API_KEY:
         print("❌ 错误：百炼 API 客户端未初始化")
         return None
-    
-    prompt = CARD_NEWS_PROMPT.format(content=content)
-
-    for attempt in range(1, max_retries + 1):
-        print(f"⏳ 正在请求百炼 AI 总结新闻 [卡片版] (尝试 {attempt}/{max_retries})...")
-        try:
-            response = qwen_client.chat.completions.create(
-                model="qwen-plus",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            result_text = response.choices[0].message.content
-            
-            if result_text:
-                result = parse_json_output(result_text)
-                if result:
-                    return result
-                else:
-                    print(f"⚠️ 解析失败，AI 原始返回:\n{result_text[:300]}...")
-            else:
-                print(f"❌ 百炼返回内容为空 (Attempt {attempt})")
-
-        except Exception as e:
-            print(f"❌ 发生错误: {e}")
-
-        if attempt < max_retries:
-            print("🔄 准备重试...")
-            time.sleep(1)
-
-    print("❌ 所有重试均失败，跳过此条新闻。")
-    return None
+    return asyncio.run(summarize_card_news_async(content, max_retries=max_retries, use_cache=use_cache))
+
+
+async def summarize_all(news_list, concurrency=SUMMARY_CONCURRENCY, use_cache=SUMMARY_CACHE_ENABLED):
+    """
+    并发总结全部新闻：第 1 条用头条版，其余用卡片版
+    最多 concurrency 条同时请求，返回结果与 news_list 顺序一致（失败的位置为 None）
+    use_cache: 原文没变的文章直接用缓存的总结，不请求百炼
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with new_qwen_client() as client:
+        async def summarize_one(idx, content):
+            is_lead = idx == 1
+            async with semaphore:
+                with span("card.summarize", idx=idx, kind="lead" if is_lead else "card"):
+                    if is_lead:
+                        return await summarize_news_async(content, client, label="[头条]", use_cache=use_cache)
+                    return await summarize_card_news_async(
+                        content, client, label=f"[第 {idx} 条]", use_cache=use_cache
+                    )
+
+        with span("card.summarize_all", count=len(news_list), concurrency=concurrency):
+            return await asyncio.gather(*(
+                summarize_one(idx, content) for idx, content in enumerate(news_list, start=1)
+            ))
 
 
 # HTML 模板 - 新拟态风格
@@ -628,14 +671,13 @@ async def generate_news_card_from_data(news_data_list: list, output_path="daily_
         qr_code_path=qr_code_base64
     )
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(device_scale_factor=2)
-        
+    async def shoot(page):
         await page.set_content(rendered_html, wait_until="domcontentloaded")
         await page.locator(".container").screenshot(path=output_path, omit_background=True)
-        
-        await browser.close()
+
+    # 复用常驻浏览器（与 card_render 共享）
+    with span("card.screenshot", output=output_path):
+        await get_browser_pool().run(shoot, device_scale_factor=2)
     
     print(f"🎉 图片已生成并保存到: {output_path}")
     return output_path
@@ -660,7 +702,7 @@ def clean_ai_result(result):
     return result
 
 
-async def generate_card_from_file(input_file="news_articles.txt", output_file="daily_news_card.png", skip_review=False):
+async def generate_card_from_file(input_file="news_articles.txt", output_file="daily_news_card.png", skip_review=False, use_cache=SUMMARY_CACHE_ENABLED):
     """从文本文件生成卡片图片（完整流程，含人工确认环节）"""
     
     # 检查百炼 API Key
@@ -678,23 +720,13 @@ async def generate_card_from_file(input_file="news_articles.txt", output_file="d
     final_data = []
     print("🚀 开始调用百炼 AI 进行总结...")
     
-    # 2. 处理第一条新闻（头条，用原版提示词）
-    if news_list:
-        print("📰 处理头条新闻...")
-        lead_result = summarize_news_with_qwen(news_list[0])
-        if lead_result:
-            lead_result = clean_ai_result(lead_result)
-            final_data.append(lead_result)
-            print(f"✅ [头条] 已获取: {lead_result.get('main_title')}")
-    
-    # 3. 处理 2-5 条新闻（用极简卡片版提示词）
-    for i, content in enumerate(news_list[1:], start=2):
-        print(f"📰 处理第 {i} 条新闻...")
-        result = summarize_card_news_with_qwen(content)
+    # 2. 并发总结：第 1 条头条用原版提示词，2-5 条用极简卡片版提示词，结果保持原顺序
+    results = await summarize_all(news_list, use_cache=use_cache)
+    for i, result in enumerate(results, start=1):
         if result:
             result = clean_ai_result(result)
             final_data.append(result)
-            print(f"✅ [卡片] 已获取: {result.get('main_title')}")
+            print(f"✅ [{'头条' if i == 1 else '卡片'}] 已获取: {result.get('main_title')}")
 
     if not final_data:
         print("⚠️ 警告：所有新闻总结失败，未生成图片。")
@@ -759,9 +791,9 @@ async def generate_card_from_review(review_file="news_edit_review.json", output_
     return await generate_news_card_from_data(final_data, output_file, date_str)
 
 
-def run_card_generation(input_file="news_articles.txt", output_file="daily_news_card.png", skip_review=False):
+def run_card_generation(input_file="news_articles.txt", output_file="daily_news_card.png", skip_review=False, use_cache=SUMMARY_CACHE_ENABLED):
     """同步接口：生成卡片图片（完整流程，含人工确认）"""
-    return asyncio.run(generate_card_from_file(input_file, output_file, skip_review))
+    return asyncio.run(generate_card_from_file(input_file, output_file, skip_review, use_cache))
 
 
 def run_from_review(review_file="news_edit_review.json", output_file="daily_news_card.png", date_str=None):
@@ -772,7 +804,8 @@ def run_from_review(review_file="news_edit_review.json", output_file="daily_news
 if __name__ == "__main__":
     import sys
     
-    # 支持命令行参数
+    # 支持命令行参数（加 --no-cache 可忽略总结缓存，全部重新请求）
+    use_cache = SUMMARY_CACHE_ENABLED and "--no-cache" not in sys.argv
     if len(sys.argv) > 1 and sys.argv[1] == "--from-review":
         # 从已编辑的 JSON 生成：python card_generator.py --from-review
         print("📄 从 news_edit_review.json 生成卡片...")
@@ -780,8 +813,8 @@ if __name__ == "__main__":
     elif len(sys.argv) > 1 and sys.argv[1] == "--skip-review":
         # 跳过人工确认：python card_generator.py --skip-review
         print("⚡ 跳过人工确认，直接生成...")
-        run_card_generation(skip_review=True)
+        run_card_generation(skip_review=True, use_cache=use_cache)
     else:
         # 默认完整流程（含人工确认）
-        run_card_generation()
+        run_card_generation(use_cache=use_cache)
 
@@ -9,6 +9,29 @@
     python card_render.py --data xxx.json           # 指定数据
     python card_render.py --output xxx.png          # 指定输出
     python card_render.py --date 12月17日           # 指定日期
+    python card_render.py --batch jobs.json         # 批量渲染（一个浏览器、多页面并发）
+    python card_render.py --batch jobs.json -j 8    # 指定并发页面数
+    python card_render.py --backend pil             # 不启动浏览器，用 Pillow 直接绘制（仅 v2 版式）
+    python card_render.py --no-cache                # 忽略渲染缓存，强制重新生成
+    python card_render.py --watch                   # 监听模板/数据变化，保存即出图（Ctrl+C 退出）
+    python card_render.py --outputs png@2x,jpeg@1x,webp@3x,thumb   # 截图一次，导出多种格式和尺寸
+
+多格式输出 (--outputs):
+    逗号分隔，每项为 <格式>@<倍数>x 或 <格式>@<宽度>w，格式支持 png / jpeg / webp，
+    thumb 等同于 jpeg@360w。按最大倍数截图一次，其余尺寸由 Pillow 缩放编码，
+    文件名形如 daily_news_card@2x.png、daily_news_card_360w.jpg
+
+渲染缓存:
+    模板、数据、图片资源和渲染参数都没变时，直接从 .card_cache/ 复制上次的 PNG，
+    目录超过上限时淘汰最久未用的图片（见 config.py 的 CARD_CACHE_*）
+
+批量清单格式 (jobs.json):
+    [
+        {"template": "card_template_v2.html", "data": "news_1216.json", "date": "12月16日", "output": "card_1216.png"},
+        {"template": "card_template_v*.html", "output": "review_{template}.png"}
+    ]
+    - 每个字段都可省略，省略时使用命令行默认值
+    - template 支持通配符，会展开成多个任务；output 可用 {template} 占位（模板文件名，不含扩展名）
 """
 
 import asyncio
@@ -17,9 +40,23 @@ import re
 import base64
 import datetime
 import argparse
+import concurrent.futures
+import glob
+import io
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
-from playwright.async_api import async_playwright
 from jinja2 import Environment
+from tracing import span
+from browser_pool import get_browser_pool
+from asset_server import get_asset_server
+from disk_cache import FileCache, content_hash, write_bytes_atomic
+from config import CARD_CACHE_ENABLED, CARD_CACHE_DIR, CARD_CACHE_MAX_ENTRIES
+
+# 截图倍率（与 generate_png 的 device_scale_factor 一致）
+DEVICE_SCALE_FACTOR = 2
 
 
 def load_json_data(json_file="news_edit_review.json"):
@@ -43,6 +80,16 @@ def regex_replace_filter(value, pattern, replacement):
     return re.sub(pattern, replacement, str(value))
 
 
+PLACEHOLDER_IMAGE = "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+
+# 模板变量名 -> (候选路径, 显示名称)
+CARD_ASSETS = {
+    "qr_code_path": (["qrcode.png", "card_assets/qrcode.png"], "二维码"),
+    "scale_icon": (["scale_icon.png", "card_assets/scale_icon.png"], "天平图标"),
+    "calendar_icon": (["calendar_icon.png", "card_assets/calendar_icon.png"], "日历图标"),
+}
+
+
 def load_image_base64(paths, name="图片"):
     """读取图片转 Base64"""
     for img_path in paths:
@@ -54,53 +101,210 @@ def load_image_base64(paths, name="图片"):
         except FileNotFoundError:
             continue
     print(f"   [警告] 未找到{name}，使用占位图")
-    return "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+    return PLACEHOLDER_IMAGE
+
+
+WEEKDAY_NAMES = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
+
+
+def resolve_date_strings(date_str=None, weekday_str=None):
+    """补齐卡片上显示的日期和星期（未指定时取今天）"""
+    now = datetime.datetime.now()
+    if not date_str:
+        date_str = now.strftime("%m月%d日")
+    if not weekday_str:
+        weekday_str = WEEKDAY_NAMES[now.weekday()]
+    return date_str, weekday_str
+
+
+def _file_version(path):
+    """文件版本标识（修改时间 + 大小），文件不存在返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class RenderContext:
+    """
+    渲染上下文：缓存编译后的模板、新闻数据和图片资源
+    - 模板、数据按 (文件路径, 修改时间) 缓存，美术改了模板会自动重新编译
+    - 图片按 (文件路径, 修改时间) 缓存原始数据，data URI / 本地服务 URL 按需生成一次
+    批量渲染、重复渲染共用同一个上下文即可跳过重复的 I/O 和编译
+    """
+
+    MAX_STRING_TEMPLATES = 16
+
+    def __init__(self):
+        self.env = Environment()
+        self.env.filters['regex_replace'] = regex_replace_filter
+        self._file_templates = {}    # path -> (version, template)
+        self._string_templates = {}  # content -> template
+        self._assets = {}            # 变量名 -> (path, version, data_uri)
+        self._data = {}              # path -> (version, news_items)
+        self._bytes = {}             # path -> (version, 文件内容)
+
+    def get_bytes(self, path):
+        """读取文件原始内容（按修改时间缓存），文件不存在返回 None"""
+        version = _file_version(path)
+        if version is None:
+            return None
+        cached = self._bytes.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        with open(path, "rb") as f:
+            data = f.read()
+        self._bytes[path] = (version, data)
+        return data
+
+    def get_template(self, html_file):
+        """读取并编译模板文件（按修改时间缓存）"""
+        version = _file_version(html_file)
+        cached = self._file_templates.get(html_file)
+        if cached and version is not None and cached[0] == version:
+            return cached[1]
+        template = self.env.from_string(load_html_template(html_file))
+        self._file_templates[html_file] = (version, template)
+        return template
+
+    def get_data(self, json_file):
+        """读取新闻 JSON（按修改时间缓存）"""
+        version = _file_version(json_file)
+        cached = self._data.get(json_file)
+        if cached and version is not None and cached[0] == version:
+            return cached[1]
+        news_items = load_json_data(json_file)
+        self._data[json_file] = (version, news_items)
+        return news_items
+
+    def from_string(self, template_content):
+        """编译模板字符串（按内容缓存）"""
+        template = self._string_templates.get(template_content)
+        if template is None:
+            if len(self._string_templates) >= self.MAX_STRING_TEMPLATES:
+                self._string_templates.pop(next(iter(self._string_templates)))
+            template = self.env.from_string(template_content)
+            self._string_templates[template_content] = template
+        return template
+
+    def _load_asset(self, key):
+        """读取图片原始数据（按修改时间缓存），找不到返回 None"""
+        paths, name = CARD_ASSETS[key]
+        for path in paths:
+            version = _file_version(path)
+            if version is None:
+                continue
+            cached = self._assets.get(key)
+            if cached and cached["path"] == path and cached["version"] == version:
+                return cached
+            with open(path, "rb") as f:
+                data = f.read()
+            print(f"   [OK] 已加载{name}: {path}")
+            cached = {"path": path, "version": version, "data": data}
+            self._assets[key] = cached
+            return cached
+        print(f"   [警告] 未找到{name}，使用占位图")
+        return None
+
+    def get_asset(self, key):
+        """获取图片 data URI（内联到 HTML，适合单独保存的 HTML）"""
+        asset = self._load_asset(key)
+        if asset is None:
+            return PLACEHOLDER_IMAGE
+        if "data_uri" not in asset:
+            asset["data_uri"] = f"data:image/png;base64,{base64.b64encode(asset['data']).decode()}"
+        return asset["data_uri"]
+
+    def get_asset_url(self, key):
+        """获取图片的本地服务 URL（HTML 保持精简，浏览器可缓存已解码的图片）"""
+        asset = self._load_asset(key)
+        if asset is None:
+            return PLACEHOLDER_IMAGE
+        if "url" not in asset:
+            asset["url"] = get_asset_server().publish(os.path.basename(asset["path"]), asset["data"], "image/png")
+        return asset["url"]
+
+    def get_assets(self, inline=True):
+        """模板用到的全部图片资源（inline=False 时返回本地服务 URL）"""
+        if inline:
+            return {key: self.get_asset(key) for key in CARD_ASSETS}
+        return {key: self.get_asset_url(key) for key in CARD_ASSETS}
+
+    def cache_key(self, template_file, json_file, date_str, weekday_str, padding_top, padding_bottom, backend,
+                  scale=DEVICE_SCALE_FACTOR):
+        """
+        渲染结果的缓存键：模板 + 数据 + 图片资源 + 渲染参数的内容哈希
+        Pillow 后端不读模板，改用绘制代码本身参与哈希
+        """
+        if backend == "pil":
+            source = self.get_bytes(os.path.join(os.path.dirname(os.path.abspath(__file__)), "card_render_pil.py"))
+        else:
+            source = self.get_bytes(template_file)
+        assets = []
+        for key in CARD_ASSETS:
+            asset = self._load_asset(key)
+            assets.append(asset["data"] if asset else None)
+        params = {
+            "date": date_str,
+            "weekday": weekday_str,
+            "padding_top": padding_top,
+            "padding_bottom": padding_bottom,
+            "scale": scale,
+            "backend": backend,
+        }
+        return content_hash(source, self.get_bytes(json_file), *assets, params)
+
+    def render(self, template, news_items, date_str=None, weekday_str=None, inline_assets=True):
+        """渲染已编译的模板"""
+        date_str, weekday_str = resolve_date_strings(date_str, weekday_str)
+        return template.render(
+            news_items=news_items,
+            date_str=date_str,
+            weekday_str=weekday_str,
+            **self.get_assets(inline_assets)
+        )
+
+
+# 进程内共享的默认上下文
+default_context = RenderContext()
+
+# 渲染结果缓存（PNG）
+render_cache = FileCache(CARD_CACHE_DIR, CARD_CACHE_MAX_ENTRIES, suffix=".png")
 
 
 def get_qr_code_base64():
     """读取二维码转 Base64"""
-    return load_image_base64(["qrcode.png", "card_assets/qrcode.png"], "二维码")
+    return default_context.get_asset("qr_code_path")
 
 
 def get_scale_icon_base64():
     """读取天平图标转 Base64"""
-    return load_image_base64(["scale_icon.png", "card_assets/scale_icon.png"], "天平图标")
+    return default_context.get_asset("scale_icon")
 
 
 def get_calendar_icon_base64():
     """读取日历图标转 Base64"""
-    return load_image_base64(["calendar_icon.png", "card_assets/calendar_icon.png"], "日历图标")
+    return default_context.get_asset("calendar_icon")
 
 
-def render_template(template_content, news_items, date_str=None, weekday_str=None):
-    """使用 Jinja2 渲染模板"""
-    # 设置 Jinja2 环境
-    env = Environment()
-    env.filters['regex_replace'] = regex_replace_filter
-    template = env.from_string(template_content)
-    
-    # 准备日期
-    now = datetime.datetime.now()
-    if not date_str:
-        date_str = now.strftime("%m月%d日")
-    if not weekday_str:
-        weekday_map = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
-        weekday_str = weekday_map[now.weekday()]
-    
-    # 渲染
-    rendered = template.render(
-        news_items=news_items,
-        date_str=date_str,
-        weekday_str=weekday_str,
-        qr_code_path=get_qr_code_base64(),
-        scale_icon=get_scale_icon_base64(),
-        calendar_icon=get_calendar_icon_base64()
-    )
-    
-    return rendered
+def render_template(template_content, news_items, date_str=None, weekday_str=None, context=None):
+    """使用 Jinja2 渲染模板字符串"""
+    context = context or default_context
+    template = context.from_string(template_content)
+    return context.render(template, news_items, date_str, weekday_str)
 
 
-async def generate_png(html_content, output_path="daily_news_card.png", padding_top=50, padding_bottom=80):
+async def _apply_padding(page, padding_top, padding_bottom):
+    """给 .container 加上额外的上下边距"""
+    await page.evaluate(f"""
+        const container = document.querySelector('.container');
+        container.style.paddingTop = '{padding_top}px';
+        container.style.paddingBottom = '{padding_bottom}px';
+    """)
+
+
+async def generate_png(html_content, output_path="daily_news_card.png", padding_top=50, padding_bottom=80, scale=DEVICE_SCALE_FACTOR):
     """用 Playwright 截图生成 PNG
     
     Args:
@@ -108,23 +312,21 @@ async def generate_png(html_content, output_path="daily_news_card.png", padding_
         output_path: 输出图片路径
         padding_top: 顶部额外边距 (像素)
         padding_bottom: 底部额外边距 (像素)
+        scale: 截图倍率 (device_scale_factor)
     """
     print(f"[图片] 生成图片: {output_path}")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(device_scale_factor=2)
-        await page.set_content(html_content, wait_until="domcontentloaded")
+    async def shoot(page):
+        # 图片走本地资源服务，需要等 load 事件保证图片已加载
+        await page.set_content(html_content, wait_until="load")
         
         # 添加额外的上下边距
-        await page.evaluate(f"""
-            const container = document.querySelector('.container');
-            container.style.paddingTop = '{padding_top}px';
-            container.style.paddingBottom = '{padding_bottom}px';
-        """)
+        await _apply_padding(page, padding_top, padding_bottom)
         
         await page.locator(".container").screenshot(path=output_path, omit_background=True)
-        await browser.close()
+    
+    # 复用常驻浏览器，只付页面准备的开销
+    await get_browser_pool().run(shoot, device_scale_factor=scale)
     
     print(f"[完成] 已保存到: {output_path}")
     return output_path
@@ -137,32 +339,419 @@ async def render_card(
     date_str=None,
     weekday_str=None,
     padding_top=50,
-    padding_bottom=80
+    padding_bottom=80,
+    context=None,
+    inline_assets=False,
+    backend="chromium",
+    use_cache=CARD_CACHE_ENABLED,
+    scale=DEVICE_SCALE_FACTOR
 ):
-    """主渲染函数"""
+    """主渲染函数
+
+    inline_assets: True 时图片以 Base64 内联进 HTML；默认走本地资源服务
+    backend: chromium（浏览器截图，支持任意模板）或 pil（Pillow 直接绘制，仅 v2 版式，无需浏览器）
+    use_cache: 输入都没变时直接复用 .card_cache/ 中上次的 PNG
+    scale: 截图倍率（默认 2 倍图）
+    """
+    context = context or default_context
     print("\n" + "="*50)
     print("开始渲染卡片")
     print("="*50)
     
-    # 1. 读取数据
-    news_items = load_json_data(json_file)
-    
-    # 2. 读取模板
-    template_content = load_html_template(template_file)
-    
-    # 3. 渲染 HTML
-    rendered_html = render_template(template_content, news_items, date_str, weekday_str)
-    
-    # 4. 生成 PNG
-    result = await generate_png(rendered_html, output_file, padding_top, padding_bottom)
+    with span("card.render", template=template_file, output=output_file) as attrs:
+        # 0. 查渲染缓存（日期为空时按今天补齐，保证缓存键与实际显示一致）
+        date_str, weekday_str = resolve_date_strings(date_str, weekday_str)
+        cache_key = None
+        if use_cache:
+            with span("card.cache_lookup"):
+                cache_key = context.cache_key(
+                    template_file, json_file, date_str, weekday_str, padding_top, padding_bottom, backend, scale
+                )
+                hit = render_cache.get(cache_key, output_file)
+            attrs["cache_hit"] = bool(hit)
+            if hit:
+                print(f"[缓存] 输入未变化，直接复用: {output_file}")
+                print("="*50 + "\n")
+                return output_file
+        
+        # 1. 读取数据（未修改时直接用缓存）
+        news_items = context.get_data(json_file)
+        
+        if backend == "pil":
+            # Pillow 后端按 v2 版式硬编码绘制，不读取 HTML 模板
+            import card_render_pil
+            if Path(template_file).name != "card_template_v2.html":
+                print(f"   [提示] Pillow 后端只实现了 card_template_v2 版式，忽略模板 {template_file}")
+            with span("card.pil"):
+                # 放到线程里绘制，批量渲染时不阻塞事件循环（并发上限仍由调用方的信号量控制）
+                result = await asyncio.to_thread(
+                    card_render_pil.render_png,
+                    news_items, output_file, date_str, weekday_str, padding_top, padding_bottom,
+                    scale=scale
+                )
+            if cache_key:
+                render_cache.put(cache_key, output_file)
+            print("="*50 + "\n")
+            return result
+        
+        # 2. 编译模板并渲染 HTML（未修改时直接用缓存）
+        with span("card.template"):
+            template = context.get_template(template_file)
+            rendered_html = context.render(template, news_items, date_str, weekday_str, inline_assets)
+        
+        # 3. 生成 PNG
+        with span("card.screenshot"):
+            result = await generate_png(rendered_html, output_file, padding_top, padding_bottom, scale)
+        if cache_key:
+            render_cache.put(cache_key, output_file)
     
     print("="*50 + "\n")
     return result
 
 
-def run(template="card_template_v2.html", data="news_edit_review.json", output="daily_news_card.png", date=None, weekday=None, padding_top=50, padding_bottom=80):
+def run(template="card_template_v2.html", data="news_edit_review.json", output="daily_news_card.png", date=None, weekday=None, padding_top=50, padding_bottom=80, inline_assets=False, backend="chromium", use_cache=CARD_CACHE_ENABLED):
     """同步入口"""
-    return asyncio.run(render_card(template, data, output, date, weekday, padding_top, padding_bottom))
+    return asyncio.run(render_card(template, data, output, date, weekday, padding_top, padding_bottom, inline_assets=inline_assets, backend=backend, use_cache=use_cache))
+
+
+# ================= 多格式输出 =================
+
+# 格式名 -> (Pillow 格式, 扩展名, 保存参数)
+OUTPUT_FORMATS = {
+    "png": ("PNG", ".png", {}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 90, "optimize": True, "progressive": True}),
+    "jpg": ("JPEG", ".jpg", {"quality": 90, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", ".webp", {"quality": 90, "method": 4}),
+}
+OUTPUT_ALIASES = {"thumb": "jpeg@360w"}
+_OUTPUT_SPEC_PATTERN = re.compile(r'^(\w+)@(\d+(?:\.\d+)?)([xw])$')
+
+
+def parse_output_specs(spec, output_file="daily_news_card.png"):
+    """
+    解析 --outputs 规格，如 "png@2x,jpeg@1x,webp@3x,thumb"
+    返回: [{"format", "scale" 或 "width", "path"}, ...]
+    """
+    stem = str(Path(output_file).with_suffix(""))
+    variants = []
+    for item in (part.strip().lower() for part in spec.split(",")):
+        if not item:
+            continue
+        item = OUTPUT_ALIASES.get(item, item)
+        match = _OUTPUT_SPEC_PATTERN.match(item)
+        if not match or match.group(1) not in OUTPUT_FORMATS:
+            raise ValueError(f"无法识别的输出规格: {item}（示例: png@2x、webp@3x、jpeg@360w、thumb）")
+        fmt, number, unit = match.groups()
+        ext = OUTPUT_FORMATS[fmt][1]
+        if unit == "x":
+            scale = float(number)
+            label = f"{scale:g}"
+            variants.append({"format": fmt, "scale": scale, "path": f"{stem}@{label}x{ext}"})
+        else:
+            width = int(float(number))
+            variants.append({"format": fmt, "width": width, "path": f"{stem}_{width}w{ext}"})
+    if not variants:
+        raise ValueError("--outputs 至少需要一项")
+    return variants
+
+
+def encode_variant(master_png, master_scale, variant):
+    """
+    把母版 PNG 缩放、编码为一个输出文件（在线程池中执行，Pillow 编码时会释放 GIL）
+    返回: 输出路径
+    """
+    from PIL import Image
+
+    pil_format, _, save_options = OUTPUT_FORMATS[variant["format"]]
+    with Image.open(io.BytesIO(master_png)) as image:
+        image.load()
+        if "width" in variant:
+            width = variant["width"]
+        else:
+            width = round(image.width * variant["scale"] / master_scale)
+        if width != image.width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if pil_format == "JPEG" and image.mode in ("RGBA", "LA", "P"):
+            # JPEG 没有透明通道，铺白底
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        image.save(variant["path"], pil_format, **save_options)
+    print(f"   [OK] {variant['path']}")
+    return variant["path"]
+
+
+async def render_outputs(
+    template_file="card_template_v2.html",
+    json_file="news_edit_review.json",
+    output_file="daily_news_card.png",
+    outputs="png@2x",
+    date_str=None,
+    weekday_str=None,
+    padding_top=50,
+    padding_bottom=80,
+    context=None,
+    inline_assets=False,
+    backend="chromium",
+    use_cache=CARD_CACHE_ENABLED,
+    max_workers=None
+):
+    """
+    一次截图，导出多种格式和尺寸
+    按所需的最大倍数渲染母版 PNG（同样走渲染缓存），再在线程池里并行缩放、编码各个输出
+    返回: 输出路径列表（与 outputs 顺序一致）
+    """
+    variants = parse_output_specs(outputs, output_file) if isinstance(outputs, str) else outputs
+    master_scale = max([v["scale"] for v in variants if "scale" in v] or [DEVICE_SCALE_FACTOR])
+
+    with span("card.outputs", outputs=len(variants), scale=master_scale):
+        directory = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, master_path = tempfile.mkstemp(dir=directory, prefix=".master-", suffix=".png")
+        os.close(fd)
+        try:
+            await render_card(
+                template_file, json_file, master_path, date_str, weekday_str, padding_top, padding_bottom,
+                context=context, inline_assets=inline_assets, backend=backend, use_cache=use_cache,
+                scale=master_scale
+            )
+            with open(master_path, "rb") as f:
+                master_png = f.read()
+        finally:
+            os.remove(master_path)
+
+        print(f"[导出] 由 {master_scale:g}x 母版生成 {len(variants)} 个文件")
+        loop = asyncio.get_running_loop()
+        with concurrent.futures.ThreadPoolExecutor(max_workers or min(len(variants), os.cpu_count() or 4)) as pool:
+            with span("card.encode"):
+                return await asyncio.gather(*(
+                    loop.run_in_executor(pool, encode_variant, master_png, master_scale, variant)
+                    for variant in variants
+                ))
+
+
+def run_outputs(outputs, template="card_template_v2.html", data="news_edit_review.json", output="daily_news_card.png", date=None, weekday=None, padding_top=50, padding_bottom=80, inline_assets=False, backend="chromium", use_cache=CARD_CACHE_ENABLED):
+    """同步入口：多格式输出"""
+    return asyncio.run(render_outputs(template, data, output, outputs, date, weekday, padding_top, padding_bottom, inline_assets=inline_assets, backend=backend, use_cache=use_cache))
+
+
+def load_batch_manifest(manifest_file, defaults):
+    """
+    读取批量清单，展开模板通配符，补齐默认值
+    defaults: {"template", "data", "output", "date", "weekday", "padding_top", "padding_bottom"}
+    返回: 任务列表
+    """
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        manifest = manifest.get("jobs", [])
+
+    jobs = []
+    for entry in manifest:
+        job = {**defaults, **entry}
+        pattern = job["template"]
+        templates = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not templates:
+            print(f"   [警告] 没有匹配的模板: {pattern}")
+        for template in templates:
+            expanded = dict(job, template=template)
+            expanded["output"] = job["output"].format(template=Path(template).stem)
+            jobs.append(expanded)
+
+    # 同一个输出路径被多个任务占用时，后写的会覆盖先写的
+    outputs = [job["output"] for job in jobs]
+    duplicates = {o for o in outputs if outputs.count(o) > 1}
+    if duplicates:
+        print(f"   [警告] 以下输出文件被多个任务使用，将相互覆盖: {', '.join(sorted(duplicates))}")
+    return jobs
+
+
+async def render_batch(jobs, concurrency=4):
+    """
+    批量渲染：所有任务共用一个浏览器，最多 concurrency 个页面同时截图
+    返回: [(job, 输出路径或异常), ...]
+    """
+    if any(job.get("backend", "chromium") == "chromium" for job in jobs):
+        get_browser_pool(max_pages=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def render_one(job):
+        async with semaphore:
+            if job.get("outputs"):
+                return await render_outputs(
+                    job["template"], job["data"], job["output"], job["outputs"],
+                    job.get("date"), job.get("weekday"),
+                    job.get("padding_top", 50), job.get("padding_bottom", 80),
+                    inline_assets=job.get("inline_assets", False),
+                    backend=job.get("backend", "chromium"),
+                    use_cache=job.get("use_cache", CARD_CACHE_ENABLED)
+                )
+            return await render_card(
+                job["template"], job["data"], job["output"],
+                job.get("date"), job.get("weekday"),
+                job.get("padding_top", 50), job.get("padding_bottom", 80),
+                inline_assets=job.get("inline_assets", False),
+                backend=job.get("backend", "chromium"),
+                use_cache=job.get("use_cache", CARD_CACHE_ENABLED)
+            )
+
+    with span("card.batch", jobs=len(jobs), concurrency=concurrency):
+        results = await asyncio.gather(*(render_one(job) for job in jobs), return_exceptions=True)
+
+    failed = [(job, r) for job, r in zip(jobs, results) if isinstance(r, BaseException)]
+    print(f"[批量] 完成 {len(jobs) - len(failed)}/{len(jobs)} 张")
+    for job, error in failed:
+        print(f"   [失败] {job['template']} + {job['data']} → {job['output']}: {error}")
+    return list(zip(jobs, results))
+
+
+def run_batch(manifest, concurrency=4, **defaults):
+    """同步入口：批量渲染"""
+    base = {
+        "template": "card_template_v2.html",
+        "data": "news_edit_review.json",
+        "output": "daily_news_card.png",
+        "date": None,
+        "weekday": None,
+        "padding_top": 50,
+        "padding_bottom": 80,
+        "inline_assets": False,
+        "backend": "chromium",
+        "use_cache": CARD_CACHE_ENABLED,
+        "outputs": None,
+    }
+    base.update({k: v for k, v in defaults.items() if v is not None})
+    jobs = load_batch_manifest(manifest, base)
+    return asyncio.run(render_batch(jobs, concurrency))
+
+
+_BODY_PATTERN = re.compile(r'<body[^>]*>(.*)</body>', re.S | re.I)
+
+# 替换 body 后等待新插入的图片加载完成
+_REPLACE_BODY_JS = """
+async (html) => {
+    document.body.innerHTML = html;
+    await Promise.all(Array.from(document.images)
+        .filter(img => !img.complete)
+        .map(img => new Promise(resolve => { img.onload = img.onerror = resolve; })));
+}
+"""
+
+
+def _split_html(html):
+    """拆成 (body 之外的部分, body 内容)，用于判断能否只替换 body"""
+    match = _BODY_PATTERN.search(html)
+    if not match:
+        return html, None
+    return html[:match.start(1)] + html[match.end(1):], match.group(1)
+
+
+def _watched_versions(template_file, json_file):
+    """模板、数据、图片资源的版本标识，任意一个变了就需要重新渲染"""
+    paths = [template_file, json_file] + [path for paths, _ in CARD_ASSETS.values() for path in paths]
+    return tuple(_file_version(path) for path in paths)
+
+
+async def _watch_page(page, template_file, json_file, output_file, date_str, weekday_str,
+                      padding_top, padding_bottom, interval, stop_event, context):
+    """监听循环：在借到的页面上反复渲染，直到 stop_event 被设置"""
+    loop = asyncio.get_running_loop()
+    last_versions = None
+    last_head, last_body = None, None
+    pending_write = None
+
+    while not stop_event.is_set():
+        versions = _watched_versions(template_file, json_file)
+        if versions == last_versions:
+            await asyncio.sleep(interval)
+            continue
+        last_versions = versions
+
+        start = time.perf_counter()
+        try:
+            news_items = context.get_data(json_file)
+            template = context.get_template(template_file)
+            html = context.render(template, news_items, date_str, weekday_str, inline_assets=False)
+        except Exception as e:
+            # 设计师保存到一半、模板语法错误时不退出，等下一次保存
+            print(f"[预览] 渲染失败，等待下次修改: {e}")
+            continue
+
+        head, body = _split_html(html)
+        if head == last_head and body == last_body:
+            print("[预览] 内容无变化，跳过")
+            continue
+
+        try:
+            with span("card.watch_render", template=template_file):
+                if head == last_head and body is not None:
+                    mode = "仅更新 body"
+                    await page.evaluate(_REPLACE_BODY_JS, body)
+                else:
+                    mode = "整页加载"
+                    await page.set_content(html, wait_until="load")
+                await _apply_padding(page, padding_top, padding_bottom)
+                png = await page.locator(".container").screenshot(omit_background=True)
+        except Exception as e:
+            # 模板里没有 .container、脚本报错等：页面状态不可信，下次保存时整页重新加载
+            print(f"[预览] 截图失败，等待下次修改: {e}")
+            last_head, last_body = None, None
+            continue
+        last_head, last_body = head, body
+
+        # 保证写入顺序：上一张没写完先等它
+        if pending_write is not None:
+            await pending_write
+        # 写临时文件再替换，看图软件不会读到写了一半的 PNG
+        pending_write = loop.run_in_executor(None, write_bytes_atomic, output_file, png)
+        print(f"[预览] {time.strftime('%H:%M:%S')} {mode}，{(time.perf_counter() - start) * 1000:.0f} ms → {output_file}")
+
+    if pending_write is not None:
+        await pending_write
+
+
+def watch_card(
+    template_file="card_template_v2.html",
+    json_file="news_edit_review.json",
+    output_file="daily_news_card.png",
+    date_str=None,
+    weekday_str=None,
+    padding_top=50,
+    padding_bottom=80,
+    interval=0.3,
+    stop_event=None,
+    context=None
+):
+    """
+    监听模式：常驻一个页面，模板/数据/图片变化时重新出图
+    - 渲染结果和上一次相同则跳过
+    - 只有 body 变化时直接替换 body，不重新加载整页（样式、图片都不用重新解析）
+    - 截图拿到字节后在后台线程写文件，不阻塞下一次渲染
+    返回: concurrent.futures.Future，设置 stop_event 后结束
+    """
+    context = context or default_context
+    stop_event = stop_event or threading.Event()
+    print(f"[预览] 监听 {template_file} + {json_file}，保存即出图（Ctrl+C 退出）")
+    return get_browser_pool().submit(
+        lambda page: _watch_page(
+            page, template_file, json_file, output_file, date_str, weekday_str,
+            padding_top, padding_bottom, interval, stop_event, context
+        ),
+        device_scale_factor=DEVICE_SCALE_FACTOR
+    )
+
+
+def run_watch(template="card_template_v2.html", data="news_edit_review.json", output="daily_news_card.png", date=None, weekday=None, padding_top=50, padding_bottom=80, interval=0.3):
+    """同步入口：监听模式，Ctrl+C 退出"""
+    stop_event = threading.Event()
+    future = watch_card(template, data, output, date, weekday, padding_top, padding_bottom, interval, stop_event)
+    try:
+        future.result()
+    except KeyboardInterrupt:
+        stop_event.set()
+        future.result(timeout=10)
+        print("\n[预览] 已退出")
 
 
 if __name__ == "__main__":
@@ -208,15 +797,103 @@ if __name__ == "__main__":
         help='底部边距像素 (默认: 80)'
     )
     
+    parser.add_argument(
+        '--inline-assets',
+        action='store_true',
+        help='图片以 Base64 内联进 HTML（默认通过本地资源服务加载）'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['chromium', 'pil'],
+        default='chromium',
+        help='渲染后端: chromium 浏览器截图 / pil 直接绘制，不启动浏览器 (默认: chromium)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='忽略渲染缓存，强制重新生成'
+    )
+    parser.add_argument(
+        '--outputs',
+        type=str,
+        help='一次截图导出多种格式/尺寸，如 png@2x,jpeg@1x,webp@3x,thumb'
+    )
+    parser.add_argument(
+        '-w', '--watch',
+        action='store_true',
+        help='监听模式：模板/数据/图片保存后自动重新出图'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=0.3,
+        help='监听模式下检查文件变化的间隔秒数 (默认: 0.3)'
+    )
+    parser.add_argument(
+        '-b', '--batch',
+        type=str,
+        help='批量清单 JSON 文件，一次渲染多组 (模板, 数据, 日期, 输出)'
+    )
+    parser.add_argument(
+        '-j', '--concurrency',
+        type=int,
+        default=4,
+        help='批量模式下同时渲染的页面数 (默认: 4)'
+    )
+    
     args = parser.parse_args()
     
-    run(
-        template=args.template,
-        data=args.data,
-        output=args.output,
-        date=args.date,
-        weekday=args.weekday,
-        padding_top=args.padding_top,
-        padding_bottom=args.padding_bottom
-    )
-
+    if args.watch:
+        run_watch(
+            template=args.template,
+            data=args.data,
+            output=args.output,
+            date=args.date,
+            weekday=args.weekday,
+            padding_top=args.padding_top,
+            padding_bottom=args.padding_bottom,
+            interval=args.interval
+        )
+    elif args.batch:
+        run_batch(
+            args.batch,
+            concurrency=args.concurrency,
+            template=args.template,
+            data=args.data,
+            output=args.output,
+            date=args.date,
+            weekday=args.weekday,
+            padding_top=args.padding_top,
+            padding_bottom=args.padding_bottom,
+            inline_assets=args.inline_assets,
+            backend=args.backend,
+            use_cache=CARD_CACHE_ENABLED and not args.no_cache,
+            outputs=args.outputs
+        )
+    elif args.outputs:
+        run_outputs(
+            args.outputs,
+            template=args.template,
+            data=args.data,
+            output=args.output,
+            date=args.date,
+            weekday=args.weekday,
+            padding_top=args.padding_top,
+            padding_bottom=args.padding_bottom,
+            inline_assets=args.inline_assets,
+            backend=args.backend,
+            use_cache=CARD_CACHE_ENABLED and not args.no_cache
+        )
+    else:
+        run(
+            template=args.template,
+            data=args.data,
+            output=args.output,
+            date=args.date,
+            weekday=args.weekday,
+            padding_top=args.padding_top,
+            padding_bottom=args.padding_bottom,
+            inline_assets=args.inline_assets,
+            backend=args.backend,
+            use_cache=CARD_CACHE_ENABLED and not args.no_cache
+        )
@@ -0,0 +1,772 @@
+"""
+卡片快速渲染模块（Pillow 后端）
+不启动浏览器，直接按 card_template_v2.html 的版式把 JSON 数据画成 PNG，
+单张卡片通常在一秒内完成。
+
+与 Chromium 后端使用同一份数据结构：
+    main_title / abstract_summary / key_data / bullet_points
+
+用法:
+    python card_render.py --backend pil                    # 通过 card_render 选择后端
+    python card_render_pil.py -d news_edit_review.json     # 直接调用
+    python card_render_pil.py --diff a.png b.png           # 与 Chromium 输出做像素对比
+    python card_render_pil.py --check-parity               # 用内置样例分别走两个后端，检查像素差异
+
+字体:
+    默认按系统查找中文字体（苹方 / 微软雅黑 / Noto Sans CJK / 文泉驿），
+    也可以用环境变量 CARD_FONT_REGULAR / CARD_FONT_BOLD 指定字体文件。
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont, features
+
+from card_render import CARD_ASSETS, load_json_data, resolve_date_strings, run as render_card_file
+
+# ================= 版式常量（CSS 像素，对应 card_template_v2.html） =================
+BG_COLOR = (230, 233, 239)        # --bg-color #E6E9EF
+TEXT_PRIMARY = (51, 51, 51)       # --text-primary #333333
+TEXT_SECONDARY = (125, 133, 146)  # --text-secondary #7D8592
+SHADOW_DARK = (209, 217, 230)     # --shadow-dark #D1D9E6
+SHADOW_LIGHT = (255, 255, 255)    # --shadow-light #FFFFFF
+THEME_BLUE = (72, 156, 193)       # --theme-blue #489CC1
+THEME_PURPLE = (108, 99, 255)     # --theme-purple #6C63FF
+MUTED = (153, 153, 153)           # #999
+CARD_TEXT = (102, 102, 102)       # #666666
+
+CONTAINER_WIDTH = 600
+CONTAINER_PADDING_X = 15
+CONTENT_WIDTH = CONTAINER_WIDTH - CONTAINER_PADDING_X * 2
+REM = 16
+
+FONT_CANDIDATES = {
+    "regular": [
+        "/System/Library/Fonts/PingFang.ttc",
+        "/System/Library/Fonts/Hiragino Sans GB.ttc",
+        "C:/Windows/Fonts/msyh.ttc",
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    ],
+    "bold": [
+        "/System/Library/Fonts/PingFang.ttc",
+        "/System/Library/Fonts/Hiragino Sans GB.ttc",
+        "C:/Windows/Fonts/msyhbd.ttc",
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    ],
+}
+
+TITLE_NUMBER_PATTERN = re.compile(r'^\d+[.、]\s*')
+
+# 有 raqm 时用完整的文本整形（字距、连字、混排），否则退回基础排版
+LAYOUT_ENGINE = ImageFont.Layout.RAQM if features.check("raqm") else ImageFont.Layout.BASIC
+
+
+def find_font(weight="regular"):
+    """查找字体文件路径"""
+    env_key = "CARD_FONT_BOLD" if weight == "bold" else "CARD_FONT_REGULAR"
+    env_path = os.getenv(env_key) or (os.getenv("CARD_FONT_REGULAR") if weight == "bold" else None)
+    if env_path and os.path.exists(env_path):
+        return env_path
+    for path in FONT_CANDIDATES[weight]:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(
+        f"未找到中文字体（{weight}），请通过环境变量 {env_key} 指定字体文件路径"
+    )
+
+
+class CardPainter:
+    """在 Pillow 画布上按 CSS 像素绘制，内部统一乘以 scale"""
+
+    def __init__(self, width, height, scale=2, background=BG_COLOR + (255,), fonts=None):
+        self.scale = scale
+        self.image = Image.new("RGBA", (round(width * scale), round(height * scale)), background)
+        # 共享字体缓存：测量、绘制、子画布用同一份已加载的字体
+        self._fonts = fonts if fonts is not None else {}
+        self._font_paths = {w: find_font(w) for w in ("regular", "bold")}
+
+    # ---------- 基础工具 ----------
+
+    def px(self, value):
+        return round(value * self.scale)
+
+    def box(self, x, y, w, h):
+        return (self.px(x), self.px(y), self.px(x + w), self.px(y + h))
+
+    def font(self, size, bold=False):
+        key = (size, bold)
+        if key not in self._fonts:
+            path = self._font_paths["bold" if bold else "regular"]
+            self._fonts[key] = ImageFont.truetype(path, self.px(size), layout_engine=LAYOUT_ENGINE)
+        return self._fonts[key]
+
+    def text_width(self, text, size, bold=False, letter_spacing=0):
+        """文本宽度（CSS 像素）"""
+        width = self.font(size, bold).getlength(text) / self.scale
+        return width + letter_spacing * len(text)
+
+    def wrap(self, text, size, max_width, bold=False, width_for_line=None):
+        """
+        按宽度折行：中文逐字断行，连续的英文/数字作为一个整体
+        width_for_line: 可选，按行号返回该行可用宽度（环绕浮动元素时使用）
+        """
+        tokens = re.findall(r'[A-Za-z0-9%$.,:;\-+/@&]+|\s|.', str(text))
+        lines, current = [], ""
+        limit = width_for_line(0) if width_for_line else max_width
+        for token in tokens:
+            candidate = current + token
+            if current and self.text_width(candidate, size, bold) > limit:
+                lines.append(current.rstrip())
+                current = token.lstrip()
+                limit = width_for_line(len(lines)) if width_for_line else max_width
+            else:
+                current = candidate
+        if current.strip():
+            lines.append(current.rstrip())
+        return lines
+
+    def baseline(self, size, line_height, bold=False):
+        """行盒顶部到文字基线的距离（CSS 像素）"""
+        ascent, descent = self.font(size, bold).getmetrics()
+        glyph_height = (ascent + descent) / self.scale
+        return (size * line_height - glyph_height) / 2 + ascent / self.scale
+
+    def draw_text(self, x, y, text, size, color, bold=False, line_height=1.8, letter_spacing=0, alpha=255):
+        """
+        在行盒 (x, y) 处绘制单行文本，按 CSS line-height 垂直居中
+        返回行高（CSS 像素）
+        """
+        font = self.font(size, bold)
+        box_height = size * line_height
+        ascent, descent = font.getmetrics()
+        glyph_height = (ascent + descent) / self.scale
+        top = y + (box_height - glyph_height) / 2
+        draw = ImageDraw.Draw(self.image)
+        fill = color + (alpha,)
+        if letter_spacing:
+            cursor = x
+            for ch in text:
+                draw.text((self.px(cursor), self.px(top)), ch, font=font, fill=fill)
+                cursor += self.text_width(ch, size, bold) + letter_spacing
+        else:
+            draw.text((self.px(x), self.px(top)), text, font=font, fill=fill)
+        return box_height
+
+    def draw_text_shadow(self, x, y, text, size, bold, line_height, offset, blur, color, alpha):
+        """文本阴影（对应 CSS text-shadow）"""
+        layer = Image.new("RGBA", self.image.size, color + (0,))
+        painter_image, self.image = self.image, layer
+        self.draw_text(x + offset[0], y + offset[1], text, size, color, bold, line_height, alpha=alpha)
+        self.image = painter_image
+        layer = layer.filter(ImageFilter.GaussianBlur(self.px(blur) / 2))
+        self.image.alpha_composite(layer)
+
+    def rounded_rect(self, x, y, w, h, radius, fill):
+        draw = ImageDraw.Draw(self.image)
+        draw.rounded_rectangle(self.box(x, y, w, h), radius=self.px(radius), fill=fill)
+
+    def soft_shadow(self, x, y, w, h, radius, offset, blur, color, alpha=255):
+        """外阴影（对应 CSS box-shadow）"""
+        mask = Image.new("L", self.image.size, 0)
+        ImageDraw.Draw(mask).rounded_rectangle(
+            self.box(x + offset[0], y + offset[1], w, h), radius=self.px(radius), fill=alpha
+        )
+        mask = mask.filter(ImageFilter.GaussianBlur(self.px(blur) / 2))
+        layer = Image.new("RGBA", self.image.size, color + (0,))
+        layer.putalpha(mask)
+        self.image.alpha_composite(layer)
+
+    def inset_shadow(self, x, y, w, h, radius, offset, blur, color, alpha=255):
+        """内阴影（对应 CSS box-shadow: inset）"""
+        pad = blur * 2 + max(abs(offset[0]), abs(offset[1]))
+        shape = Image.new("L", self.image.size, 0)
+        ImageDraw.Draw(shape).rounded_rectangle(self.box(x, y, w, h), radius=self.px(radius), fill=255)
+        # 形状外部向内偏移后模糊，只保留落在形状内部的部分
+        outside = Image.new("L", self.image.size, 0)
+        ImageDraw.Draw(outside).rectangle(self.box(x - pad, y - pad, w + pad * 2, h + pad * 2), fill=alpha)
+        ImageDraw.Draw(outside).rounded_rectangle(
+            self.box(x + offset[0], y + offset[1], w, h), radius=self.px(radius), fill=0
+        )
+        outside = outside.filter(ImageFilter.GaussianBlur(self.px(blur) / 2))
+        mask = ImageChops.multiply(outside, shape)
+        layer = Image.new("RGBA", self.image.size, color + (0,))
+        layer.putalpha(mask)
+        self.image.alpha_composite(layer)
+
+    def neumorphic_box(self, x, y, w, h, radius, distance, blur):
+        """新拟态卡片：右下深色阴影 + 左上白色高光"""
+        self.soft_shadow(x, y, w, h, radius, (distance, distance), blur, SHADOW_DARK)
+        self.soft_shadow(x, y, w, h, radius, (-distance, -distance), blur, SHADOW_LIGHT)
+        self.rounded_rect(x, y, w, h, radius, BG_COLOR + (255,))
+
+    def paste_image(self, source, x, y, w, h, radius=0, opacity=1.0, grayscale=0.0):
+        """把图片缩放贴到指定区域（object-fit: contain）"""
+        source = source.convert("RGBA")
+        target_w, target_h = self.px(w), self.px(h)
+        ratio = min(target_w / source.width, target_h / source.height)
+        size = (max(1, round(source.width * ratio)), max(1, round(source.height * ratio)))
+        resized = source.resize(size, Image.LANCZOS)
+        if grayscale:
+            gray = resized.convert("LA").convert("RGBA")
+            resized = Image.blend(resized, gray, grayscale)
+        if opacity < 1:
+            r, g, b, a = resized.split()
+            resized = Image.merge("RGBA", (r, g, b, a.point(lambda v: round(v * opacity))))
+        if radius:
+            mask = Image.new("L", resized.size, 0)
+            ImageDraw.Draw(mask).rounded_rectangle((0, 0) + resized.size, radius=self.px(radius), fill=255)
+            resized.putalpha(ImageChops.multiply(resized.getchannel("A"), mask))
+        left = self.px(x) + (target_w - size[0]) // 2
+        top = self.px(y) + (target_h - size[1]) // 2
+        self.image.alpha_composite(resized, (left, top))
+
+
+def _load_asset_image(key):
+    paths, _ = CARD_ASSETS[key]
+    for path in paths:
+        if os.path.exists(path):
+            return Image.open(path)
+    return None
+
+
+def _strip_number(title):
+    return TITLE_NUMBER_PATTERN.sub('', str(title or ''))
+
+
+# ================= 各区块：measure 返回高度，draw 负责绘制 =================
+
+def _hero_height():
+    # padding 30 + 图标 80 + gap 20 + 副标题/标题/日期三行 + padding 30
+    return 30 + 80 + 20 + (14.4 * 1.8 + 5) + (44.8 * 1.1 + 10) + 14.4 * 1.8 + 30
+
+
+def _draw_hero(p, x, y, date_str, weekday_str):
+    w, h = CONTENT_WIDTH, _hero_height()
+    p.neumorphic_box(x, y, w, h, 30, 15, 30)
+
+    # 右上角光晕
+    glow = Image.new("RGBA", (p.px(200), p.px(200)), THEME_BLUE + (0,))
+    glow_mask = Image.new("L", glow.size, 0)
+    draw = ImageDraw.Draw(glow_mask)
+    steps = 24
+    for i in range(steps, 0, -1):
+        r = p.px(100 * 0.7) * i / steps
+        c = p.px(100)
+        draw.ellipse((c - r, c - r, c + r, c + r), fill=round(255 * 0.15 * (1 - i / steps)))
+    glow.putalpha(glow_mask)
+    clip = Image.new("L", p.image.size, 0)
+    ImageDraw.Draw(clip).rounded_rectangle(p.box(x, y, w, h), radius=p.px(30), fill=255)
+    layer = Image.new("RGBA", p.image.size, THEME_BLUE + (0,))
+    layer.alpha_composite(glow, (p.px(x + w - 150), p.px(y - 50)))
+    layer.putalpha(ImageChops.multiply(layer.getchannel("A"), clip))
+    p.image.alpha_composite(layer)
+
+    center = x + w / 2
+    cursor = y + 30
+
+    # 天平图标（内凹圆）
+    p.inset_shadow(center - 40, cursor, 80, 80, 40, (6, 6), 12, SHADOW_DARK)
+    p.inset_shadow(center - 40, cursor, 80, 80, 40, (-6, -6), 12, SHADOW_LIGHT)
+    icon = _load_asset_image("scale_icon")
+    if icon:
+        p.paste_image(icon, center - 25, cursor + 15, 50, 50, opacity=0.7, grayscale=0.3)
+    cursor += 80 + 20
+
+    # 副标题
+    subtitle = "LAWGEEK 晚读"
+    sw = p.text_width(subtitle, 14.4, True, letter_spacing=2)
+    cursor += p.draw_text(center - sw / 2, cursor, subtitle, 14.4, THEME_BLUE, True, letter_spacing=2) + 5
+
+    # 主标题（带阴影）
+    title = "DAILY NEWS"
+    tw = p.text_width(title, 44.8, True)
+    p.draw_text_shadow(center - tw / 2, cursor, title, 44.8, True, 1.1, (2, 2), 4, (0, 0, 0), round(255 * 0.1))
+    cursor += p.draw_text(center - tw / 2, cursor, title, 44.8, TEXT_PRIMARY, True, line_height=1.1) + 10
+
+    # 日期行：图标 | 日期 | 分隔 | 星期
+    parts = [date_str, "|", weekday_str]
+    widths = [p.text_width(part, 14.4) for part in parts]
+    total = 24 + sum(widths) + 10 * len(parts)
+    cx = center - total / 2
+    calendar = _load_asset_image("calendar_icon")
+    line_h = 14.4 * 1.8
+    if calendar:
+        p.paste_image(calendar, cx, cursor + (line_h - 20) / 2, 20, 20)
+    cx += 24 + 10
+    for part, part_w in zip(parts, widths):
+        p.draw_text(cx, cursor, part, 14.4, TEXT_SECONDARY)
+        cx += part_w + 10
+    return h
+
+
+def _draw_illustration(p, x, y):
+    """AI + LAW 插画（SVG viewBox 500x200，居中）"""
+    ox = x + (CONTENT_WIDTH - 500) / 2
+    draw = ImageDraw.Draw(p.image)
+    lines = [
+        (150, 100, 250, 50), (250, 50, 350, 100), (150, 100, 250, 150), (250, 150, 350, 100),
+        (250, 50, 250, 150), (150, 100, 100, 150), (350, 100, 400, 50),
+    ]
+    layer = Image.new("RGBA", p.image.size, (0, 0, 0, 0))
+    ldraw = ImageDraw.Draw(layer)
+    for x1, y1, x2, y2 in lines:
+        # 渐变描边取中点颜色近似
+        t = ((x1 + x2) / 2 - 100) / 300
+        color = tuple(round(a + (b - a) * t) for a, b in zip(THEME_BLUE, THEME_PURPLE))
+        ldraw.line(
+            (p.px(ox + x1), p.px(y + y1), p.px(ox + x2), p.px(y + y2)),
+            fill=color + (round(255 * 0.8 * 0.3),), width=max(1, p.px(1.5))
+        )
+    p.image.alpha_composite(layer)
+
+    def circle(cx, cy, r, stroke, stroke_width):
+        draw.ellipse(
+            (p.px(ox + cx - r), p.px(y + cy - r), p.px(ox + cx + r), p.px(y + cy + r)),
+            fill=BG_COLOR, outline=stroke, width=max(1, p.px(stroke_width))
+        )
+
+    circle(250, 50, 12, THEME_BLUE, 3)
+    circle(250, 150, 12, THEME_PURPLE, 3)
+    circle(150, 100, 18, SHADOW_DARK, 1)
+    circle(350, 100, 18, SHADOW_DARK, 1)
+    for label, cx in (("AI", 150), ("LAW", 350)):
+        w = p.text_width(label, 12)
+        # SVG text 的 y 是基线，这里按行盒近似
+        p.draw_text(ox + cx - w / 2, y + 105 - 12 * 1.2, label, 12, MUTED, line_height=1.4)
+    return 200
+
+
+def _key_data_layout(lead):
+    items = lead.get("key_data") or []
+    if not items:
+        return 0, 0
+    card_h = 8 + 9.6 * 1.8 + 2 + 17.6 * 1.1 + 8
+    height = 5 + card_h * len(items) + 12 * (len(items) - 1) + 15
+    return 90 + 25, height
+
+
+def _draw_key_data(p, x, y, lead):
+    """关键数据便签：白底小卡片 + 胶带，奇偶交替轻微旋转"""
+    card_h = 8 + 9.6 * 1.8 + 2 + 17.6 * 1.1 + 8
+    margin = 10  # 子画布留白，容纳阴影和旋转后的边角
+    cursor = y + 5
+    for i, item in enumerate(lead.get("key_data") or []):
+        card = CardPainter(90 + margin * 2, card_h + margin * 2, p.scale, background=(0, 0, 0, 0), fonts=p._fonts)
+        card.soft_shadow(margin, margin, 90, card_h, 2, (2, 2), 6, (0, 0, 0), round(255 * 0.1))
+        card.rounded_rect(margin, margin, 90, card_h, 2, (255, 255, 255, 255))
+        card.rounded_rect(margin + 45 - 12.5, margin - 6, 25, 10, 0, THEME_BLUE + (round(255 * 0.25 * 0.8),))
+
+        label = str(item.get("label", ""))
+        lw = card.text_width(label, 9.6, True, letter_spacing=0.5)
+        card.draw_text(margin + 45 - lw / 2, margin + 8, label, 9.6, MUTED, True, letter_spacing=0.5)
+
+        value = str(item.get("value", ""))
+        unit = str(item.get("unit", "") or "")
+        vw = card.text_width(value, 17.6, True)
+        uw = card.text_width(unit, 11.2, True) if unit else 0
+        vx = margin + 45 - (vw + uw) / 2
+        vy = margin + 8 + 9.6 * 1.8 + 2
+        card.draw_text(vx, vy, value, 17.6, THEME_BLUE, True, line_height=1.1)
+        if unit:
+            # 单位与数值基线对齐
+            uy = vy + card.baseline(17.6, 1.1, True) - card.baseline(11.2, 1.1, True)
+            card.draw_text(vx + vw, uy, unit, 11.2, THEME_BLUE, True, line_height=1.1)
+
+        # CSS rotate(-3deg) / rotate(2deg)，Pillow 逆时针为正
+        angle = 3 if i % 2 == 0 else -2
+        rotated = card.image.rotate(angle, resample=Image.BICUBIC, expand=True)
+        left = p.px(x + 45) - rotated.width // 2
+        top = p.px(cursor + card_h / 2) - rotated.height // 2
+        p.image.alpha_composite(rotated, (left, top))
+        cursor += card_h + 12
+
+
+def _lead_title_layout(p, lead, width):
+    """头条标题行：返回 (标题各行, 标题相对行顶的下移量, 标题行总高度)"""
+    number_w = p.text_width("01", 48, True)
+    title_lines = p.wrap(_strip_number(lead.get("main_title", "")), 24, width - number_w - 10, bold=True)
+    # align-items: baseline —— 让标题首行基线与大号序号基线对齐
+    shift = max(0, p.baseline(48, 1.0, True) - p.baseline(24, 1.4, True))
+    height = max(48, shift + len(title_lines) * 24 * 1.4)
+    return title_lines, shift, height
+
+
+def _lead_desc_lines(p, lead, width):
+    """头条摘要折行：关键数据便签右浮动，便签高度内的行要让出便签宽度"""
+    summary = lead.get("abstract_summary")
+    if not summary:
+        return []
+    float_w, float_h = _key_data_layout(lead)
+    line_h = 16 * 1.8
+    return p.wrap(summary, 16, width, width_for_line=lambda i: width - float_w if i * line_h < float_h else width)
+
+
+def _lead_height(p, lead, width):
+    _, _, header_h = _lead_title_layout(p, lead, width)
+    desc_lines = _lead_desc_lines(p, lead, width)
+    body_h = len(desc_lines) * 16 * 1.8 + 25 if desc_lines else 0
+    if lead.get("bullet_points"):
+        # 要点列表 clear: both，要排在便签下方
+        body_h = max(body_h, _key_data_layout(lead)[1])
+        for point in lead["bullet_points"]:
+            body_h += len(p.wrap(point, 15.2, width - 36)) * 15.2 * 1.6 + 10
+    return 10 + header_h + 15 + body_h + 10
+
+
+def _draw_lead(p, x, y, lead):
+    width = CONTENT_WIDTH - 15 - 20
+    height = _lead_height(p, lead, width)
+    draw = ImageDraw.Draw(p.image)
+    draw.rounded_rectangle(p.box(x + 5, y + 15, 3, height - 30), radius=p.px(2), fill=THEME_BLUE)
+
+    cx = x + 20
+    cursor = y + 10
+
+    # 标题行：大号序号 + 标题
+    title_lines, shift, header_h = _lead_title_layout(p, lead, width)
+    number_w = p.text_width("01", 48, True)
+    p.draw_text_shadow(cx, cursor, "01", 48, True, 1.0, (-2, -2), 5, (0, 0, 0), round(255 * 0.1))
+    p.draw_text(cx, cursor, "01", 48, THEME_BLUE, True, line_height=1.0)
+    ty = cursor + shift
+    for line in title_lines:
+        ty += p.draw_text(cx + number_w + 10, ty, line, 24, TEXT_PRIMARY, True, line_height=1.4)
+    cursor += header_h + 15
+
+    # 关键数据便签（右浮动）
+    float_w, float_h = _key_data_layout(lead)
+    if float_w:
+        _draw_key_data(p, cx + width - 90, cursor, lead)
+
+    body_top = cursor
+    desc_lines = _lead_desc_lines(p, lead, width)
+    for line in desc_lines:
+        cursor += p.draw_text(cx, cursor, line, 16, TEXT_SECONDARY)
+    if desc_lines:
+        cursor += 25
+
+    if lead.get("bullet_points"):
+        cursor = max(cursor, body_top + float_h)
+        line_h = 15.2 * 1.6
+        for point in lead["bullet_points"]:
+            # li: margin-left 18 + padding-left 18 + text-indent -18 → 圆点在 18 处，文字统一从 36 开始
+            draw.ellipse(p.box(cx + 18, cursor + line_h / 2 - 3, 6, 6), fill=THEME_BLUE)
+            for line in p.wrap(point, 15.2, width - 36):
+                cursor += p.draw_text(cx + 36, cursor, line, 15.2, TEXT_PRIMARY, line_height=1.6)
+            cursor += 10
+    return height
+
+
+def _card_height(p, news, width):
+    inner = width - 70
+    title = _strip_number(news.get("main_title", ""))
+    title_lines = p.wrap(title, 18.4, inner - 40 - 15, bold=True)
+    header_h = max(40, len(title_lines) * 18.4 * 1.4)
+    height = 35 + header_h + 35
+    points = news.get("bullet_points") or []
+    if points:
+        bullets_h = 0
+        for point in points:
+            lines = p.wrap(point, 13.6, inner - 44 - 16)
+            bullets_h += len(lines) * 13.6 * 1.6
+        bullets_h += 8 * (len(points) - 1)
+        height += 15 + 18 + bullets_h + 18 + 2
+    return height
+
+
+def _draw_news_card(p, x, y, news, number, width):
+    height = _card_height(p, news, width)
+    p.neumorphic_box(x, y, width, height, 25, 15, 30)
+
+    # 顶部蓝条（被圆角裁剪）
+    clip = Image.new("L", p.image.size, 0)
+    ImageDraw.Draw(clip).rounded_rectangle(p.box(x, y, width, height), radius=p.px(25), fill=255)
+    bar = Image.new("L", p.image.size, 0)
+    ImageDraw.Draw(bar).rectangle(p.box(x, y, width, 4), fill=round(255 * 0.7))
+    layer = Image.new("RGBA", p.image.size, THEME_BLUE + (0,))
+    layer.putalpha(ImageChops.multiply(bar, clip))
+    p.image.alpha_composite(layer)
+
+    inner = width - 70
+    cx, cursor = x + 35, y + 35
+    title = _strip_number(news.get("main_title", ""))
+    title_lines = p.wrap(title, 18.4, inner - 40 - 15, bold=True)
+    header_h = max(40, len(title_lines) * 18.4 * 1.4)
+
+    # 序号方块（内凹）
+    ny = cursor + (header_h - 40) / 2
+    p.inset_shadow(cx, ny, 40, 40, 10, (3, 3), 6, (0, 0, 0), round(255 * 0.1))
+    p.inset_shadow(cx, ny, 40, 40, 10, (-3, -3), 6, SHADOW_LIGHT)
+    label = f"{number:02d}"
+    lw = p.text_width(label, 17.6, True)
+    p.draw_text(cx + 20 - lw / 2, ny + (40 - 17.6 * 1.8) / 2, label, 17.6, THEME_BLUE, True)
+
+    ty = cursor + (header_h - len(title_lines) * 18.4 * 1.4) / 2
+    for line in title_lines:
+        ty += p.draw_text(cx + 40 + 15, ty, line, 18.4, TEXT_PRIMARY, True, line_height=1.4)
+    cursor += header_h
+
+    points = news.get("bullet_points") or []
+    if points:
+        cursor += 15
+        box_h = height - 35 - (cursor - y)
+        p.rounded_rect(cx, cursor, inner, box_h, 12, (255, 255, 255, round(255 * 0.55)))
+        draw = ImageDraw.Draw(p.image)
+        draw.rounded_rectangle(
+            p.box(cx, cursor, inner, box_h), radius=p.px(12),
+            outline=(255, 255, 255, round(255 * 0.6)), width=max(1, p.px(1))
+        )
+        draw.rectangle(p.box(cx, cursor + 6, 3, box_h - 12), fill=THEME_BLUE)
+        by = cursor + 18
+        text_x = cx + 3 + 20
+        for i, point in enumerate(points):
+            lines = p.wrap(point, 13.6, inner - 44 - 16)
+            p.draw_text(text_x, by, "•", 13.6 * 1.1, THEME_BLUE, True, line_height=1.6 / 1.1)
+            for line in lines:
+                by += p.draw_text(text_x + 16, by, line, 13.6, CARD_TEXT, line_height=1.6)
+            if i < len(points) - 1:
+                by += 8
+    return height
+
+
+def _footer_height():
+    return 30 + 17.6 * 1.8 + 10 + 13.6 * 1.8 + 30 + 100 + 15 + 12.8 * 1.8 + 10
+
+
+def _draw_footer(p, x, y):
+    layer = Image.new("RGBA", p.image.size, (0, 0, 0, 0))
+    ImageDraw.Draw(layer).rectangle(p.box(x, y, CONTENT_WIDTH, 1), fill=(0, 0, 0, round(255 * 0.05)))
+    p.image.alpha_composite(layer)
+
+    center = x + CONTENT_WIDTH / 2
+    cursor = y + 30
+    brand = "LAWGEEK | 法律极客"
+    bw = p.text_width(brand, 17.6, True, letter_spacing=2)
+    cursor += p.draw_text(center - bw / 2, cursor, brand, 17.6, TEXT_PRIMARY, True, letter_spacing=2) + 10
+    slogan = "Memene · 阅读即成长"
+    sw = p.text_width(slogan, 13.6)
+    cursor += p.draw_text(center - sw / 2, cursor, slogan, 13.6, TEXT_SECONDARY) + 30
+
+    p.neumorphic_box(center - 50, cursor, 100, 100, 20, 10, 20)
+    qr = _load_asset_image("qr_code_path")
+    if qr:
+        p.paste_image(qr, center - 40, cursor + 10, 80, 80, radius=10)
+    cursor += 100 + 15
+
+    hint = "长按扫码 · 订阅接收每日推送"
+    hw = p.text_width(hint, 12.8)
+    p.draw_text(center - hw / 2, cursor, hint, 12.8, MUTED)
+    return _footer_height()
+
+
+# ================= 对外接口 =================
+
+def render_png(news_items, output_path="daily_news_card.png", date_str=None, weekday_str=None,
+               padding_top=50, padding_bottom=80, scale=2):
+    """
+    按 card_template_v2 版式直接绘制卡片 PNG
+    参数含义与 card_render.render_card 一致
+    """
+    date_str, weekday_str = resolve_date_strings(date_str, weekday_str)
+    x = CONTAINER_PADDING_X
+
+    # 第一遍：测量总高度
+    measure = CardPainter(1, 1, scale)
+    sections = [_hero_height() + 30, 200 + 40]
+    if news_items:
+        sections.append(_lead_height(measure, news_items[0], CONTENT_WIDTH - 35) + 50)
+        sections.append(2 + 50)
+        if len(news_items) > 1:
+            grid_w = CONTENT_WIDTH - 20
+            heights = [_card_height(measure, news, grid_w) for news in news_items[1:]]
+            sections.append(sum(heights) + 40 * (len(heights) - 1))
+    total = padding_top + sum(sections) + 60 + _footer_height() + padding_bottom
+
+    # 第二遍：绘制
+    p = CardPainter(CONTAINER_WIDTH, total, scale, fonts=measure._fonts)
+    cursor = padding_top
+    cursor += _draw_hero(p, x, cursor, date_str, weekday_str) + 30
+    cursor += _draw_illustration(p, x, cursor) + 40
+    if news_items:
+        cursor += _draw_lead(p, x, cursor, news_items[0]) + 50
+        # 分隔线（内凹）
+        p.inset_shadow(x + CONTENT_WIDTH * 0.1, cursor, CONTENT_WIDTH * 0.8, 2, 2, (1, 1), 2, SHADOW_DARK)
+        p.inset_shadow(x + CONTENT_WIDTH * 0.1, cursor, CONTENT_WIDTH * 0.8, 2, 2, (-1, -1), 2, SHADOW_LIGHT)
+        cursor += 2 + 50
+        if len(news_items) > 1:
+            grid_w = CONTENT_WIDTH - 20
+            for i, news in enumerate(news_items[1:], start=2):
+                cursor += _draw_news_card(p, x + 10, cursor, news, i, grid_w)
+                if i < len(news_items):
+                    cursor += 40
+    cursor += 60  # footer margin-top
+    _draw_footer(p, x, cursor)
+
+    p.image.convert("RGB").save(output_path, optimize=False)
+    print(f"[完成] 已保存到: {output_path}")
+    return output_path
+
+
+def pixel_diff(image_a, image_b, tolerance=32):
+    """
+    像素对比两张卡片图
+    tolerance: 单通道差值超过该值才算不同像素（抗锯齿、字体差异会带来小幅偏差）
+    返回: {"size_a", "size_b", "mismatch_ratio", "mean_abs_diff"}
+    尺寸不一致时按左上角对齐比较重叠区域，并把多出的区域计为不同
+    """
+    a = Image.open(image_a).convert("RGB")
+    b = Image.open(image_b).convert("RGB")
+    width, height = min(a.width, b.width), min(a.height, b.height)
+    diff = ImageChops.difference(a.crop((0, 0, width, height)), b.crop((0, 0, width, height)))
+    channel_max = ImageChops.lighter(ImageChops.lighter(*diff.split()[:2]), diff.split()[2])
+    histogram = channel_max.histogram()
+    mismatched = sum(histogram[tolerance + 1:])
+    overlap = width * height
+    union = max(a.width, b.width) * max(a.height, b.height)
+    mismatched += union - overlap
+    mean_abs = sum(i * n for i, n in enumerate(histogram)) / overlap if overlap else 255
+    return {
+        "size_a": a.size,
+        "size_b": b.size,
+        "mismatch_ratio": mismatched / union if union else 1.0,
+        "mean_abs_diff": mean_abs,
+    }
+
+
+# ================= 与 Chromium 后端的一致性检查 =================
+
+# 允许的最大不同像素比例（字体 hinting、抗锯齿、阴影模糊算法不同带来的偏差）
+PARITY_MAX_MISMATCH = 0.1
+
+# 覆盖所有版块的样例数据：头条（关键数据、摘要、要点）+ 两张普通卡片
+PARITY_FIXTURE = [
+    {
+        "main_title": "01. 法律科技公司完成新一轮融资",
+        "abstract_summary": "这家公司主要为律所和企业法务提供合同审查与知识管理工具，本轮资金将用于模型研发和海外市场拓展。",
+        "key_data": [
+            {"label": "融资金额", "value": "3000", "unit": "万美元"},
+            {"label": "客户数量", "value": "1200", "unit": "家"},
+        ],
+        "bullet_points": ["合同审查准确率提升到 95%", "新增英文、日文两种语言"],
+    },
+    {
+        "main_title": "02. 法院上线诉讼材料智能核验",
+        "bullet_points": ["立案材料自动比对", "平均审核时间缩短一半"],
+    },
+    {
+        "main_title": "03. 律所发布生成式 AI 使用指引",
+        "bullet_points": ["明确客户数据不得上传公共模型", "所有 AI 产出须由律师复核"],
+    },
+]
+
+
+def _has_cjk_glyphs(path):
+    """字体里有没有汉字（没有时所有汉字都画成同一个缺字方框）"""
+    font = ImageFont.truetype(path, 32)
+    return bytes(font.getmask("中")) != bytes(font.getmask("\uffff"))
+
+
+def _parity_skip_reason():
+    """缺少 Chromium 或中文字体时返回跳过原因，否则返回 None"""
+    try:
+        fonts = {find_font("regular"), find_font("bold")}
+    except FileNotFoundError as e:
+        return str(e)
+    if not all(_has_cjk_glyphs(path) for path in fonts):
+        return "字体不含汉字，对比没有意义"
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as playwright:
+            executable = playwright.chromium.executable_path
+    except Exception as e:
+        return f"Playwright 不可用: {e}"
+    if not os.path.exists(executable):
+        return "未安装 Chromium（python -m playwright install chromium）"
+    return None
+
+
+def check_parity(max_mismatch=PARITY_MAX_MISMATCH, output_dir=None):
+    """
+    用 PARITY_FIXTURE 分别走 Chromium 和 Pillow 两个后端渲染，对比像素
+    返回: pixel_diff 的结果加上 {"passed": bool}；环境不满足时返回 {"skipped": 原因}
+    output_dir: 保存两张图和样例数据的目录，默认用临时目录（对比完删除）
+    """
+    reason = _parity_skip_reason()
+    if reason:
+        return {"skipped": reason}
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = output_dir or tmp
+        os.makedirs(directory, exist_ok=True)
+        data_file = os.path.join(directory, "parity_fixture.json")
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump(PARITY_FIXTURE, f, ensure_ascii=False, indent=2)
+        outputs = {}
+        for backend in ("chromium", "pil"):
+            outputs[backend] = os.path.join(directory, f"parity_{backend}.png")
+            # 日期写死，两边画的内容完全一样；不走缓存
+            render_card_file(
+                data=data_file, output=outputs[backend], date="12月17日", weekday="星期二",
+                backend=backend, use_cache=False
+            )
+        result = pixel_diff(outputs["chromium"], outputs["pil"])
+    result["passed"] = result["mismatch_ratio"] <= max_mismatch
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='不启动浏览器，直接绘制卡片 PNG（card_template_v2 版式）')
+    parser.add_argument('-d', '--data', type=str, default="news_edit_review.json", help='JSON 数据文件路径')
+    parser.add_argument('-o', '--output', type=str, default="daily_news_card_pil.png", help='输出 PNG 文件路径')
+    parser.add_argument('--date', type=str, help='自定义日期显示 (例如: 12月17日)')
+    parser.add_argument('--weekday', type=str, help='自定义星期显示 (例如: 星期二)')
+    parser.add_argument('--padding-top', type=int, default=50, help='顶部边距像素 (默认: 50)')
+    parser.add_argument('--padding-bottom', type=int, default=80, help='底部边距像素 (默认: 80)')
+    parser.add_argument(
+        '--diff', nargs=2, metavar=('A', 'B'),
+        help='对比两张 PNG（如 Chromium 输出与 Pillow 输出），不生成图片'
+    )
+    parser.add_argument(
+        '--check-parity', action='store_true',
+        help='用内置样例分别走 Chromium、Pillow 两个后端渲染并对比（缺少 Chromium 或中文字体时跳过）'
+    )
+    parser.add_argument(
+        '--parity-dir', type=str,
+        help='--check-parity 时保存两张对比图的目录（默认不保存）'
+    )
+    parser.add_argument(
+        '--max-mismatch', type=float, default=PARITY_MAX_MISMATCH,
+        help=f'--diff / --check-parity 时允许的最大不同像素比例，超出则以非 0 退出 (默认: {PARITY_MAX_MISMATCH})'
+    )
+
+    args = parser.parse_args()
+
+    if args.check_parity:
+        result = check_parity(args.max_mismatch, args.parity_dir)
+        if "skipped" in result:
+            print(f"[跳过] {result['skipped']}")
+        else:
+            print(f"[对比] 尺寸: Chromium {result['size_a']} vs Pillow {result['size_b']}")
+            print(f"[对比] 不同像素比例: {result['mismatch_ratio']:.2%}，平均差值: {result['mean_abs_diff']:.2f}")
+            if not result["passed"]:
+                print(f"[失败] 超过阈值 {args.max_mismatch:.0%}")
+                raise SystemExit(1)
+            print("[通过]")
+    elif args.diff:
+        result = pixel_diff(*args.diff)
+        print(f"[对比] 尺寸: {result['size_a']} vs {result['size_b']}")
+        print(f"[对比] 不同像素比例: {result['mismatch_ratio']:.2%}，平均差值: {result['mean_abs_diff']:.2f}")
+        if result["mismatch_ratio"] > args.max_mismatch:
+            print(f"[失败] 超过阈值 {args.max_mismatch:.0%}")
+            raise SystemExit(1)
+        print("[通过]")
+    else:
+        render_png(
+            load_json_data(args.data), args.output, args.date, args.weekday,
+            args.padding_top, args.padding_bottom
+        )
@@ -5,22 +5,62 @@
 
 import requests
 import json
-from config import BAILIAN_API_KEY, BAILIAN_MODEL
+from config import BAILIAN_API_KEY, BAILIAN_MODEL, COPY_CACHE_ENABLED, COPY_CACHE_DIR, COPY_CACHE_MAX_ENTRIES
+from disk_cache import JsonCache, content_hash
+from tracing import span
 
+# 修改下方提示词后递增，旧缓存自动失效
+COPY_PROMPT_VERSION = 1
 
-def generate_community_copy(top_articles: list, other_titles: list = None) -> dict:
+# 参与生成的文章字段（也是缓存键的一部分）
+COPY_FIELDS = ("标题", "原文内容", "AI总结", "来源名称", "AI理由")
+
+copy_cache = JsonCache(COPY_CACHE_DIR, COPY_CACHE_MAX_ENTRIES)
+
+
+def _copy_payload(top_articles: list, other_titles: list = None):
+    """提取真正参与生成的内容：前5条文章的相关字段 + 前10个其他标题"""
+    articles = [{field: article.get(field, "") for field in COPY_FIELDS} for article in top_articles[:5]]
+    return articles, list(other_titles or [])[:10]
+
+
+def copy_cache_key(top_articles: list, other_titles: list = None) -> str:
+    """文案缓存键：(提示词版本, 模型, 前5条文章, 其他标题)"""
+    articles, titles = _copy_payload(top_articles, other_titles)
+    return content_hash(COPY_PROMPT_VERSION, BAILIAN_MODEL, articles, titles)
+
+
+def generate_community_copy(top_articles: list, other_titles: list = None, force_refresh: bool = False) -> dict:
     """
     生成社群运营文案
     
     top_articles: 前5条核心文章，包含标题和内容
     other_titles: 其余文章的标题列表
+    force_refresh: True 时忽略缓存重新生成（「重新生成文案」）
     
-    返回: {"copy": "文案内容", "analysis": "关联分析"}
+    返回: {"copy": "文案内容", "analysis": "关联分析", "cached": 是否来自缓存}
+    同样的文章和标题只请求一次，成功的结果缓存到本地
     """
+    key = copy_cache_key(top_articles, other_titles)
+    if COPY_CACHE_ENABLED and not force_refresh:
+        cached = copy_cache.get(key)
+        if cached is not None:
+            print("♻️ 文章未变化，使用缓存的社群文案")
+            return dict(cached, cached=True)
+    
+    result = _request_copy(top_articles, other_titles)
+    if COPY_CACHE_ENABLED and result.get("success"):
+        copy_cache.put(key, result)
+    return dict(result, cached=False)
+
+
+def _request_copy(top_articles: list, other_titles: list = None) -> dict:
+    """请求百炼生成文案（不查缓存）"""
+    top_articles, other_titles = _copy_payload(top_articles, other_titles)
     
     # 构建完整文章内容（不截断，保留全部信息）
     articles_text = ""
-    for i, article in enumerate(top_articles[:5], 1):
+    for i, article in enumerate(top_articles, 1):
         title = article.get("标题", "")
         content = article.get("原文内容", "") or article.get("AI总结", "")
         source = article.get("来源名称", "")
@@ -37,7 +77,7 @@ def generate_community_copy(top_articles: list, other_titles: list = None) -> di
     # 构建其他标题
     other_text = ""
     if other_titles:
-        other_text = "\n".join([f"- {t}" for t in other_titles[:10]])
+        other_text = "\n".join([f"- {t}" for t in other_titles])
     
     prompt = f"""你是一位深耕"法律科技"领域的资深内容运营专家，正在为社群撰写【每日精选导读】。
 
@@ -109,12 +149,13 @@ def generate_community_copy(top_articles: list, other_titles: list = None) -> di
     }
     
     try:
-        response = requests.post(
-            "https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=60
-        )
+        with span("copy.generate", articles=len(top_articles)):
+            response = requests.post(
+                "https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=60
+            )
         response.raise_for_status()
         
         data = response.json()
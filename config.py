@@ -11,3 +11,51 @@ BAILIAN_MODEL = "qwen-plus"  # 可选: qwen-turbo, qwen-plus, qwen-max
 # 周报配置
 WEEKLY_REPORT_TITLE_TEMPLATE = "vol.{vol}｜LawGeek法律科技周报"
 
+
+# 追踪配置（热点路径耗时，写入本地 JSONL）
+TRACE_ENABLED = True
+TRACE_FILE = "trace.jsonl"
+
+# 卡片渲染结果缓存（模板、数据、图片、参数都没变时直接复用上次的 PNG）
+CARD_CACHE_ENABLED = True
+CARD_CACHE_DIR = ".card_cache"
+CARD_CACHE_MAX_ENTRIES = 200
+
+# 卡片 AI 总结缓存（同一篇文章、同一版提示词和模型只请求一次）
+SUMMARY_CACHE_ENABLED = True
+SUMMARY_CACHE_DIR = ".summary_cache"
+SUMMARY_CACHE_MAX_ENTRIES = 500
+
+# 社群文案缓存（同样的前5条文章和其他标题只请求一次，可在页面上强制重新生成）
+COPY_CACHE_ENABLED = True
+COPY_CACHE_DIR = ".copy_cache"
+COPY_CACHE_MAX_ENTRIES = 200
+
+# 一键发布结果缓存（按期号 + 内容哈希，文章没变时直接复用上次的发布物）
+BUNDLE_CACHE_DIR = ".publish_cache"
+BUNDLE_CACHE_MAX_ENTRIES = 200
+
+# 正文近似重复检测（多个来源转载的同一条新闻，获取时直接标为「重复」，不再送 AI 处理）
+NEAR_DUP_ENABLED = True
+NEAR_DUP_INDEX_FILE = "near_dup_index.jsonl"
+NEAR_DUP_THRESHOLD = 0.6  # 估算的正文相似度（Jaccard）达到该值算重复
+
+# 全文搜索索引（当前文章 + 往期存档，SQLite FTS5）
+SEARCH_INDEX_FILE = "search_index.db"
+
+# 相关往期报道（本地向量模型，需要 pip install sentence-transformers；没装时自动关闭）
+EMBEDDING_ENABLED = True
+EMBEDDING_MODEL = "BAAI/bge-small-zh-v1.5"
+EMBEDDING_DIR = ".embeddings"
+EMBEDDING_BATCH_SIZE = 32
+
+# 往期存档（CSV 照常写入，另建 SQLite 索引用于跨期查询）
+ARCHIVE_DIR = "archive"
+ARCHIVE_DB_FILE = "archive/archive.db"
+
+# 飞书周报文档记录（每期的文档 ID 和各文章的块 ID，用于「重新生成」时增量更新）
+FEISHU_DOC_STATE_FILE = "feishu_docs.json"
+
+# 飞书写入调度
+# 文档编辑接口限流：单个文档每秒最多 3 次编辑
+FEISHU_DOC_EDITS_PER_SECOND = 3
@@ -0,0 +1,187 @@
+"""
+本地磁盘缓存模块
+按内容哈希把生成结果存到本地目录，输入没变时直接复用上一次的结果
+
+- content_hash(): 把任意多个输入（字节、字符串、可 JSON 序列化的对象）合成一个哈希
+- FileCache: 以哈希为文件名的缓存目录，超过上限时按最近使用时间淘汰（LRU）
+- JsonCache: 同上，存放可 JSON 序列化的结果（如 AI 总结）
+- write_atomic() / write_bytes_atomic(): 先写临时文件再替换，其他模块写输出文件也用它
+
+用法:
+    from disk_cache import FileCache, content_hash
+
+    cache = FileCache(".card_cache", max_entries=200, suffix=".png")
+    key = content_hash(template_bytes, data_bytes, {"padding_top": 50})
+    if not cache.get(key, "card.png"):
+        render(...)
+        cache.put(key, "card.png")
+
+    summaries = JsonCache(".summary_cache", max_entries=500)
+    result = summaries.get(key)
+    if result is None:
+        result = summarize(...)
+        summaries.put(key, result)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+# 进程的 umask（新建文件的权限按它算；只在导入时读一次，os.umask 读写不是线程安全的）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def content_hash(*parts):
+    """
+    计算多个输入的组合哈希（sha256 十六进制）
+    bytes 原样参与计算，str 按 UTF-8 编码，其他对象按排序后的 JSON 编码，None 单独标记
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            data = b"\x00none"
+        elif isinstance(part, bytes):
+            data = part
+        elif isinstance(part, str):
+            data = part.encode("utf-8")
+        else:
+            data = json.dumps(part, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+        # 带上长度前缀，避免 ("ab", "c") 与 ("a", "bc") 撞哈希
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class FileCache:
+    """以内容哈希命名的文件缓存目录（LRU 淘汰）"""
+
+    def __init__(self, directory, max_entries=200, suffix=""):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.suffix = suffix
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key, dest=None):
+        """
+        查找缓存，未命中返回 None
+        dest: 命中时把缓存文件复制到该路径，返回 dest；不传则返回缓存文件本身的路径
+        """
+        path = self.path_for(key)
+        try:
+            # 刷新修改时间，作为最近使用时间
+            os.utime(path)
+        except OSError:
+            return None
+        if dest is None:
+            return path
+        _copy_atomic(path, dest)
+        return dest
+
+    def put(self, key, source):
+        """把生成好的文件存入缓存，返回缓存文件路径"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        _copy_atomic(source, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """超过上限时删除最久未使用的缓存文件"""
+        with self._lock:
+            try:
+                names = [n for n in os.listdir(self.directory) if n.endswith(self.suffix) and not n.startswith(".")]
+            except OSError:
+                return
+            if len(names) <= self.max_entries:
+                return
+            entries = []
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.stat(path).st_mtime_ns, path))
+                except OSError:
+                    continue
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """清空缓存目录"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class JsonCache(FileCache):
+    """以内容哈希命名的 JSON 结果缓存（LRU 淘汰）"""
+
+    def __init__(self, directory, max_entries=500):
+        super().__init__(directory, max_entries, suffix=".json")
+
+    def get(self, key):
+        """查找缓存，未命中或文件损坏返回 None"""
+        path = super().get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, value):
+        """存入结果，返回缓存文件路径"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        data = json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+        write_bytes_atomic(path, data)
+        self.evict()
+        return path
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _target_mode(dest):
+    """替换后文件应有的权限：沿用原文件的；新文件按 umask（和直接 open 写出来的一样）"""
+    try:
+        return os.stat(dest).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def write_atomic(dest, write, suffix=""):
+    """
+    先写到同目录临时文件再替换，避免并发读到写了一半的文件
+    write: 接收临时文件路径、把内容写进去的函数
+    """
+    directory = os.path.dirname(os.path.abspath(dest))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=suffix)
+    os.close(fd)
+    try:
+        write(tmp)
+        # mkstemp 建的文件是 0600，替换前改成目标文件该有的权限
+        os.chmod(tmp, _target_mode(dest))
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_bytes_atomic(dest, data):
+    write_atomic(dest, lambda tmp: _write_bytes(tmp, data))
+
+
+def _copy_atomic(source, dest):
+    write_atomic(dest, lambda tmp: shutil.copyfile(source, tmp))
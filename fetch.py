@@ -4,6 +4,12 @@ import datetime
 import os
 import argparse
 from ai_highlight import AIHighlighter
+from config import NEAR_DUP_ENABLED
+from near_dup import DUPLICATE_COLUMN, NearDupIndex, duplicate_fields
+from news_store import ID_COLUMN, article_id, atomic_write_csv, load_news
+from search_index import index_articles
+from semantic_index import add_articles
+from tracing import span
 
 # ================= 配置区 =================
 BASE_URL = "https://apis.memenews.cn"
@@ -116,8 +122,16 @@ def main(date_str=None, enable_highlight=True, verbose=False):
     enable_highlight: 是否启用 AI 标红功能
     verbose: 是否打印详细的 API 原始数据
     """
+    with span("fetch.day", date=date_str or "today"):
+        _fetch_day(date_str, enable_highlight, verbose)
+
+
+def _fetch_day(date_str=None, enable_highlight=True, verbose=False):
+    """单日获取流程：拉取 → 逐条 AI 处理 → 保存"""
     # 1. 获取新数据
-    raw_news_list = get_data_from_backend(date_str, verbose=verbose)
+    with span("fetch.api") as attrs:
+        raw_news_list = get_data_from_backend(date_str, verbose=verbose)
+        attrs["count"] = len(raw_news_list)
     
     if not raw_news_list:
         print("没有获取到数据，退出")
@@ -129,6 +143,9 @@ def main(date_str=None, enable_highlight=True, verbose=False):
         print("🤖 AI 处理功能已启用（标红 + 分类）")
         ai_processor = AIHighlighter()
     
+    # 正文查重索引（首次使用时按数据库重建）
+    dup_index = NearDupIndex.load(csv_file=CSV_FILE) if NEAR_DUP_ENABLED else None
+    
     new_rows = []
     # 使用传入的日期或今天的日期
     record_date = date_str if date_str else datetime.date.today().strftime("%Y-%m-%d")
@@ -137,19 +154,26 @@ def main(date_str=None, enable_highlight=True, verbose=False):
     for idx, news in enumerate(raw_news_list, 1):
         content = news['content']
         title = news['title']
+        aid = article_id(title, news['url'])
         ai_classification = "推荐"
         ai_reason = ""
         
+        # 查重：与已收录文章正文近似重复的，不再送 AI 处理
+        duplicate = dup_index.match(content, aid) if dup_index is not None else None
+        if duplicate is not None:
+            print(f"🔁 跳过重复 ({idx}/{total}): {title[:30]} → {duplicate['title'][:30]}")
+        
         # AI 处理（标红 + 分类）
-        if ai_processor and content:
+        if ai_processor and content and duplicate is None:
             print(f"📝 正在处理 ({idx}/{total}): {title[:30]}...")
-            result = ai_processor.process_article(title, content)
+            with span("fetch.article", idx=idx, title=title[:30]):
+                result = ai_processor.process_article(title, content)
             content = result['content']
             ai_classification = result['classification']
             ai_reason = result['reason']
             print(f"   → {ai_classification}: {ai_reason}")
         
-        new_rows.append({
+        row = {
             "收录日期": record_date,
             "每日排名": news['rank'],
             "评分": news.get('score', 0),
@@ -161,20 +185,40 @@ def main(date_str=None, enable_highlight=True, verbose=False):
             "AI理由": ai_reason,  # AI 分类理由
             "人工审核": "待审核",  # 入库 / 垃圾 / 待审核
             "发布顺序": "",  # 手动填写，用于发布时排序
-        })
+            ID_COLUMN: aid,  # 标题 + 链接的哈希，去重、排序、归档都按它对应
+            DUPLICATE_COLUMN: "",  # 近似重复时填被重复文章的 ID
+        }
+        if duplicate is not None:
+            row.update(duplicate_fields(duplicate))
+        elif dup_index is not None:
+            dup_index.add(aid, title, content)
+        new_rows.append(row)
     
     # 2. 保存到 CSV
-    new_df = pd.DataFrame(new_rows)
+    with span("fetch.persist", rows=len(new_rows)):
+        saved_df = _persist_rows(new_rows)
+    # 数据保存成功后再把新文章写进查重索引、搜索索引（只写真正新增的行，已存在的文章位置不变）
+    if saved_df is not None:
+        if dup_index is not None:
+            dup_index.flush()
+        index_articles(saved_df)
+        add_articles(saved_df)
+
+
+def _persist_rows(new_rows):
+    """把新数据去重后追加写入 CSV，返回实际新增的行（没有写入时返回 None）"""
+    # 同一批里重复的文章（同一天多次上榜、跨日期重复出现）只保留第一条
+    new_df = pd.DataFrame(new_rows).drop_duplicates(subset=ID_COLUMN)
     
     if os.path.exists(CSV_FILE) and os.path.getsize(CSV_FILE) > 0:
         # 如果文件已存在且不为空，就读取旧的，把新的拼接到后面
         try:
-            old_df = pd.read_csv(CSV_FILE)
-            # 简单去重：如果标题已经有了就不加了 (防止你点两次 fetch 重复进货)
-            new_df = new_df[~new_df['标题'].isin(old_df['标题'])]
+            old_df = load_news(CSV_FILE)
+            # 去重：如果文章 ID（标题 + 链接）已经有了就不加了 (防止你点两次 fetch 重复进货)
+            new_df = new_df[~new_df[ID_COLUMN].isin(old_df[ID_COLUMN])]
             if new_df.empty:
                 print("⚠️ 所有新闻都已存在，没有新增数据")
-                return
+                return None
             final_df = pd.concat([old_df, new_df], ignore_index=True)
         except pd.errors.EmptyDataError:
             # CSV 文件为空或损坏，直接用新数据
@@ -182,8 +226,9 @@ def main(date_str=None, enable_highlight=True, verbose=False):
     else:
         final_df = new_df
         
-    final_df.to_csv(CSV_FILE, index=False, encoding='utf-8-sig')
+    atomic_write_csv(final_df, CSV_FILE, encoding='utf-8-sig')
     print(f"✅ 进货成功！新增 {len(new_df)} 条，共存有 {len(final_df)} 条数据。现在去运行 app.py 吧！")
+    return new_df
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='从 Meme 系统获取新闻数据')
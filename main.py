@@ -6,7 +6,7 @@ import time
 import asyncio
 import re  # 新增：用于正则处理
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
+from browser_pool import get_browser_pool
 from jinja2 import Template
 import datetime
 import base64
@@ -371,16 +371,14 @@ async def generate_news_card_from_data(news_data_list: list, output_path="daily_
         qr_code_path=qr_code_base64
     )
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(device_scale_factor=2) # 高清渲染
-        
+    async def shoot(page):
         await page.set_content(rendered_html)
         
         # 🚨 核心改回：使用标准截图，加上 omit_background 即可完美去白边
         await page.locator(".container").screenshot(path=output_path, omit_background=True)
-        
-        await browser.close()
+    
+    # 复用常驻浏览器（高清渲染）
+    await get_browser_pool().run(shoot, device_scale_factor=2)
     
     print(f"🎉 图片已生成并保存到: {output_path}")
     
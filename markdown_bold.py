@@ -0,0 +1,70 @@
+"""
+Markdown 加粗解析模块
+把正文里的 **加粗** 标记解析成片段列表，各种输出格式（页面高亮、公众号 HTML、纯文本、飞书 elements）
+都从同一份片段列表生成
+
+- 正则只编译一次，同一段正文只扫描一次（按内容缓存）
+- 片段: (文本, 是否加粗)，空的普通文本片段不保留
+
+用法:
+    from markdown_bold import to_html, to_plain, to_feishu_elements
+
+    to_html("今天**重磅**发布")          # 今天<strong>重磅</strong>发布
+    to_plain("今天**重磅**发布")         # 今天重磅发布
+"""
+
+import re
+from functools import lru_cache
+
+BOLD_PATTERN = re.compile(r'\*\*(.+?)\*\*')
+
+# 缓存的正文数（一期几十篇，页面上还有待审核列表）
+TOKEN_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tokenize(text: str) -> tuple:
+    """解析加粗标记，返回 ((文本, 是否加粗), ...)"""
+    spans = []
+    last_end = 0
+    for match in BOLD_PATTERN.finditer(text):
+        if match.start() > last_end:
+            spans.append((text[last_end:match.start()], False))
+        spans.append((match.group(1), True))
+        last_end = match.end()
+    if last_end < len(text):
+        spans.append((text[last_end:], False))
+    return tuple(spans)
+
+
+def to_html(text: str, open_tag: str = "<strong>", close_tag: str = "</strong>") -> str:
+    """**text** -> <strong>text</strong>（可自定义标签，如带高亮样式的 <strong style=...>）"""
+    if not text:
+        return text
+    return "".join(f"{open_tag}{part}{close_tag}" if bold else part for part, bold in tokenize(text))
+
+
+def to_plain(text: str) -> str:
+    """**text** -> text"""
+    if not text:
+        return text
+    return "".join(part for part, _ in tokenize(text))
+
+
+def to_feishu_elements(text: str) -> list:
+    """
+    转换为飞书 elements 数组
+    返回: [{"text_run": {"content": "普通文本"}}, {"text_run": {"content": "加粗文本", "text_element_style": {"bold": True}}}, ...]
+    """
+    elements = []
+    for part, bold in tokenize(text):
+        if bold:
+            elements.append({"text_run": {"content": part, "text_element_style": {"bold": True}}})
+        else:
+            elements.append({"text_run": {"content": part}})
+
+    # 空文本也要有一个元素（飞书文本块不能没有 elements）
+    if not elements:
+        elements.append({"text_run": {"content": text}})
+
+    return elements
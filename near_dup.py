@@ -0,0 +1,211 @@
+"""
+近似重复检测
+同一条新闻常被多个来源转载，标题各不相同、正文大同小异。这里对正文做 MinHash 签名，
+用 LSH 分桶查找候选，获取数据时把重复的文章直接标记出来，不再送去 AI 处理
+
+- 正文去掉 **加粗** 标记和空白后取字符 3-gram，中文不需要分词
+- 签名 64 个哈希，分 32 段 × 2 行：相似度 0.6 的文章落进同一个桶的概率为 1-(1-0.6²)³²，漏检不到百万分之一
+- 候选再按签名估算相似度，达到 NEAR_DUP_THRESHOLD 才算重复
+- 索引文件是 JSONL，每篇不重复的文章追加一行；文件不存在时从数据库 CSV 重建
+
+用法:
+    from near_dup import NearDupIndex
+
+    index = NearDupIndex.load()
+    match = index.match(content, article_id)      # -> {"id", "title", "similarity"} 或 None
+    if match is None:
+        index.add(article_id, title, content)
+    index.flush()                                  # 数据保存成功后再写入索引文件
+
+命令行:
+    python near_dup.py --rebuild                   # 按数据库 CSV 重建索引
+"""
+
+import argparse
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+from config import NEAR_DUP_INDEX_FILE, NEAR_DUP_THRESHOLD
+from news_store import CSV_FILE, ID_COLUMN, load_news
+from tracing import span
+
+DUPLICATE_COLUMN = "重复于"
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# 少于这个字数的正文不参与查重（太短的片段容易误判）
+MIN_TEXT_LENGTH = 50
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = np.random.RandomState(20251201)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+_CLEANUP = re.compile(r"\*\*|\s+")
+
+
+def _normalize(text):
+    if not isinstance(text, str):
+        return ""
+    return _CLEANUP.sub("", text).lower()
+
+
+def signature(text):
+    """正文的 MinHash 签名（长度 NUM_PERM 的 uint32 数组）；正文太短返回 None"""
+    text = _normalize(text)
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a·x + b) mod p 模拟 NUM_PERM 个随机排列，每个排列取最小值
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """按签名估算两篇正文的 Jaccard 相似度"""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _band_keys(sig):
+    return [(band, sig[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class NearDupIndex:
+    """MinHash LSH 索引（内存分桶 + JSONL 追加存储）"""
+
+    def __init__(self, path=NEAR_DUP_INDEX_FILE, threshold=NEAR_DUP_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._entries = {}   # 文章 ID -> (标题, 签名)
+        self._buckets = {}   # (段号, 段内容) -> [文章 ID]
+        self._pending = []   # 还没写入文件的新条目
+
+    @classmethod
+    def load(cls, path=NEAR_DUP_INDEX_FILE, csv_file=CSV_FILE):
+        """读取索引文件；不存在时按数据库 CSV 重建"""
+        index = cls(path)
+        if not os.path.exists(path):
+            index.rebuild(csv_file)
+            return index
+        with span("near_dup.load") as attrs:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    index._insert(entry["id"], entry.get("title", ""), np.array(entry["sig"], dtype=np.uint32))
+            attrs["entries"] = len(index._entries)
+        return index
+
+    def rebuild(self, csv_file=CSV_FILE):
+        """按数据库 CSV 重建索引（已标记为重复的文章不入索引）"""
+        with span("near_dup.rebuild") as attrs:
+            self._entries, self._buckets, self._pending = {}, {}, []
+            df = load_news(csv_file)
+            if not df.empty and "原文内容" in df.columns:
+                if DUPLICATE_COLUMN in df.columns:
+                    df = df[df[DUPLICATE_COLUMN].isna() | (df[DUPLICATE_COLUMN] == "")]
+                for aid, title, content in zip(df[ID_COLUMN], df["标题"], df["原文内容"]):
+                    self.add(aid, title, content)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.flush()
+            attrs["entries"] = len(self._entries)
+        print(f"[INFO] 查重索引已重建：{len(self._entries)} 篇")
+
+    def _insert(self, aid, title, sig):
+        if aid in self._entries:
+            return
+        self._entries[aid] = (title, sig)
+        for key in _band_keys(sig):
+            self._buckets.setdefault(key, []).append(aid)
+
+    def match(self, content, aid=None):
+        """
+        查找正文与之近似重复的已收录文章
+        返回相似度最高的一篇 {"id", "title", "similarity"}，没有返回 None
+        aid 已在索引中（同一篇文章再次获取）时返回 None，由按文章 ID 去重处理
+        """
+        if aid is not None and aid in self._entries:
+            return None
+        sig = signature(content)
+        if sig is None:
+            return None
+        candidates = {other for key in _band_keys(sig) for other in self._buckets.get(key, ())}
+        best = None
+        for other in candidates:
+            score = similarity(sig, self._entries[other][1])
+            if score >= self.threshold and (best is None or score > best["similarity"]):
+                best = {"id": other, "title": self._entries[other][0], "similarity": score}
+        return best
+
+    def add(self, aid, title, content):
+        """把一篇不重复的文章加入索引（调用 flush 后才写入文件），返回是否加入"""
+        sig = signature(content)
+        if sig is None or aid in self._entries:
+            return False
+        title = title if isinstance(title, str) else ""
+        self._insert(aid, title, sig)
+        self._pending.append({"id": aid, "title": title, "sig": sig.tolist()})
+        return True
+
+    def flush(self):
+        """把新加入的条目追加写入索引文件"""
+        if not self._pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._pending = []
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def duplicate_fields(match):
+    """重复文章要写入的字段：重复于、AI 分类、理由、审核状态（直接归为垃圾）"""
+    return {
+        DUPLICATE_COLUMN: match["id"],
+        "AI分类": "重复",
+        "AI理由": f"与「{match['title'][:30]}」内容重复（相似度 {match['similarity']:.0%}）",
+        "人工审核": "垃圾",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='正文近似重复检测索引')
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help=f'按 {CSV_FILE} 重建索引'
+    )
+    parser.add_argument(
+        '--check',
+        type=str,
+        help='检查一段正文（或文本文件路径）是否与已收录文章重复'
+    )
+
+    args = parser.parse_args()
+
+    if args.rebuild:
+        NearDupIndex(NEAR_DUP_INDEX_FILE).rebuild()
+    if args.check:
+        text = args.check
+        if os.path.exists(text):
+            with open(text, "r", encoding="utf-8") as f:
+                text = f.read()
+        result = NearDupIndex.load().match(text)
+        print(f"重复于 {result['id']}「{result['title']}」（相似度 {result['similarity']:.0%}）" if result else "没有重复")
@@ -0,0 +1,137 @@
+"""
+新闻数据文件读写
+- article_id(): 由标题 + 链接算出的稳定文章 ID（写入「文章ID」列），去重、排序、归档都按 ID 对应
+- load_news(): 读取数据库 CSV，旧数据缺 ID 的自动补上
+- article_location(): 文章所在位置（「当前」数据库或往期 vol.X），搜索索引、向量索引共用
+- apply_publish_order(): 拖拽排序后按 ID 批量更新「发布顺序」，只改动变化的行
+- atomic_write_csv(): 先写同目录临时文件再替换，写到一半崩溃也不会留下半截 CSV
+- write_csvs(): 多个 CSV 并发写入（归档时的存档、垃圾存档、数据库）
+
+用法:
+    from news_store import load_news, id_index, atomic_write_csv, write_csvs
+
+    df = load_news("news_database.csv")
+    row = id_index(df)[article_id]          # 文章 ID -> 行索引
+    atomic_write_csv(df, "news_database.csv")
+    write_csvs([(published_df, "archive/vol_12.csv"), (full_df, "news_database.csv")])
+"""
+
+import concurrent.futures
+import contextvars
+import hashlib
+import os
+import re
+
+import pandas as pd
+
+from disk_cache import write_atomic
+from tracing import span
+
+CSV_FILE = "news_database.csv"
+ID_COLUMN = "文章ID"
+LOCATION_CURRENT = "当前"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_title(title):
+    if title is None or (isinstance(title, float) and pd.isna(title)):
+        return ""
+    return _WHITESPACE.sub(" ", str(title)).strip().casefold()
+
+
+def _normalize_url(url):
+    if url is None or (isinstance(url, float) and pd.isna(url)):
+        return ""
+    # 去掉页内锚点和结尾斜杠，其余（包括查询参数）保留
+    return str(url).strip().split("#", 1)[0].rstrip("/")
+
+
+def article_id(title, url) -> str:
+    """文章 ID：规范化后的 标题 + 链接 的哈希（16 位十六进制）"""
+    key = f"{_normalize_title(title)}\n{_normalize_url(url)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def assign_ids(df):
+    """给缺少文章 ID 的行补上 ID（原地修改），返回补上的行数"""
+    if ID_COLUMN not in df.columns:
+        df[ID_COLUMN] = None
+    if df.empty:
+        return 0
+    missing = df[ID_COLUMN].isna() | (df[ID_COLUMN].astype(str) == "")
+    count = int(missing.sum())
+    if count:
+        titles = df.loc[missing, "标题"] if "标题" in df.columns else [None] * count
+        urls = df.loc[missing, "链接"] if "链接" in df.columns else [None] * count
+        df.loc[missing, ID_COLUMN] = [article_id(t, u) for t, u in zip(titles, urls)]
+    return count
+
+
+def id_index(df) -> dict:
+    """文章 ID -> 行索引（ID 重复时以第一行为准）"""
+    index = {}
+    for label, value in zip(df.index, df[ID_COLUMN]):
+        index.setdefault(value, label)
+    return index
+
+
+def apply_publish_order(df, ordered_ids, column="发布顺序"):
+    """
+    按文章 ID 列表批量写入发布顺序（1, 2, 3...，原地修改）
+    只改动顺序真正变了的行，返回改动的行数（为 0 时不用保存）
+    """
+    # ID 重复时按第一次出现的位置排（Series 索引有重复会让 map 报错）
+    positions = {aid: position for position, aid in enumerate(dict.fromkeys(ordered_ids), 1)}
+    target = df[ID_COLUMN].map(positions)
+    current = pd.to_numeric(df[column], errors="coerce")
+    changed = target.notna() & (current != target)
+    count = int(changed.sum())
+    if count:
+        df.loc[changed, column] = target[changed]
+    return count
+
+
+def article_location(record, default):
+    """当前数据库里已发布的文章，位置记为它所在的期号；其余用 default"""
+    status = record.get("人工审核")
+    if default == LOCATION_CURRENT and isinstance(status, str) and status.startswith("已发布 vol."):
+        return status[len("已发布 "):]
+    return default
+
+
+def load_news(path):
+    """读取数据库 CSV 并补齐文章 ID；文件不存在或为空时返回空表"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    try:
+        df = pd.read_csv(path, dtype={ID_COLUMN: str})
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=[ID_COLUMN])
+    assign_ids(df)
+    return df
+
+
+def atomic_write_csv(df, path, **to_csv_kwargs):
+    """把 DataFrame 原子地写成 CSV（默认不写行索引）"""
+    to_csv_kwargs.setdefault("index", False)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with span("csv.write", path=os.path.basename(path), rows=len(df)):
+        write_atomic(path, lambda tmp: df.to_csv(tmp, **to_csv_kwargs), suffix=".csv")
+    return path
+
+
+def write_csvs(jobs, **to_csv_kwargs):
+    """
+    并发写入多个 CSV
+    jobs: [(DataFrame, 路径), ...]
+    任何一个失败都会抛出异常（其余文件照常写完）
+    """
+    if len(jobs) <= 1:
+        return [atomic_write_csv(df, path, **to_csv_kwargs) for df, path in jobs]
+    with concurrent.futures.ThreadPoolExecutor(len(jobs)) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, atomic_write_csv, df, path, **to_csv_kwargs)
+            for df, path in jobs
+        ]
+    return [future.result() for future in futures]
@@ -0,0 +1,166 @@
+"""
+一键发布模块
+从入库文章一次性生成全部发布物：飞书文档、公众号 HTML、卡片文本、社群文案
+
+- 飞书、社群文案要等网络/大模型，放到线程池里并发执行
+- 公众号 HTML、卡片文本是本地计算，在调用方线程里直接生成
+- 公众号 HTML、卡片文本按 (期号, 内容哈希) 缓存，内容没变时直接复用上次的结果
+- 飞书文档不缓存：同一期的文档会被「重新生成」原地修改，缓存的结果可能和文档内容对不上；
+  增量更新本身在没有改动时只读一次文档
+
+用法:
+    from publish_bundle import build_bundle
+
+    def on_progress(name, result):
+        print(ARTIFACT_LABELS[name], result["status"])
+
+    results = build_bundle("12", articles, other_titles, on_progress=on_progress)
+"""
+
+import concurrent.futures
+import contextvars
+import time
+
+from card_export import generate_card_txt, write_card_txt
+from community_copy import generate_community_copy
+from config import BUNDLE_CACHE_DIR, BUNDLE_CACHE_MAX_ENTRIES
+from disk_cache import JsonCache, content_hash
+from publish_feishu import FeishuPublisher, clean_articles
+from tracing import span
+from wechat_format import generate_wechat_html
+
+ARTIFACT_LABELS = {
+    "feishu": "飞书文档",
+    "wechat": "公众号 HTML",
+    "card_txt": "卡片文本",
+    "copy": "社群文案",
+}
+
+# 需要等网络的发布物（放到线程池）
+NETWORK_ARTIFACTS = ("feishu", "copy")
+
+
+bundle_cache = JsonCache(BUNDLE_CACHE_DIR, BUNDLE_CACHE_MAX_ENTRIES)
+
+
+# ================= 各发布物的生成函数 =================
+# 每个函数返回 (缓存键, 生成函数)，生成函数的返回值必须可 JSON 序列化
+# 缓存键为 None 表示不走这里的缓存（自带缓存或不能缓存），生成函数返回 (结果, 是否命中缓存)
+
+def _feishu_job(vol, articles, other_titles, force):
+    # 不走缓存：有该期的文档记录时增量更新（没有改动就不写），否则新建
+    def build():
+        doc_id, doc_url = FeishuPublisher().update_weekly_report(vol, articles)
+        return {"doc_id": doc_id, "url": doc_url}, False
+
+    return None, build
+
+
+def _wechat_job(vol, articles, other_titles, force):
+    key = content_hash("wechat", vol, articles)
+    return key, lambda: generate_wechat_html(articles, vol or "X")
+
+
+def _card_txt_job(vol, articles, other_titles, force):
+    key = content_hash("card_txt", articles[:5])
+    return key, lambda: generate_card_txt(articles, max_count=5)
+
+
+def _copy_job(vol, articles, other_titles, force):
+    # 社群文案复用 community_copy 自己的缓存（与「💬 文案」按钮共用）
+    def build():
+        result = generate_community_copy(articles[:5], other_titles, force_refresh=force)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "生成失败"))
+        return result, result["cached"]
+
+    return None, build
+
+
+ARTIFACT_JOBS = {
+    "feishu": _feishu_job,
+    "wechat": _wechat_job,
+    "card_txt": _card_txt_job,
+    "copy": _copy_job,
+}
+
+
+def _run_artifact(name, vol, key, build, force):
+    """生成单个发布物，返回 {"status", "value", "error", "seconds"}"""
+    start = time.perf_counter()
+    with span("bundle.artifact", artifact=name, vol=vol) as attrs:
+        if key is None:
+            # 不走这里缓存的发布物（社群文案自带缓存，飞书文档每次都增量更新）
+            try:
+                value, cached = build()
+            except Exception as e:
+                return {"status": "error", "value": None, "error": str(e),
+                        "seconds": time.perf_counter() - start}
+            attrs["cached"] = cached
+            return {"status": "cached" if cached else "done", "value": value, "error": None,
+                    "seconds": time.perf_counter() - start}
+
+        # 文件名带上期号和发布物名称，方便按期查看缓存
+        key = f"vol{vol}-{name}-{key[:32]}"
+        if not force:
+            cached = bundle_cache.get(key)
+            if cached is not None:
+                attrs["cached"] = True
+                return {"status": "cached", "value": cached, "error": None,
+                        "seconds": time.perf_counter() - start}
+        try:
+            value = build()
+        except Exception as e:
+            return {"status": "error", "value": None, "error": str(e),
+                    "seconds": time.perf_counter() - start}
+        bundle_cache.put(key, value)
+        return {"status": "done", "value": value, "error": None,
+                "seconds": time.perf_counter() - start}
+
+
+def build_bundle(vol, articles, other_titles=None, on_progress=None, force=False, artifacts=None, max_workers=4):
+    """
+    并发生成全部发布物
+    vol: 期号
+    articles: 入库文章（已按发布顺序排列）
+    other_titles: 其余文章标题（社群文案用）
+    on_progress: 回调 (名称, 结果)，每完成一个发布物在调用方线程里调用一次，可用于刷新界面
+    force: True 时忽略缓存全部重新生成
+    artifacts: 只生成其中几项，默认全部
+    返回: {名称: {"status": done/cached/error, "value", "error", "seconds"}}
+    """
+    articles = clean_articles(articles)
+    other_titles = list(other_titles or [])
+    names = [name for name in ARTIFACT_JOBS if artifacts is None or name in artifacts]
+    results = {}
+
+    def finish(name, result):
+        results[name] = result
+        if on_progress:
+            on_progress(name, result)
+
+    with span("bundle.build", vol=vol, articles=len(articles)):
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+            futures = {}
+            for name in names:
+                if name in NETWORK_ARTIFACTS:
+                    key, build = ARTIFACT_JOBS[name](vol, articles, other_titles, force)
+                    # 带上当前上下文，保证追踪 span 能正确嵌套
+                    future = pool.submit(contextvars.copy_context().run, _run_artifact, name, vol, key, build, force)
+                    futures[future] = name
+
+            # 本地生成的发布物在等网络的同时做完
+            for name in names:
+                if name not in NETWORK_ARTIFACTS:
+                    key, build = ARTIFACT_JOBS[name](vol, articles, other_titles, force)
+                    finish(name, _run_artifact(name, vol, key, build, force))
+
+            for future in concurrent.futures.as_completed(futures):
+                finish(futures[future], future.result())
+
+    # 卡片文本写到 card_generator 默认读取的文件
+    card = results.get("card_txt")
+    if card and card["value"] is not None:
+        write_card_txt(card["value"])
+
+    return results
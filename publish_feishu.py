@@ -3,10 +3,124 @@
 用于自动创建飞书云文档并写入周报内容
 """
 
+import concurrent.futures
+import contextvars
+import difflib
+import math
+import os
+import threading
+import time
 import requests
 import json
-import re
-from config import FEISHU_APP_ID, FEISHU_APP_SECRET, WEEKLY_REPORT_TITLE_TEMPLATE
+from config import (
+    FEISHU_APP_ID, FEISHU_APP_SECRET, WEEKLY_REPORT_TITLE_TEMPLATE, FEISHU_DOC_STATE_FILE,
+    FEISHU_DOC_EDITS_PER_SECOND,
+)
+from disk_cache import content_hash, write_bytes_atomic
+from markdown_bold import to_feishu_elements
+from tracing import span
+
+# 飞书 API 限制：每次最多创建 50 个子块、批量更新最多 200 个块
+CREATE_BATCH_SIZE = 50
+UPDATE_BATCH_SIZE = 200
+
+SEPARATOR_TEXT = "———————————————————"
+# 文章之间的分隔线（除了第一篇，每篇前面一条）
+SEPARATOR_BLOCK = {
+    "block_type": 2,
+    "text": {
+        "style": {},
+        "elements": [{
+            "text_run": {
+                "content": SEPARATOR_TEXT
+            }
+        }]
+    }
+}
+
+# tenant_access_token 提前多少秒刷新（飞书 token 有效期 2 小时）
+TOKEN_REFRESH_MARGIN = 300
+# token 无效/过期的错误码，遇到后刷新 token 重试一次
+TOKEN_INVALID_CODES = {99991661, 99991663, 99991664}
+# 获取 token 的请求超时（秒）
+TOKEN_REQUEST_TIMEOUT = 10
+
+# 触发频率限制时的错误码，遇到后退避重试
+RATE_LIMIT_CODES = {99991400}
+MAX_RATE_LIMIT_RETRIES = 4
+
+
+class RateLimiter:
+    """令牌桶限流：平均每秒最多 rate 次，允许 burst 次突发（线程安全）"""
+    
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# 进程内共享的 token 缓存：app_id -> {"token", "expires_at"}
+# Streamlit 每次点击都会新建 FeishuPublisher，放在模块级才能跨实例、跨线程复用
+_token_cache = {}
+_token_lock = threading.Lock()
+
+
+def invalidate_token(app_id: str = FEISHU_APP_ID):
+    """作废缓存的 token（接口返回 token 失效时调用）"""
+    with _token_lock:
+        _token_cache.pop(app_id, None)
+
+
+# 每个文档一个限流器（飞书按文档限制编辑频率），进程内共享
+_doc_limiters = {}
+_doc_limiters_lock = threading.Lock()
+
+
+def get_doc_limiter(document_id: str) -> RateLimiter:
+    with _doc_limiters_lock:
+        limiter = _doc_limiters.get(document_id)
+        if limiter is None:
+            # burst=1：请求均匀间隔，任意一秒内都不会超过限额
+            limiter = _doc_limiters[document_id] = RateLimiter(FEISHU_DOC_EDITS_PER_SECOND, burst=1)
+        return limiter
+
+
+# 文档记录文件的写锁（Streamlit 的多个会话在同一进程的不同线程里）
+_doc_state_lock = threading.Lock()
+
+
+def clean_articles(articles: list) -> list:
+    """
+    清洗文章数据，移除 NaN/inf 等非法 JSON 值
+    """
+    cleaned = []
+    for article in articles:
+        clean_article = {}
+        for key, value in article.items():
+            # 处理 float 类型的 NaN 和 inf
+            if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+                clean_article[key] = ""
+            # 处理 None
+            elif value is None:
+                clean_article[key] = ""
+            else:
+                clean_article[key] = value
+        cleaned.append(clean_article)
+    return cleaned
 
 
 def parse_markdown_bold(text: str) -> list:
@@ -14,56 +128,7 @@ def parse_markdown_bold(text: str) -> list:
     解析 Markdown 加粗格式 (**text**)，转换为飞书 elements 数组
     返回: [{"text_run": {"content": "普通文本"}}, {"text_run": {"content": "加粗文本", "text_element_style": {"bold": True}}}, ...]
     """
-    elements = []
-    
-    # 使用正则表达式匹配 **text** 格式
-    pattern = r'\*\*(.+?)\*\*'
-    last_end = 0
-    
-    for match in re.finditer(pattern, text):
-        # 添加匹配之前的普通文本
-        if match.start() > last_end:
-            normal_text = text[last_end:match.start()]
-            if normal_text:
-                elements.append({
-                    "text_run": {
-                        "content": normal_text
-                    }
-                })
-        
-        # 添加加粗文本
-        bold_text = match.group(1)
-        if bold_text:
-            elements.append({
-                "text_run": {
-                    "content": bold_text,
-                    "text_element_style": {
-                        "bold": True
-                    }
-                }
-            })
-        
-        last_end = match.end()
-    
-    # 添加最后剩余的普通文本
-    if last_end < len(text):
-        remaining_text = text[last_end:]
-        if remaining_text:
-            elements.append({
-                "text_run": {
-                    "content": remaining_text
-                }
-            })
-    
-    # 如果没有匹配到任何加粗格式，返回整个文本作为普通文本
-    if not elements:
-        elements.append({
-            "text_run": {
-                "content": text
-            }
-        })
-    
-    return elements
+    return to_feishu_elements(text)
 
 
 class FeishuPublisher:
@@ -73,25 +138,40 @@ class FeishuPublisher:
         self.app_id = FEISHU_APP_ID
         self.app_secret = FEISHU_APP_SECRET
         self.base_url = "https://open.feishu.cn/open-apis"
-        self._tenant_access_token = None
     
-    def get_tenant_access_token(self):
-        """获取 tenant_access_token"""
-        if self._tenant_access_token:
-            return self._tenant_access_token
-        
+    def get_tenant_access_token(self, force_refresh: bool = False):
+        """
+        获取 tenant_access_token
+        进程内共享缓存，距离过期不足 TOKEN_REFRESH_MARGIN 秒时提前刷新
+        """
+        with _token_lock:
+            cached = _token_cache.get(self.app_id)
+            if cached and not force_refresh and time.time() < cached["expires_at"] - TOKEN_REFRESH_MARGIN:
+                return cached["token"]
+            
+            # 持锁请求，多个线程同时过期时只刷新一次
+            with span("feishu.token", refresh=bool(cached)):
+                token, expire = self._fetch_tenant_access_token()
+            _token_cache[self.app_id] = {"token": token, "expires_at": time.time() + expire}
+            return token
+    
+    def _fetch_tenant_access_token(self):
+        """
+        请求新的 tenant_access_token
+        返回: (token, 有效期秒数)
+        """
         url = f"{self.base_url}/auth/v3/tenant_access_token/internal"
         payload = {
             "app_id": self.app_id,
             "app_secret": self.app_secret
         }
         
-        response = requests.post(url, json=payload)
+        # 调用方持有进程级的 token 锁，必须设超时，否则一次卡住的请求会堵住所有发布线程
+        response = requests.post(url, json=payload, timeout=TOKEN_REQUEST_TIMEOUT)
         data = response.json()
         
         if data.get("code") == 0:
-            self._tenant_access_token = data.get("tenant_access_token")
-            return self._tenant_access_token
+            return data.get("tenant_access_token"), data.get("expire", 7200)
         else:
             raise Exception(f"获取 token 失败: {data.get('msg')}")
     
@@ -135,23 +215,53 @@ class FeishuPublisher:
         else:
             raise Exception(f"获取文档块失败: {data.get('msg')}")
     
+    def get_root_children(self, document_id: str) -> list:
+        """文档根节点下各子块的 block_id（按文档中的顺序）"""
+        return self.get_document_blocks(document_id).get("children", [])
+    
+    def _doc_request(self, method: str, document_id: str, url: str, payload: dict):
+        """
+        发送文档编辑请求：先过该文档的限流器，触发频率限制时指数退避重试
+        返回: 响应 JSON
+        """
+        limiter = get_doc_limiter(document_id)
+        token_refreshed = False
+        attempt = 0
+        
+        while True:
+            headers = {
+                "Authorization": f"Bearer {self.get_tenant_access_token()}",
+                "Content-Type": "application/json"
+            }
+            limiter.acquire()
+            response = requests.request(method, url, headers=headers, json=payload)
+            try:
+                data = response.json()
+            except ValueError:
+                data = {"code": response.status_code, "msg": response.text[:200]}
+            if data.get("code") in TOKEN_INVALID_CODES and not token_refreshed:
+                # token 被提前作废（如应用凭证重置），刷新后重试一次（不计入限流重试次数）
+                invalidate_token(self.app_id)
+                token_refreshed = True
+                continue
+            limited = response.status_code == 429 or data.get("code") in RATE_LIMIT_CODES
+            if not limited or attempt >= MAX_RATE_LIMIT_RETRIES:
+                return data
+            wait = 0.5 * (2 ** attempt)
+            attempt += 1
+            print(f"[WARN] 飞书限流，{wait:.1f} 秒后重试 ({attempt}/{MAX_RATE_LIMIT_RETRIES})")
+            time.sleep(wait)
+    
     def create_blocks(self, document_id: str, block_id: str, blocks: list, index: int = 0):
         """在文档中创建内容块"""
-        token = self.get_tenant_access_token()
         url = f"{self.base_url}/docx/v1/documents/{document_id}/blocks/{block_id}/children"
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "children": blocks,
             "index": index
         }
         
-        response = requests.post(url, headers=headers, json=payload)
-        data = response.json()
+        data = self._doc_request("POST", document_id, url, payload)
         
         if data.get("code") == 0:
             return data.get("data")
@@ -163,6 +273,35 @@ class FeishuPublisher:
             print(f"[DEBUG] 飞书API响应: {data}")
             raise Exception(f"写入内容失败: {error_detail}")
     
+    def batch_delete_blocks(self, document_id: str, block_id: str, start_index: int, end_index: int):
+        """删除父块下 [start_index, end_index) 范围内的子块"""
+        url = f"{self.base_url}/docx/v1/documents/{document_id}/blocks/{block_id}/children/batch_delete"
+        
+        payload = {
+            "start_index": start_index,
+            "end_index": end_index
+        }
+        
+        data = self._doc_request("DELETE", document_id, url, payload)
+        
+        if data.get("code") == 0:
+            return data.get("data")
+        else:
+            print(f"[DEBUG] 飞书API响应: {data}")
+            raise Exception(f"删除内容失败: code: {data.get('code')}, msg: {data.get('msg')}")
+    
+    def batch_update_blocks(self, document_id: str, requests_list: list):
+        """批量更新块内容（每次最多 200 个）"""
+        url = f"{self.base_url}/docx/v1/documents/{document_id}/blocks/batch_update"
+        
+        data = self._doc_request("PATCH", document_id, url, {"requests": requests_list})
+        
+        if data.get("code") == 0:
+            return data.get("data")
+        else:
+            print(f"[DEBUG] 飞书API响应: {data}")
+            raise Exception(f"更新内容失败: code: {data.get('code')}, msg: {data.get('msg')}")
+    
     def set_public_edit(self, document_id: str):
         """设置文档为「获得链接的人可编辑」"""
         token = self.get_tenant_access_token()
@@ -196,110 +335,114 @@ class FeishuPublisher:
         根据文章列表构建飞书文档块
         articles: [{"标题": "", "原文内容": "", "链接": "", "来源名称": "", "每日排名": 1}, ...]
         """
+        return [block for unit in self.build_article_units(articles) for block in unit["blocks"]]
+    
+    def build_article_units(self, articles: list):
+        """
+        按文章拆分文档块：每篇文章（标题 + 正文 + 来源）是一个单元，相邻两篇之间的分隔线单独算一个单元
+        返回: [{"hash": 内容哈希, "title": 标题（分隔线为 None）, "number": 序号（分隔线为 None）, "blocks": [...]}, ...]
+        hash 不含序号，文章只是重新编号时不算改动；分隔线不算进文章，换了第一篇也不用重写它后面那篇
+        """
+        units = []
+        for i, article in enumerate(articles, 1):
+            if i > 1:
+                units.append({
+                    "hash": content_hash(SEPARATOR_BLOCK),
+                    "title": None,
+                    "number": None,
+                    "blocks": [SEPARATOR_BLOCK],
+                })
+            units.append({
+                "hash": content_hash(self._build_article_blocks(article, None)),
+                "title": article.get("标题", "无标题"),
+                "number": i,
+                "blocks": self._build_article_blocks(article, i),
+            })
+        return units
+    
+    def _heading_elements(self, title, number):
+        content = f"{number:02d} {title}" if number is not None else title
+        return [{"text_run": {"content": content}}]
+    
+    def _build_article_blocks(self, article: dict, number):
+        """构建单篇文章的文档块（number 为 None 时标题不带序号，用于计算哈希）"""
         blocks = []
+        title = article.get("标题", "无标题")
+        content = article.get("原文内容", "") or article.get("AI总结", "")
+        link = article.get("链接", "")
+        reference = article.get("来源名称", "") or self._extract_source_name(link)
         
-        for i, article in enumerate(articles, 1):
-            title = article.get("标题", "无标题")
-            content = article.get("原文内容", "") or article.get("AI总结", "")
-            link = article.get("链接", "")
-            reference = article.get("来源名称", "") or self._extract_source_name(link)
-            
-            # 标题块 (Heading2)
-            heading_block = {
-                "block_type": 4,  # heading2
-                "heading2": {
+        # 标题块 (Heading2)
+        blocks.append({
+            "block_type": 4,  # heading2
+            "heading2": {
+                "style": {},
+                "elements": self._heading_elements(title, number)
+            }
+        })
+        
+        # 正文块 (Text) - 支持 **加粗** 格式
+        if content:
+            # 分段处理长文本，每段不超过 2000 字符
+            paragraphs = content.split('\n\n')
+            for para in paragraphs:
+                para_text = para.strip()
+                if para_text:
+                    # 限制单段长度
+                    if len(para_text) > 2000:
+                        para_text = para_text[:2000] + "..."
+                    
+                    # 解析 Markdown 加粗格式
+                    elements = parse_markdown_bold(para_text)
+                    
+                    blocks.append({
+                        "block_type": 2,  # text
+                        "text": {
+                            "style": {},
+                            "elements": elements
+                        }
+                    })
+        
+        # 来源链接块（带超链接）
+        if link and reference:
+            blocks.append({
+                "block_type": 2,  # text
+                "text": {
                     "style": {},
                     "elements": [
                         {
                             "text_run": {
-                                "content": f"{i:02d} {title}"
-                            }
-                        }
-                    ]
-                }
-            }
-            blocks.append(heading_block)
-            
-            # 正文块 (Text) - 支持 **加粗** 格式
-            if content:
-                # 分段处理长文本，每段不超过 2000 字符
-                paragraphs = content.split('\n\n')
-                for para in paragraphs:
-                    para_text = para.strip()
-                    if para_text:
-                        # 限制单段长度
-                        if len(para_text) > 2000:
-                            para_text = para_text[:2000] + "..."
-                        
-                        # 解析 Markdown 加粗格式
-                        elements = parse_markdown_bold(para_text)
-                        
-                        text_block = {
-                            "block_type": 2,  # text
-                            "text": {
-                                "style": {},
-                                "elements": elements
+                                "content": "来源："
                             }
-                        }
-                        blocks.append(text_block)
-            
-            # 来源链接块（带超链接）
-            if link and reference:
-                link_block = {
-                    "block_type": 2,  # text
-                    "text": {
-                        "style": {},
-                        "elements": [
-                            {
-                                "text_run": {
-                                    "content": "来源："
-                                }
-                            },
-                            {
-                                "text_run": {
-                                    "content": reference,
-                                    "text_element_style": {
-                                        "link": {
-                                            "url": link
-                                        }
+                        },
+                        {
+                            "text_run": {
+                                "content": reference,
+                                "text_element_style": {
+                                    "link": {
+                                        "url": link
                                     }
                                 }
                             }
-                        ]
-                    }
-                }
-                blocks.append(link_block)
-            elif reference:
-                # 只有来源名称，没有链接
-                link_block = {
-                    "block_type": 2,
-                    "text": {
-                        "style": {},
-                        "elements": [
-                            {
-                                "text_run": {
-                                    "content": f"来源：{reference}"
-                                }
-                            }
-                        ]
-                    }
+                        }
+                    ]
                 }
-                blocks.append(link_block)
-            
-            # 空行分隔（除了最后一篇）
-            if i < len(articles):
-                empty_block = {
-                    "block_type": 2,
-                    "text": {
-                        "style": {},
-                        "elements": [{
+            })
+        elif reference:
+            # 只有来源名称，没有链接
+            blocks.append({
+                "block_type": 2,
+                "text": {
+                    "style": {},
+                    "elements": [
+                        {
                             "text_run": {
-                                "content": "———————————————————"
+                                "content": f"来源：{reference}"
                             }
-                        }]
-                    }
+                        }
+                    ]
                 }
-                blocks.append(empty_block)
+            })
         
         return blocks
     
@@ -326,25 +469,78 @@ class FeishuPublisher:
             except:
                 return "链接"
     
-    def _clean_articles(self, articles: list) -> list:
+    # ---------- 文档记录（期号 -> 文档 ID + 各文章块 ID） ----------
+    
+    def _load_doc_states(self):
+        if not os.path.exists(FEISHU_DOC_STATE_FILE):
+            return {}
+        try:
+            with open(FEISHU_DOC_STATE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[WARN] 读取文档记录失败: {e}")
+            return {}
+    
+    def get_doc_state(self, vol: str):
+        """获取某一期已发布文档的记录，没有返回 None"""
+        return self._load_doc_states().get(str(vol))
+    
+    def _save_doc_state(self, vol: str, state: dict):
+        # 读-改-写整个文件，加锁防止两个会话同时保存时互相覆盖对方那一期的记录
+        with _doc_state_lock:
+            states = self._load_doc_states()
+            states[str(vol)] = state
+            data = json.dumps(states, ensure_ascii=False, indent=2).encode("utf-8")
+            write_bytes_atomic(FEISHU_DOC_STATE_FILE, data)
+    
+    # ---------- 写入 ----------
+    
+    def _write_units(self, document_id: str, units: list, index: int):
         """
-        清洗文章数据，移除 NaN/inf 等非法 JSON 值
+        把若干文章单元按顺序写到文档根节点的 index 位置
+        返回: 每个单元的 {"block_ids": 根节点下的块 ID, "heading_id": 标题块 ID}
         """
-        import math
-        cleaned = []
-        for article in articles:
-            clean_article = {}
-            for key, value in article.items():
-                # 处理 float 类型的 NaN 和 inf
-                if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
-                    clean_article[key] = ""
-                # 处理 None
-                elif value is None:
-                    clean_article[key] = ""
-                else:
-                    clean_article[key] = value
-            cleaned.append(clean_article)
-        return cleaned
+        if not units:
+            return []
+        
+        # 只能顺序写入：每批最多 50 个块，后一批的插入位置要等前一批建好才存在，
+        # 而且同一文档的编辑受 3 次/秒限流，并发也不会更快
+        blocks = [block for unit in units for block in unit["blocks"]]
+        created_ids = []
+        current_index = index
+        
+        for i in range(0, len(blocks), CREATE_BATCH_SIZE):
+            batch = blocks[i:i + CREATE_BATCH_SIZE]
+            with span("feishu.batch", index=current_index, size=len(batch)):
+                data = self.create_blocks(document_id, document_id, batch, index=current_index)
+            created_ids.extend(child.get("block_id") for child in (data or {}).get("children", []))
+            current_index += len(batch)
+        
+        written = []
+        cursor = 0
+        for unit in units:
+            ids = created_ids[cursor:cursor + len(unit["blocks"])]
+            heading_pos = self._heading_position(unit)
+            written.append({
+                "block_ids": ids,
+                "heading_id": ids[heading_pos] if heading_pos is not None and heading_pos < len(ids) else None,
+            })
+            cursor += len(unit["blocks"])
+        return written
+    
+    def _heading_position(self, unit: dict):
+        """标题块在单元中的位置（分隔线单元没有标题，返回 None）"""
+        return next((i for i, block in enumerate(unit["blocks"]) if block["block_type"] == 4), None)
+    
+    def _unit_state(self, unit: dict, written: dict):
+        """单元的记录：哈希、根节点下的块 ID、标题块 ID 和当前序号（分隔线的标题、序号为 None）"""
+        return {
+            "hash": unit["hash"],
+            "block_ids": written["block_ids"],
+            "heading_id": written["heading_id"],
+            "heading_title": unit["title"],
+            "number": unit["number"],
+        }
 
     def publish_weekly_report(self, vol: str, articles: list, folder_token: str = None):
         """
@@ -355,33 +551,128 @@ class FeishuPublisher:
         
         返回: (document_id, document_url)
         """
-        # 0. 清洗数据，移除 NaN/inf 等非法值
-        articles = self._clean_articles(articles)
+        with span("feishu.publish", vol=vol, articles=len(articles)):
+            # 0. 清洗数据，移除 NaN/inf 等非法值
+            articles = clean_articles(articles)
 
-        # 1. 创建文档
-        title = WEEKLY_REPORT_TITLE_TEMPLATE.format(vol=vol)
-        document_id = self.create_document(title, folder_token)
-        
-        # 2. 设置文档权限为「链接可编辑」
-        self.set_public_edit(document_id)
-        
-        # 3. 构建内容块
-        blocks = self.build_weekly_report_blocks(articles)
-        
-        # 4. 分批写入内容（飞书 API 限制每次最多 50 个 children）
-        BATCH_SIZE = 50
-        current_index = 0
-        
-        for i in range(0, len(blocks), BATCH_SIZE):
-            batch = blocks[i:i + BATCH_SIZE]
-            if batch:
-                self.create_blocks(document_id, document_id, batch, index=current_index)
-                current_index += len(batch)
+            # 1. 创建文档
+            title = WEEKLY_REPORT_TITLE_TEMPLATE.format(vol=vol)
+            with span("feishu.create_document"):
+                document_id = self.create_document(title, folder_token)
+            
+            # 2. 构建内容块（按文章拆成单元）
+            with span("feishu.build_blocks") as attrs:
+                units = self.build_article_units(articles)
+                attrs["blocks"] = sum(len(unit["blocks"]) for unit in units)
+            
+            with concurrent.futures.ThreadPoolExecutor(1) as pool:
+                # 3. 设置文档权限为「链接可编辑」（权限接口不占文档编辑限额，和写入内容同时进行）
+                def set_permission():
+                    with span("feishu.set_public_edit"):
+                        return self.set_public_edit(document_id)
+                permission_future = pool.submit(contextvars.copy_context().run, set_permission)
+                
+                # 4. 分批写入内容（飞书 API 限制每次最多 50 个 children）
+                written = self._write_units(document_id, units, 0)
+                permission_future.result()
+            
+            # 5. 记录各文章的块 ID，之后「重新生成」可以只改动有变化的文章
+            doc_url = f"https://bytedance.larkoffice.com/docx/{document_id}"
+            self._save_doc_state(vol, {
+                "document_id": document_id,
+                "url": doc_url,
+                "units": [self._unit_state(u, w) for u, w in zip(units, written)],
+            })
+            
+            # 6. 返回文档链接
+            return document_id, doc_url
+    
+    def update_weekly_report(self, vol: str, articles: list, folder_token: str = None):
+        """
+        增量更新已发布的周报：只删除/插入有变化的文章，挪了位置的文章只改序号
+        没有该期的文档记录时退回到 publish_weekly_report 新建文档
         
-        # 5. 返回文档链接
-        doc_url = f"https://bytedance.larkoffice.com/docx/{document_id}"
+        返回: (document_id, document_url)
+        """
+        state = self.get_doc_state(vol)
+        if not state or not state.get("units"):
+            print(f"[INFO] 没有 vol.{vol} 的文档记录，新建文档")
+            return self.publish_weekly_report(vol, articles, folder_token)
         
-        return document_id, doc_url
+        with span("feishu.update", vol=vol, articles=len(articles)) as attrs:
+            articles = clean_articles(articles)
+            document_id = state["document_id"]
+            old_units = state["units"]
+            new_units = self.build_article_units(articles)
+            
+            # 文档中每个旧单元的起始位置
+            old_starts = [0]
+            for unit in old_units:
+                old_starts.append(old_starts[-1] + len(unit["block_ids"]))
+            
+            # 文档链接可编辑，有人手动改过时记录里的位置就对不上了，按位置删除会删错文章
+            with span("feishu.verify"):
+                live_ids = self.get_root_children(document_id)
+            if any(live_ids[old_starts[i]:old_starts[i + 1]] != unit["block_ids"] for i, unit in enumerate(old_units)):
+                print(f"[WARN] vol.{vol} 的文档已被手动修改，和记录对不上，改为重新发布新文档")
+                attrs["fallback"] = True
+                return self.publish_weekly_report(vol, articles, folder_token)
+            
+            matcher = difflib.SequenceMatcher(
+                None, [u["hash"] for u in old_units], [u["hash"] for u in new_units], autojunk=False
+            )
+            opcodes = matcher.get_opcodes()
+            
+            # 新单元位置 -> 记录（未变化的沿用旧记录）
+            new_states = [None] * len(new_units)
+            deleted = inserted = 0
+            
+            # 从后往前处理，前面单元在文档中的位置不受影响
+            # 每删除、写入一次就保存记录：中途失败时记录仍和文档一致（前面是没动过的旧单元，后面是已处理好的）
+            for tag, i1, i2, j1, j2 in reversed(opcodes):
+                if tag == "equal":
+                    for offset in range(i2 - i1):
+                        new_states[j1 + offset] = dict(old_units[i1 + offset])
+                    continue
+                if i2 > i1:
+                    with span("feishu.delete", start=old_starts[i1], end=old_starts[i2]):
+                        self.batch_delete_blocks(document_id, document_id, old_starts[i1], old_starts[i2])
+                    deleted += sum(1 for u in old_units[i1:i2] if u.get("number") is not None)
+                    state["units"] = old_units[:i1] + new_states[j2:]
+                    self._save_doc_state(vol, state)
+                if j2 > j1:
+                    written = self._write_units(document_id, new_units[j1:j2], old_starts[i1])
+                    for offset, unit_written in enumerate(written):
+                        new_states[j1 + offset] = self._unit_state(new_units[j1 + offset], unit_written)
+                    inserted += sum(1 for u in new_units[j1:j2] if u["number"] is not None)
+                    state["units"] = old_units[:i1] + new_states[j1:]
+                    self._save_doc_state(vol, state)
+            state["units"] = new_states
+            
+            # 位置变了的文章只需要重新编号标题
+            renumber = []
+            for unit_state, unit in zip(new_states, new_units):
+                number = unit["number"]
+                if number is not None and unit_state["number"] != number and unit_state.get("heading_id"):
+                    renumber.append((unit_state, number, {
+                        "block_id": unit_state["heading_id"],
+                        "update_text_elements": {
+                            "elements": self._heading_elements(unit_state["heading_title"], number)
+                        }
+                    }))
+            for i in range(0, len(renumber), UPDATE_BATCH_SIZE):
+                batch = renumber[i:i + UPDATE_BATCH_SIZE]
+                with span("feishu.renumber", size=len(batch)):
+                    self.batch_update_blocks(document_id, [request for _, _, request in batch])
+                for unit_state, number, _ in batch:
+                    unit_state["number"] = number
+                self._save_doc_state(vol, state)
+            
+            attrs.update(deleted=deleted, inserted=inserted, renumbered=len(renumber))
+            print(f"[INFO] 增量更新完成：删除 {deleted} 篇，写入 {inserted} 篇，重新编号 {len(renumber)} 篇")
+            
+            self._save_doc_state(vol, state)
+            return document_id, state["url"]
 
 
 def test_connection():
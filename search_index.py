@@ -0,0 +1,260 @@
+"""
+全文搜索索引
+用 SQLite FTS5 给当前数据库和往期存档的文章建全文索引，按相关度（bm25）排序返回
+
+- 中文没有空格分词，入库前把连续的汉字切成重叠的二字词（「法律科技」→「法律 律科 科技」），
+  英文、数字按单词保留；查询词做同样的切分，所有词都命中才算匹配
+- 获取数据、归档时增量更新；索引文件不存在时按数据库 CSV 和往期存档重建
+- 标题权重高于正文
+
+用法:
+    from search_index import search, index_articles
+
+    index_articles(new_df, location="当前")
+    results = search("合同审查", limit=20)   # -> [{"id", "title", "url", "date", "location", "snippet", "score"}]
+
+命令行:
+    python search_index.py 合同审查
+    python search_index.py --rebuild
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from config import SEARCH_INDEX_FILE
+from news_store import CSV_FILE, ID_COLUMN, LOCATION_CURRENT, article_id, article_location, load_news
+from tracing import span
+
+# 标题、正文的 bm25 权重
+TITLE_WEIGHT = 3.0
+BODY_WEIGHT = 1.0
+
+_CJK_RUN = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+_WORD = re.compile(r"[㐀-䶿一-鿿豈-﫿]+|[0-9a-zA-Z]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    aid TEXT UNIQUE NOT NULL,
+    title TEXT,
+    url TEXT,
+    date TEXT,
+    location TEXT,
+    body TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, body, tokenize = 'unicode61');
+"""
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _bigrams(run):
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text):
+    """切词：汉字连续段切成重叠二字词，英文数字按单词（小写）"""
+    if not isinstance(text, str):
+        return []
+    tokens = []
+    for word in _WORD.findall(text.replace("**", "")):
+        if _CJK_RUN.fullmatch(word):
+            tokens.extend(_bigrams(word))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def _match_expression(query):
+    """查询词 -> FTS5 表达式（每个词加引号；单个汉字按前缀匹配二字词）"""
+    terms = []
+    for token in tokenize(query):
+        if _CJK_RUN.fullmatch(token) and len(token) == 1:
+            terms.append(f'"{token}"*')
+        else:
+            terms.append(f'"{token}"')
+    return " AND ".join(dict.fromkeys(terms))
+
+
+def _connect(db_file=SEARCH_INDEX_FILE, rebuild_if_new=True):
+    """打开索引（新建的索引文件默认先按数据重建）"""
+    with _init_lock:
+        first_time = db_file not in _initialized
+        if first_time:
+            is_new = not os.path.exists(db_file)
+        conn = sqlite3.connect(db_file)
+        if first_time:
+            conn.executescript(_SCHEMA)
+            _initialized.add(db_file)
+            if is_new and rebuild_if_new:
+                _rebuild(conn)
+    return conn
+
+
+def _text(value):
+    return value if isinstance(value, str) else ""
+
+
+def _date(value):
+    """收录日期可能被 pandas 读成数字或 NaN"""
+    if isinstance(value, str):
+        return value
+    return "" if value is None or value != value else str(value)
+
+
+def _upsert(conn, df, location):
+    """按文章 ID 写入或更新（同一篇文章归档后位置从「当前」变为期号）"""
+    count = 0
+    for record in df.to_dict("records"):
+        where = article_location(record, location)
+        title = _text(record.get("标题"))
+        url = _text(record.get("链接"))
+        aid = _text(record.get(ID_COLUMN)) or article_id(title, url)
+        body = _text(record.get("原文内容")) or _text(record.get("AI总结"))
+        row = conn.execute("SELECT id FROM articles WHERE aid = ?", (aid,)).fetchone()
+        if row:
+            rowid = row[0]
+            conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (rowid,))
+            conn.execute(
+                "UPDATE articles SET title = ?, url = ?, date = ?, location = ?, body = ? WHERE id = ?",
+                (title, url, _date(record.get("收录日期")), where, body, rowid),
+            )
+        else:
+            rowid = conn.execute(
+                "INSERT INTO articles (aid, title, url, date, location, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (aid, title, url, _date(record.get("收录日期")), where, body),
+            ).lastrowid
+        conn.execute(
+            "INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)",
+            (rowid, " ".join(tokenize(title)), " ".join(tokenize(body))),
+        )
+        count += 1
+    return count
+
+
+def _rebuild(conn):
+    """按往期存档和当前数据库重建索引（当前数据库最后写入，位置以它为准）"""
+    # 延迟导入：存档索引第一次打开时可能要导入 CSV
+    from archive_store import KIND_PUBLISHED, KIND_TRASH, archive_stats, vol_articles
+
+    with span("search.rebuild") as attrs:
+        count = 0
+        with conn:
+            conn.execute("DELETE FROM articles")
+            conn.execute("DELETE FROM articles_fts")
+            for vol in archive_stats()["期号"]:
+                count += _upsert(conn, vol_articles(vol, KIND_TRASH), f"vol.{vol}（垃圾）")
+                count += _upsert(conn, vol_articles(vol, KIND_PUBLISHED), f"vol.{vol}")
+            current = load_news(CSV_FILE)
+            if not current.empty:
+                count += _upsert(conn, current, LOCATION_CURRENT)
+        attrs["articles"] = count
+    print(f"[INFO] 搜索索引已重建：{count} 篇")
+    return count
+
+
+def rebuild(db_file=SEARCH_INDEX_FILE):
+    conn = _connect(db_file, rebuild_if_new=False)
+    try:
+        return _rebuild(conn)
+    finally:
+        conn.close()
+
+
+def index_articles(df, location=LOCATION_CURRENT, db_file=SEARCH_INDEX_FILE):
+    """增量写入一批文章（获取数据后 location=「当前」，归档后为 vol.X）"""
+    if df is None or df.empty:
+        return 0
+    with span("search.index", location=location, rows=len(df)):
+        conn = _connect(db_file)
+        try:
+            with conn:
+                return _upsert(conn, df, location)
+        finally:
+            conn.close()
+
+
+def _snippet(body, query, width=80):
+    """正文里第一个命中词附近的一小段"""
+    body = re.sub(r"\s+", " ", body.replace("**", ""))
+    lowered = body.lower()
+    positions = [lowered.find(word.lower()) for word in _WORD.findall(query)]
+    positions = [p for p in positions if p >= 0]
+    start = max(min(positions) - width // 4, 0) if positions else 0
+    snippet = body[start:start + width]
+    return ("…" if start > 0 else "") + snippet + ("…" if start + width < len(body) else "")
+
+
+def search(query, limit=20, location=None, db_file=SEARCH_INDEX_FILE):
+    """
+    搜索标题和正文，按相关度排序
+    location: 只搜某个位置（如「当前」「vol.12」），默认全部
+    返回: [{"id", "title", "url", "date", "location", "snippet", "score"}]
+    """
+    expression = _match_expression(query)
+    if not expression:
+        return []
+    with span("search.query", query=query[:30]) as attrs:
+        conn = _connect(db_file)
+        try:
+            sql = (
+                f"SELECT a.aid, a.title, a.url, a.date, a.location, a.body, "
+                f"bm25(articles_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score "
+                "FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                "WHERE articles_fts MATCH ?"
+            )
+            params = [expression]
+            if location:
+                sql += " AND a.location = ?"
+                params.append(location)
+            sql += " ORDER BY score LIMIT ?"
+            params.append(limit)
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        attrs["results"] = len(rows)
+    return [
+        {"id": aid, "title": title, "url": url, "date": date, "location": loc,
+         "snippet": _snippet(body, query), "score": -score}
+        for aid, title, url, date, loc, body, score in rows
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='全文搜索当前文章和往期存档')
+    parser.add_argument(
+        'query',
+        nargs='?',
+        help='搜索词'
+    )
+    parser.add_argument(
+        '-n', '--limit',
+        type=int,
+        default=10,
+        help='返回条数 (默认: 10)'
+    )
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='按数据库 CSV 和往期存档重建索引'
+    )
+
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild()
+    if args.query:
+        start = time.perf_counter()
+        results = search(args.query, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"共 {len(results)} 条（{elapsed:.1f} ms）")
+        for item in results:
+            print(f"[{item['location']}] {item['date']} {item['title']}")
+            print(f"    {item['snippet']}")
@@ -0,0 +1,374 @@
+"""
+相关往期报道（语义相似度）
+用本地向量模型把文章编码成向量，按余弦相似度找出内容相关的往期文章（同一家公司、同一类事件）
+
+- 模型用 sentence-transformers 在 CPU 上批量编码；没装这个包时整个功能自动关闭
+- 向量存成 float32 矩阵文件（按行追加、只读内存映射），另存一份 JSON 记录每行的文章 ID、标题、位置
+- 获取数据时增量编码新文章；归档只更新位置，不重新编码
+- 应用和命令行（fetch.py）可能同时写：写入前加文件锁并重新读取记录，查询前发现记录文件变了就重新读取
+- 查询是一次矩阵乘法 + argpartition，十万条向量也能即时返回
+
+用法:
+    from semantic_index import is_available, related_articles
+
+    if is_available():
+        related = related_articles(["文章ID1", "文章ID2"], k=3)   # -> {文章ID: [{"id", "title", "location", "score", ...}]}
+
+命令行:
+    python semantic_index.py --rebuild          # 编码当前数据库和全部往期存档（首次使用）
+    python semantic_index.py 合同审查 AI         # 按一段文字查相关文章
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，只靠进程内的锁
+    fcntl = None
+
+from config import EMBEDDING_BATCH_SIZE, EMBEDDING_DIR, EMBEDDING_ENABLED, EMBEDDING_MODEL
+from disk_cache import write_bytes_atomic
+from news_store import CSV_FILE, ID_COLUMN, LOCATION_CURRENT, article_id, article_location, load_news
+from tracing import span
+
+# 参与编码的正文长度（小模型的输入上限约 512 个 token）
+MAX_TEXT_CHARS = 500
+
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+# 往期已发布的位置（排除「当前」和垃圾存档）
+_PAST_LOCATION = re.compile(r"^vol\.[^（]+$")
+
+_model = None
+_model_lock = threading.Lock()
+_index = None
+_index_lock = threading.Lock()
+
+
+def is_available():
+    """配置开启且装了 sentence-transformers 时可用"""
+    if not EMBEDDING_ENABLED:
+        return False
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_model():
+    """懒加载向量模型（进程内只加载一次）"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+
+            with span("semantic.load_model", model=EMBEDDING_MODEL):
+                print(f"[INFO] 正在加载向量模型 {EMBEDDING_MODEL} ...")
+                _model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+        return _model
+
+
+def encode(texts):
+    """批量编码为单位长度的 float32 向量（n × dim）"""
+    with span("semantic.encode", texts=len(texts)):
+        vectors = _get_model().encode(
+            list(texts), batch_size=EMBEDDING_BATCH_SIZE, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=len(texts) > EMBEDDING_BATCH_SIZE,
+        )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _article_text(record):
+    title = record.get("标题") if isinstance(record.get("标题"), str) else ""
+    body = record.get("原文内容") if isinstance(record.get("原文内容"), str) else ""
+    return f"{title}\n{body.replace('**', '')[:MAX_TEXT_CHARS]}"
+
+
+@contextlib.contextmanager
+def _file_lock(directory=EMBEDDING_DIR):
+    """跨进程的写锁（应用和 fetch.py 可能同时追加向量）"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SemanticIndex:
+    """向量矩阵（内存映射）+ 文章信息"""
+
+    def __init__(self, directory=EMBEDDING_DIR):
+        self.directory = directory
+        self.model = EMBEDDING_MODEL
+        self.dim = None
+        self.items = []      # 每行一条: {"id", "title", "url", "date", "location"}
+        self.rows = {}       # 文章 ID -> 行号
+        self._vectors = None
+        self._meta_version = None
+        self._load()
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.directory, VECTORS_FILE)
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, META_FILE)
+
+    def _current_meta_version(self):
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """读取记录文件（其他进程写过之后也用它重新读取）"""
+        self.dim, self.items, self.rows, self._vectors = None, [], {}, None
+        self._meta_version = self._current_meta_version()
+        if self._meta_version is None:
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model:
+            print(f"[WARN] 向量索引是用 {meta.get('model')} 生成的，当前模型 {self.model}，请重建索引")
+            return
+        self.dim = meta["dim"]
+        self.items = meta["items"]
+        self.rows = {item["id"]: row for row, item in enumerate(self.items)}
+
+    def reload_if_changed(self):
+        """记录文件被其他进程改过时重新读取"""
+        if self._current_meta_version() != self._meta_version:
+            self._load()
+
+    @property
+    def vectors(self):
+        """只读内存映射（行数以记录为准，写到一半的多余行忽略）"""
+        if self._vectors is None and self.items:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.items), self.dim))
+        return self._vectors
+
+    def _save_meta(self):
+        data = json.dumps({"model": self.model, "dim": self.dim, "items": self.items}, ensure_ascii=False)
+        write_bytes_atomic(self.meta_path, data.encode("utf-8"))
+        self._meta_version = self._current_meta_version()
+
+    def add(self, df, location=LOCATION_CURRENT):
+        """
+        增量加入一批文章：已有的只更新位置，新文章批量编码后追加到矩阵
+        调用方需持有 _file_lock；返回新编码的篇数
+        """
+        if df is None or df.empty:
+            return 0
+        # 以磁盘上的记录为准（其他进程可能刚追加过）
+        self._load()
+        new_items, texts, seen = [], [], set()
+        moved = False
+        for record in df.to_dict("records"):
+            title = record.get("标题") if isinstance(record.get("标题"), str) else ""
+            url = record.get("链接") if isinstance(record.get("链接"), str) else ""
+            aid = record.get(ID_COLUMN) if isinstance(record.get(ID_COLUMN), str) else article_id(title, url)
+            where = article_location(record, location)
+            if aid in self.rows:
+                item = self.items[self.rows[aid]]
+                moved = moved or item["location"] != where
+                item["location"] = where
+                continue
+            if aid in seen:
+                continue
+            seen.add(aid)
+            date = record.get("收录日期")
+            new_items.append({
+                "id": aid, "title": title, "url": url,
+                "date": date if isinstance(date, str) else "", "location": where,
+            })
+            texts.append(_article_text(record))
+
+        os.makedirs(self.directory, exist_ok=True)
+        if new_items:
+            vectors = encode(texts)
+            self._vectors = None
+            self.dim = self.dim or vectors.shape[1]
+            # 记录里的行数才算数：先截掉上次写到一半的多余行，再追加
+            expected = len(self.items) * self.dim * 4
+            on_disk = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+            if on_disk < expected:
+                print(f"[WARN] 向量文件比记录少（{on_disk} < {expected} 字节），不再写入，请重建索引")
+                return 0
+            mode = "r+b" if os.path.exists(self.vectors_path) else "wb"
+            with open(self.vectors_path, mode) as f:
+                f.truncate(expected)
+                f.seek(expected)
+                f.write(vectors.tobytes())
+            for item in new_items:
+                self.rows[item["id"]] = len(self.items)
+                self.items.append(item)
+        if new_items or moved:
+            self._save_meta()
+        return len(new_items)
+
+    def update_locations(self, ids, location):
+        """归档后更新文章位置（不重新编码）；调用方需持有 _file_lock"""
+        self._load()
+        changed = False
+        for aid in ids:
+            row = self.rows.get(aid)
+            if row is not None and self.items[row]["location"] != location:
+                self.items[row]["location"] = location
+                changed = True
+        if changed:
+            self._save_meta()
+
+    def _past_mask(self):
+        return np.fromiter((bool(_PAST_LOCATION.match(item["location"])) for item in self.items), dtype=bool, count=len(self.items))
+
+    def _top_k(self, scores, k, exclude=None):
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [dict(self.items[row], score=float(scores[row])) for row in top]
+
+    def related(self, ids, k=5, past_only=True, min_score=0.0):
+        """
+        一批文章各自最相关的 k 篇（一次矩阵乘法算完）
+        past_only: 只在往期已发布的文章里找
+        返回: {文章ID: [{"id", "title", "url", "date", "location", "score"}]}（没有向量的文章不返回）
+        """
+        ids = [aid for aid in ids if aid in self.rows]
+        if not ids or self.vectors is None:
+            return {}
+        with span("semantic.related", queries=len(ids), vectors=len(self.items)):
+            query_rows = np.array([self.rows[aid] for aid in ids])
+            scores = np.asarray(self.vectors[query_rows]) @ np.asarray(self.vectors).T
+            if past_only:
+                scores[:, ~self._past_mask()] = -np.inf
+            scores[scores < min_score] = -np.inf
+            return {
+                aid: self._top_k(scores[i], k, exclude=query_rows[i])
+                for i, aid in enumerate(ids)
+            }
+
+    def search(self, text, k=10, past_only=False):
+        """按一段文字查最相关的 k 篇"""
+        if self.vectors is None:
+            return []
+        scores = np.asarray(self.vectors) @ encode([text])[0]
+        if past_only:
+            scores[~self._past_mask()] = -np.inf
+        return self._top_k(scores, k)
+
+
+def get_index():
+    """进程内共享的索引（第一次调用时读取文件）"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SemanticIndex()
+        return _index
+
+
+def add_articles(df, location=LOCATION_CURRENT):
+    """
+    获取数据后增量编码新文章；功能不可用时什么都不做
+    模型加载失败（离线、首次下载失败）等错误只打印警告，不影响已经保存好的数据
+    """
+    if not is_available():
+        return 0
+    index = get_index()
+    try:
+        with _index_lock, _file_lock():
+            return index.add(df, location)
+    except Exception as e:
+        print(f"[WARN] 相关往期报道索引更新失败，之后可运行 python semantic_index.py --rebuild 补上: {e}")
+        return 0
+
+
+def update_locations(ids, location):
+    """归档后更新文章位置；功能不可用时什么都不做"""
+    if not is_available():
+        return
+    index = get_index()
+    with _index_lock, _file_lock():
+        index.update_locations(ids, location)
+
+
+def related_articles(ids, k=3, past_only=True, min_score=0.5):
+    """一批文章的相关往期报道；功能不可用或没有索引时返回空字典"""
+    if not is_available():
+        return {}
+    index = get_index()
+    with _index_lock:
+        index.reload_if_changed()
+        return index.related(ids, k, past_only, min_score)
+
+
+def rebuild():
+    """按往期存档和当前数据库重建向量索引"""
+    from archive_store import KIND_PUBLISHED, KIND_TRASH, archive_stats, vol_articles
+
+    global _index
+    with _index_lock, _file_lock():
+        for name in (VECTORS_FILE, META_FILE):
+            path = os.path.join(EMBEDDING_DIR, name)
+            if os.path.exists(path):
+                os.remove(path)
+        _index = index = SemanticIndex()
+        with span("semantic.rebuild") as attrs:
+            count = 0
+            for vol in archive_stats()["期号"]:
+                count += index.add(vol_articles(vol, KIND_TRASH), f"vol.{vol}（垃圾）")
+                count += index.add(vol_articles(vol, KIND_PUBLISHED), f"vol.{vol}")
+            count += index.add(load_news(CSV_FILE), LOCATION_CURRENT)
+            attrs["articles"] = count
+    print(f"[INFO] 向量索引已重建：{count} 篇")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='相关往期报道（本地向量语义搜索）')
+    parser.add_argument(
+        'query',
+        nargs='*',
+        help='按一段文字查相关文章'
+    )
+    parser.add_argument(
+        '-n', '--top',
+        type=int,
+        default=5,
+        help='返回条数 (默认: 5)'
+    )
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='编码当前数据库和全部往期存档，重建向量索引'
+    )
+
+    args = parser.parse_args()
+
+    if not is_available():
+        print("❌ 未安装 sentence-transformers（pip install sentence-transformers），或配置中已关闭 EMBEDDING_ENABLED")
+    else:
+        if args.rebuild:
+            rebuild()
+        if args.query:
+            for item in get_index().search(" ".join(args.query), args.top):
+                print(f"{item['score']:.3f} [{item['location']}] {item['date']} {item['title']}")
@@ -0,0 +1,235 @@
+"""
+轻量级追踪模块
+用嵌套 span 记录数据获取、审阅、发布等热点路径的耗时，写入本地 JSONL 文件
+
+用法:
+    from tracing import span
+
+    with span("fetch.day", date="2025-12-01"):
+        with span("fetch.article", title=title[:30]):
+            ...
+
+查看汇总:
+    python tracing.py                     # 最慢的 span + 按名称汇总
+    python tracing.py --top 20            # 显示前 20 条
+    python tracing.py --name feishu       # 只看名称包含 feishu 的 span
+    python tracing.py --last              # 只看最近一次运行
+"""
+
+import argparse
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import TRACE_ENABLED, TRACE_FILE
+
+# 当前所在的 span（contextvars 同时支持线程和 asyncio 任务的嵌套）
+_current_span = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+
+
+def _new_id():
+    return uuid.uuid4().hex[:16]
+
+
+def _write_record(record):
+    """追加一条 span 记录到 JSONL 文件"""
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock:
+        try:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"[追踪] 写入失败: {e}")
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    记录一个 span（可嵌套）
+    name: span 名称，建议用「模块.动作」格式，如 fetch.article
+    attrs: 附加属性，如日期、标题、条数
+    """
+    if not TRACE_ENABLED:
+        yield attrs
+        return
+
+    parent = _current_span.get()
+    current = {
+        "trace_id": parent["trace_id"] if parent else _new_id(),
+        "span_id": _new_id(),
+        "parent_id": parent["span_id"] if parent else None,
+    }
+    token = _current_span.set(current)
+    start = time.time()
+    start_perf = time.perf_counter()
+    error = None
+    try:
+        # 返回 attrs，调用方可以在 span 内补充属性（如结果条数）
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        record = {
+            **current,
+            "name": name,
+            "start": round(start, 6),
+            "duration_ms": round((time.perf_counter() - start_perf) * 1000, 3),
+            "thread": threading.current_thread().name,
+            "attrs": attrs,
+        }
+        if error:
+            record["error"] = error
+        _write_record(record)
+
+
+def traced(name=None):
+    """装饰器：把整个函数包在一个 span 里（支持 async 函数）"""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__name__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ================= 查看器 =================
+
+def load_spans(trace_file=TRACE_FILE):
+    """读取追踪文件，跳过损坏的行"""
+    spans = []
+    if not os.path.exists(trace_file):
+        return spans
+    with open(trace_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def summarize(spans, top=10):
+    """
+    汇总 span
+    返回: (最慢的 span 列表, 按名称聚合的统计列表)
+    """
+    slowest = sorted(spans, key=lambda s: s.get("duration_ms", 0), reverse=True)[:top]
+
+    groups = {}
+    for s in spans:
+        groups.setdefault(s.get("name", "?"), []).append(s.get("duration_ms", 0))
+
+    stats = []
+    for name, durations in groups.items():
+        durations.sort()
+        p95_idx = min(len(durations) - 1, int(len(durations) * 0.95))
+        stats.append({
+            "name": name,
+            "count": len(durations),
+            "total_ms": sum(durations),
+            "avg_ms": sum(durations) / len(durations),
+            "p95_ms": durations[p95_idx],
+            "max_ms": durations[-1],
+        })
+    stats.sort(key=lambda x: x["total_ms"], reverse=True)
+
+    return slowest, stats[:top]
+
+
+def print_summary(spans, top=10):
+    """在终端打印汇总表"""
+    if not spans:
+        print("[追踪] 没有可用的追踪记录")
+        return
+
+    by_id = {s.get("span_id"): s for s in spans}
+    slowest, stats = summarize(spans, top)
+
+    print("=" * 80)
+    print(f"最慢的 {len(slowest)} 个 span（共 {len(spans)} 条记录）")
+    print("=" * 80)
+    for s in slowest:
+        # 拼出父级链路，方便定位热点所在位置
+        chain = [s.get("name", "?")]
+        parent = by_id.get(s.get("parent_id"))
+        while parent:
+            chain.append(parent.get("name", "?"))
+            parent = by_id.get(parent.get("parent_id"))
+        path = " ← ".join(chain)
+        attrs = s.get("attrs") or {}
+        attrs_str = ", ".join(f"{k}={str(v)[:30]}" for k, v in attrs.items())
+        error_str = "  [错误]" if s.get("error") else ""
+        print(f"{s.get('duration_ms', 0):>10.1f} ms  {path}{error_str}")
+        if attrs_str:
+            print(f"{'':>15}{attrs_str}")
+
+    print()
+    print("=" * 80)
+    print("按名称汇总（按总耗时排序）")
+    print("=" * 80)
+    print(f"{'名称':<30}{'次数':>8}{'总计(ms)':>12}{'平均(ms)':>12}{'P95(ms)':>12}{'最大(ms)':>12}")
+    for row in stats:
+        print(
+            f"{row['name']:<30}{row['count']:>8}{row['total_ms']:>12.1f}"
+            f"{row['avg_ms']:>12.1f}{row['p95_ms']:>12.1f}{row['max_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='汇总追踪文件中最慢的 span')
+    parser.add_argument(
+        '-f', '--file',
+        type=str,
+        default=TRACE_FILE,
+        help=f'追踪文件路径 (默认: {TRACE_FILE})'
+    )
+    parser.add_argument(
+        '-n', '--top',
+        type=int,
+        default=10,
+        help='显示前 N 条 (默认: 10)'
+    )
+    parser.add_argument(
+        '--name',
+        type=str,
+        help='只统计名称包含该关键字的 span'
+    )
+    parser.add_argument(
+        '--last',
+        action='store_true',
+        help='只看最近一次运行（最后一个根 span 所在的 trace）'
+    )
+
+    args = parser.parse_args()
+
+    spans = load_spans(args.file)
+    if args.last and spans:
+        roots = [s for s in spans if not s.get("parent_id")]
+        last_trace = (roots[-1] if roots else spans[-1]).get("trace_id")
+        spans = [s for s in spans if s.get("trace_id") == last_trace]
+    if args.name:
+        spans = [s for s in spans if args.name in s.get("name", "")]
+
+    print_summary(spans, args.top)
@@ -3,7 +3,22 @@
 生成适合公众号编辑器的 HTML 格式内容
 """
 
-import re
+from functools import lru_cache
+
+from markdown_bold import to_html
+
+# 公众号样式常量
+FONT_SIZE = "15px"
+LINE_HEIGHT = "1.8"
+PADDING = "0 8px"
+TEXT_ALIGN = "justify"
+LINK_COLOR = "#576b95"
+TITLE_COLOR = "#0336CB"  # 蓝色标题
+BADGE_COLOR = "#0336CB"  # 序号圆标背景色
+DIVIDER_COLOR = "#e5e5e5"
+
+# 缓存的单篇文章片段数（一期几十篇，留足重新排序、改稿后的旧版本）
+FRAGMENT_CACHE_SIZE = 512
 
 
 def generate_wechat_html(articles: list, vol: str = "") -> str:
@@ -19,18 +34,10 @@ def generate_wechat_html(articles: list, vol: str = "") -> str:
     
     articles: [{"标题": "", "原文内容": "", "链接": "", "来源名称": ""}, ...]
     vol: 期号
-    """
-    
-    # 公众号样式常量
-    FONT_SIZE = "15px"
-    LINE_HEIGHT = "1.8"
-    PADDING = "0 8px"
-    TEXT_ALIGN = "justify"
-    LINK_COLOR = "#576b95"
-    TITLE_COLOR = "#0336CB"  # 蓝色标题
-    BADGE_COLOR = "#0336CB"  # 序号圆标背景色
-    DIVIDER_COLOR = "#e5e5e5"
     
+    每篇文章的 HTML 片段按 (内容, 序号, 是否最后一篇) 缓存，
+    页面刷新时只有改动过的文章需要重新排版，其余直接拼接
+    """
     html_parts = []
     
     # 周报标题
@@ -45,54 +52,76 @@ def generate_wechat_html(articles: list, vol: str = "") -> str:
     
     # 文章内容
     for i, article in enumerate(articles, 1):
-        title = article.get("标题", "无标题")
-        content = article.get("原文内容", "") or article.get("AI总结", "")
-        link = article.get("链接", "")
-        reference = article.get("来源名称", "")
-        
-        # 处理 Markdown 加粗格式 **text** -> <strong>text</strong>
-        content = convert_markdown_bold(content)
-        
-        # 分段处理
-        paragraphs = content.split('\n\n') if content else []
-        content_html = ""
-        for para in paragraphs:
-            para = para.strip()
-            if para:
-                # 处理单个换行
-                para = para.replace('\n', '<br/>')
-                content_html += f'''
+        html_parts.append(_article_fragment(
+            article.get("标题", "无标题"),
+            article.get("原文内容", "") or article.get("AI总结", ""),
+            article.get("链接", ""),
+            article.get("来源名称", ""),
+            i,
+            i == len(articles),
+        ))
+    
+    # 尾部署名
+    html_parts.append(f'''
+<section style="padding: 24px 8px; text-align: center;">
+  <p style="font-size: 14px; color: #999; margin: 0;">
+    ———— END ————
+  </p>
+  <p style="font-size: 14px; color: #999; margin: 8px 0 0 0;">
+    📮 LawGeek法律科技周报 | 每周精选法律科技前沿资讯
+  </p>
+</section>
+''')
+    
+    return '\n'.join(html_parts)
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _article_fragment(title, content, link, reference, index: int, is_last: bool) -> str:
+    """生成单篇文章的 HTML 片段（标题、正文、来源、分隔线）"""
+    # 处理 Markdown 加粗格式 **text** -> <strong>text</strong>
+    content = convert_markdown_bold(content)
+    
+    # 分段处理
+    paragraphs = content.split('\n\n') if content else []
+    content_html = ""
+    for para in paragraphs:
+        para = para.strip()
+        if para:
+            # 处理单个换行
+            para = para.replace('\n', '<br/>')
+            content_html += f'''
   <p style="font-size: {FONT_SIZE}; line-height: {LINE_HEIGHT}; text-align: {TEXT_ALIGN}; padding: {PADDING}; margin: 0 0 12px 0; color: #333;">
     {para}
   </p>'''
-        
-        # 来源
-        source_html = ""
-        if reference:
-            if link:
-                source_html = f'''
+    
+    # 来源
+    source_html = ""
+    if reference:
+        if link:
+            source_html = f'''
   <p style="font-size: 14px; padding: {PADDING}; margin: 8px 0 0 0;">
     <span style="color: #999;">来源：</span><a href="{link}" style="color: {LINK_COLOR}; text-decoration: none;">{reference}</a>
   </p>'''
-            else:
-                source_html = f'''
+        else:
+            source_html = f'''
   <p style="font-size: 14px; padding: {PADDING}; margin: 8px 0 0 0; color: #999;">
     来源：{reference}
   </p>'''
-        
-        # 分隔线（不是最后一篇）
-        divider = ""
-        if i < len(articles):
-            divider = f'''
+    
+    # 分隔线（不是最后一篇）
+    divider = ""
+    if not is_last:
+        divider = f'''
 <section style="padding: 12px 8px;">
   <hr style="border: none; border-top: 1px solid {DIVIDER_COLOR}; margin: 0;"/>
 </section>'''
-        
-        # 序号圆标样式
-        badge_html = f'''<span style="display: inline-block; width: 22px; height: 22px; line-height: 22px; text-align: center; background-color: {BADGE_COLOR}; color: white; border-radius: 50%; font-size: 13px; font-weight: bold; margin-right: 8px; vertical-align: middle;">{i}</span>'''
-        
-        # 组装单篇文章
-        article_html = f'''
+    
+    # 序号圆标样式
+    badge_html = f'''<span style="display: inline-block; width: 22px; height: 22px; line-height: 22px; text-align: center; background-color: {BADGE_COLOR}; color: white; border-radius: 50%; font-size: 13px; font-weight: bold; margin-right: 8px; vertical-align: middle;">{index}</span>'''
+    
+    # 组装单篇文章
+    return f'''
 <section style="padding: 8px 0;">
   <p style="font-size: 17px; font-weight: bold; color: {TITLE_COLOR}; padding: {PADDING}; margin: 0 0 12px 0;">
     {badge_html}<span style="vertical-align: middle;">{title}</span>
@@ -101,29 +130,11 @@ def generate_wechat_html(articles: list, vol: str = "") -> str:
 {source_html}
 </section>
 {divider}'''
-        
-        html_parts.append(article_html)
-    
-    # 尾部署名
-    html_parts.append(f'''
-<section style="padding: 24px 8px; text-align: center;">
-  <p style="font-size: 14px; color: #999; margin: 0;">
-    ———— END ————
-  </p>
-  <p style="font-size: 14px; color: #999; margin: 8px 0 0 0;">
-    📮 LawGeek法律科技周报 | 每周精选法律科技前沿资讯
-  </p>
-</section>
-''')
-    
-    return '\n'.join(html_parts)
 
 
 def convert_markdown_bold(text: str) -> str:
     """将 Markdown 加粗格式 **text** 转换为 HTML <strong>text</strong>"""
-    if not text:
-        return text
-    return re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return to_html(text)
 
 
 def test_generate():